@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -12,6 +14,90 @@ class Settings(BaseSettings):
     WYSCOUT_USERNAME: str = ""
     WYSCOUT_PASSWORD: str = ""
 
+    # Pool HTTP compartido hacia Wyscout
+    WYSCOUT_TIMEOUT: float = 15.0
+    WYSCOUT_HTTP2: bool = True
+    WYSCOUT_MAX_CONNECTIONS: int = 100
+    WYSCOUT_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    WYSCOUT_KEEPALIVE_EXPIRY: float = 30.0
+
+    # Reintentos y cuota (token bucket) hacia Wyscout; 0 req/s = sin límite
+    WYSCOUT_MAX_RETRIES: int = 3
+    WYSCOUT_RETRY_BACKOFF_BASE: float = 0.5
+    WYSCOUT_RETRY_BACKOFF_MAX: float = 20.0
+    WYSCOUT_RATE_LIMIT_PER_SECOND: float = 10.0
+    WYSCOUT_RATE_LIMIT_BURST: int = 20
+
+    # Scheduler global: llamadas concurrentes a Wyscout y fracción del límite por clase.
+    # Con WYSCOUT_ADAPTIVE_CONCURRENCY el límite parte de WYSCOUT_MAX_CONCURRENCY y se
+    # ajusta (AIMD) entre MIN y CEILING según latencia y 429/5xx.
+    WYSCOUT_MAX_CONCURRENCY: int = 16
+    WYSCOUT_BROWSE_SHARE: float = 0.6
+    WYSCOUT_BACKGROUND_SHARE: float = 0.2
+    WYSCOUT_ADAPTIVE_CONCURRENCY: bool = True
+    WYSCOUT_MIN_CONCURRENCY: int = 2
+    WYSCOUT_CONCURRENCY_CEILING: int = 64
+
+    # Circuit breaker por familia de endpoints (fallos seguidos o llamadas > SLO en segundos)
+    WYSCOUT_BREAKER_FAILURE_THRESHOLD: int = 5
+    WYSCOUT_BREAKER_RESET_TIMEOUT: float = 30.0
+    WYSCOUT_LATENCY_SLO: float = 5.0
+
+    # Caché de respuestas de Wyscout (TTL por tipo de endpoint, ver wyscout_client)
+    WYSCOUT_CACHE_ENABLED: bool = True
+    # Caché persistente (SQLite) para áreas/competiciones/temporadas/equipos; vacío = desactivada
+    WYSCOUT_DISK_CACHE_PATH: str = "data/wyscout_cache.sqlite3"
+    WYSCOUT_DISK_CACHE_COMPACT_INTERVAL: float = 6 * 3600
+    # Plantillas normalizadas en memoria (compartidas por los endpoints de plantillas); el tope incluye las fotos
+    SQUAD_STORE_MAX_BYTES: int = 32 * 1024 * 1024
+    SQUAD_STORE_TTL: float = 6 * 3600
+    # Caché de /api/players/batch-info (datos del jugador y contrato caducan por separado);
+    # el tope incluye las fotos en base64 que pide batch-info
+    PLAYER_INFO_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    PLAYER_INFO_BIO_TTL: float = 6 * 3600
+    PLAYER_INFO_CONTRACT_TTL: float = 24 * 3600
+    PLAYER_INFO_STALE_TTL: float = 7 * 24 * 3600
+    # Índice áreas -> competiciones -> equipos: refresco en segundo plano y qué se precarga
+    # (equipos de competiciones con divisionLevel 1..N; 0 = sólo bajo demanda)
+    HIERARCHY_REFRESH_INTERVAL: float = 6 * 3600
+    HIERARCHY_PRELOAD_MAX_DIVISION: int = 2
+    HIERARCHY_PRELOAD_CONCURRENCY: int = 4
+    # Sincronización Wyscout -> tablas de catálogo (areas, competitions, teams, players, matches).
+    # SYNC_COMPETITION_IDS: ids separados por comas; vacío = competiciones con divisionLevel 1..SYNC_MAX_DIVISION.
+    # SYNC_SQLITE_PATH: escribir en una réplica SQLite local en vez de Supabase (desarrollo).
+    SYNC_ENABLED: bool = False
+    SYNC_INTERVAL: float = 24 * 3600
+    SYNC_COMPETITION_IDS: str = ""
+    SYNC_MAX_DIVISION: int = 1
+    SYNC_CONCURRENCY: int = 4
+    SYNC_BATCH_SIZE: int = 500
+    SYNC_SQLITE_PATH: str = ""
+    SYNC_REFERENCE_MAX_AGE: float = 7 * 24 * 3600
+    SYNC_TEAMS_MAX_AGE: float = 24 * 3600
+    SYNC_PLAYERS_MAX_AGE: float = 24 * 3600
+    SYNC_MATCHES_MAX_AGE: float = 6 * 3600
+    # Lecturas de jugador/equipo/competición desde el catálogo (mismo store que la sincronización):
+    # una fila más vieja que su *_MAX_AGE se vuelve a pedir a Wyscout y se reescribe.
+    # Sin valor: sólo con la réplica SQLite local (con Supabase cada lectura es una ida y vuelta más).
+    CATALOG_READS_ENABLED: Optional[bool] = None
+    CATALOG_PLAYER_MAX_AGE: float = 24 * 3600
+    CATALOG_TEAM_MAX_AGE: float = 3 * 24 * 3600
+    CATALOG_COMPETITION_MAX_AGE: float = 7 * 24 * 3600
+    CATALOG_SQUAD_MAX_AGE: float = 24 * 3600
+    # /api/search/players: sin ir a Wyscout si el índice local tiene al menos N coincidencias buenas
+    PLAYER_SEARCH_MIN_LOCAL_RESULTS: int = 3
+    PLAYER_SEARCH_STRONG_SCORE: float = 0.8
+    # /api/search/federated: plazo por fuente (s), cuánto sigue una fuente tardía llenando
+    # la caché y caché de consultas recientes por club
+    FEDERATED_SEARCH_WYSCOUT_DEADLINE: float = 0.8
+    FEDERATED_SEARCH_DB_DEADLINE: float = 0.5
+    FEDERATED_SEARCH_LATE_TIMEOUT: float = 10.0
+    FEDERATED_SEARCH_CACHE_TTL: float = 120
+    FEDERATED_SEARCH_CACHE_MAX_ENTRIES: int = 2000
+    # /api/players/query: competiciones por consulta y contractinfo en vuelo por consulta
+    PLAYER_QUERY_MAX_COMPETITIONS: int = 30
+    PLAYER_QUERY_CONTRACT_CONCURRENCY: int = 8
+
     @property
     def wyscout_user(self) -> str:
         return self.WYSCOUT_API_KEY or self.WYSCOUT_USERNAME
@@ -1,14 +1,16 @@
-from fastapi import FastAPI, HTTPException, Query, Depends
+from fastapi import FastAPI, HTTPException, Query, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional, Dict, Any
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from pydantic import BaseModel
 from supabase import create_client  
 import asyncio
-import httpx
+import json
 import os
-import base64
 import logging
-from datetime import datetime
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -25,7 +27,22 @@ from app.auth import (
     get_current_user, supabase
 )
 
-from app.services.wyscout_client import WyscoutClient
+from app.services.wyscout_client import WyscoutClient, WyscoutError, begin_stale_tracking
+from app.services.disk_cache import DiskCache
+from app.services.player_records import IMAGES, PlayerInfo, SquadPlayer, age_from_birth_date
+from app.services.name_index import NAMES, tokens
+from app.services.player_search import PLAYER_SEARCH, CatalogPlayer
+from app.services.hierarchy_index import HierarchyIndex
+from app.services.catalog_sync import CatalogSync
+from app.services.catalog_repository import CatalogRepository
+from app.services.metadata_resolver import MetadataResolver
+from app.services.sync_store import SQLiteSyncStore, SupabaseSyncStore
+from app.services.federated_search import FederatedSearch, SearchSource, merge_hits
+from app.services.player_index import PlayerIndex, PlayerIndexCache
+from app.services.player_info_cache import CachedPlayerInfo, PlayerInfoCache
+from app.services.squad_store import SquadEntry, SquadStore
+from app.services.adaptive_limit import AIMDLimit
+from app.services.scheduler import Priority, UpstreamScheduler, set_priority
 from app.config import settings
 
 from app.services.supabase_service import SupabaseService
@@ -38,11 +55,192 @@ except Exception as e:
     logger.warning(f"Supabase no configurado: {e}")
     supabase_service = None
 
+def build_catalog_store():
+    """Tablas de catálogo: réplica SQLite local (SYNC_SQLITE_PATH) o Supabase; None si no hay ninguna."""
+    if settings.SYNC_SQLITE_PATH:
+        return SQLiteSyncStore(settings.SYNC_SQLITE_PATH, settings.SYNC_BATCH_SIZE)
+    if supabase_service:
+        return SupabaseSyncStore(supabase_service.client, settings.SYNC_BATCH_SIZE)
+    return None
+
+def build_catalog_sync(wyscout: WyscoutClient, store) -> Optional[CatalogSync]:
+    """Motor de sincronización sobre el store del catálogo; None si no hay dónde escribir."""
+    if store is None:
+        return None
+    return CatalogSync(
+        wyscout,
+        store,
+        competition_ids=[int(c) for c in settings.SYNC_COMPETITION_IDS.split(",") if c.strip()],
+        max_division=settings.SYNC_MAX_DIVISION,
+        concurrency=settings.SYNC_CONCURRENCY,
+        batch_size=settings.SYNC_BATCH_SIZE,
+        max_age={
+            "areas": settings.SYNC_REFERENCE_MAX_AGE,
+            "competitions": settings.SYNC_REFERENCE_MAX_AGE,
+            "teams": settings.SYNC_TEAMS_MAX_AGE,
+            "players": settings.SYNC_PLAYERS_MAX_AGE,
+            "matches": settings.SYNC_MATCHES_MAX_AGE,
+        },
+    )
+
+def build_catalog_repository(wyscout: WyscoutClient, store) -> CatalogRepository:
+    """Lecturas catálogo-primero; sin store (o desactivadas) es un paso directo a Wyscout.
+    Por defecto sólo con la réplica SQLite local."""
+    enabled = settings.CATALOG_READS_ENABLED
+    if enabled is None:
+        enabled = isinstance(store, SQLiteSyncStore)
+    return CatalogRepository(
+        wyscout,
+        store if enabled else None,
+        max_age={
+            "players": settings.CATALOG_PLAYER_MAX_AGE,
+            "teams": settings.CATALOG_TEAM_MAX_AGE,
+            "competitions": settings.CATALOG_COMPETITION_MAX_AGE,
+            "squads": settings.CATALOG_SQUAD_MAX_AGE,
+        },
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Un único WyscoutClient por proceso: el pool de conexiones se reutiliza entre requests."""
+    disk_cache = None
+    if settings.WYSCOUT_CACHE_ENABLED and settings.WYSCOUT_DISK_CACHE_PATH:
+        try:
+            disk_cache = DiskCache(settings.WYSCOUT_DISK_CACHE_PATH)
+        except Exception as e:
+            logger.warning(f"Caché en disco no disponible: {e}")
+
+    app.state.wyscout = WyscoutClient(
+        settings.wyscout_user,
+        settings.wyscout_pass,
+        settings.WYSCOUT_HOST,
+        timeout=settings.WYSCOUT_TIMEOUT,
+        max_connections=settings.WYSCOUT_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.WYSCOUT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.WYSCOUT_KEEPALIVE_EXPIRY,
+        http2=settings.WYSCOUT_HTTP2,
+        max_retries=settings.WYSCOUT_MAX_RETRIES,
+        retry_backoff_base=settings.WYSCOUT_RETRY_BACKOFF_BASE,
+        retry_backoff_max=settings.WYSCOUT_RETRY_BACKOFF_MAX,
+        rate_limit_per_second=settings.WYSCOUT_RATE_LIMIT_PER_SECOND,
+        rate_limit_burst=settings.WYSCOUT_RATE_LIMIT_BURST,
+        cache_enabled=settings.WYSCOUT_CACHE_ENABLED,
+        disk_cache=disk_cache,
+        breaker_failure_threshold=settings.WYSCOUT_BREAKER_FAILURE_THRESHOLD,
+        breaker_reset_timeout=settings.WYSCOUT_BREAKER_RESET_TIMEOUT,
+        latency_slo=settings.WYSCOUT_LATENCY_SLO,
+        scheduler=UpstreamScheduler(
+            settings.WYSCOUT_MAX_CONCURRENCY,
+            {
+                Priority.BROWSE: settings.WYSCOUT_BROWSE_SHARE,
+                Priority.BACKGROUND: settings.WYSCOUT_BACKGROUND_SHARE,
+            },
+            adaptive=AIMDLimit(
+                initial=settings.WYSCOUT_MAX_CONCURRENCY,
+                min_limit=settings.WYSCOUT_MIN_CONCURRENCY,
+                max_limit=settings.WYSCOUT_CONCURRENCY_CEILING,
+                latency_slo=settings.WYSCOUT_LATENCY_SLO,
+            ) if settings.WYSCOUT_ADAPTIVE_CONCURRENCY else None,
+        ),
+    )
+    logger.info(f"Wyscout client listo (http2={app.state.wyscout.http2})")
+    app.state.squad_store = SquadStore(settings.SQUAD_STORE_MAX_BYTES, settings.SQUAD_STORE_TTL)
+    app.state.player_indexes = PlayerIndexCache()
+    app.state.player_info_cache = PlayerInfoCache(
+        max_bytes=settings.PLAYER_INFO_CACHE_MAX_BYTES,
+        bio_ttl=settings.PLAYER_INFO_BIO_TTL,
+        contract_ttl=settings.PLAYER_INFO_CONTRACT_TTL,
+        stale_ttl=settings.PLAYER_INFO_STALE_TTL,
+        disk=disk_cache,
+    )
+    app.state.hierarchy = HierarchyIndex(
+        app.state.wyscout,
+        preload_max_division=settings.HIERARCHY_PRELOAD_MAX_DIVISION,
+        concurrency=settings.HIERARCHY_PRELOAD_CONCURRENCY,
+    )
+    catalog_store = build_catalog_store()
+    app.state.catalog_sync = build_catalog_sync(app.state.wyscout, catalog_store)
+    app.state.catalog = build_catalog_repository(app.state.wyscout, catalog_store)
+    app.state.metadata = MetadataResolver(app.state.wyscout, app.state.catalog)
+    app.state.federated_search = FederatedSearch(
+        cache_ttl=settings.FEDERATED_SEARCH_CACHE_TTL,
+        max_entries=settings.FEDERATED_SEARCH_CACHE_MAX_ENTRIES,
+        late_timeout=settings.FEDERATED_SEARCH_LATE_TIMEOUT,
+    )
+
+    background_tasks = []
+    if disk_cache:
+        background_tasks.append(asyncio.create_task(disk_cache.compaction_loop(settings.WYSCOUT_DISK_CACHE_COMPACT_INTERVAL)))
+    background_tasks.append(asyncio.create_task(app.state.hierarchy.run(settings.HIERARCHY_REFRESH_INTERVAL)))
+    if app.state.catalog_sync and settings.SYNC_ENABLED:
+        background_tasks.append(asyncio.create_task(app.state.catalog_sync.run(settings.SYNC_INTERVAL)))
+    if supabase_service:
+        # Nombres de informes y mercados para resolver y buscar jugadores sin ir a Wyscout
+        background_tasks.append(asyncio.create_task(load_known_players()))
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        await app.state.federated_search.aclose()
+        if app.state.catalog_sync:
+            await app.state.catalog_sync.aclose()
+        await app.state.catalog.aclose()
+        await app.state.player_info_cache.aclose()
+        await app.state.wyscout.aclose()
+        if disk_cache:
+            disk_cache.close()
+
+def get_wyscout(request: Request) -> WyscoutClient:
+    """Dependency: cliente Wyscout compartido de la aplicación"""
+    return request.app.state.wyscout
+
+def get_squad_store(request: Request) -> SquadStore:
+    """Dependency: plantillas normalizadas compartidas"""
+    return request.app.state.squad_store
+
+def get_player_indexes(request: Request) -> PlayerIndexCache:
+    """Dependency: índices de filtrado por competición"""
+    return request.app.state.player_indexes
+
+def get_player_info_cache(request: Request) -> PlayerInfoCache:
+    """Dependency: caché de batch-info"""
+    return request.app.state.player_info_cache
+
+def get_hierarchy(request: Request) -> HierarchyIndex:
+    """Dependency: índice áreas -> competiciones -> equipos"""
+    return request.app.state.hierarchy
+
+def get_catalog_sync(request: Request) -> CatalogSync:
+    """Dependency: sincronización Wyscout -> tablas de catálogo (503 si no hay dónde escribir)"""
+    if request.app.state.catalog_sync is None:
+        raise HTTPException(status_code=503, detail="Sincronización no configurada")
+    return request.app.state.catalog_sync
+
+def get_catalog(request: Request) -> CatalogRepository:
+    """Dependency: lecturas de jugador/equipo/competición desde el catálogo local"""
+    return request.app.state.catalog
+
+def get_metadata(request: Request) -> MetadataResolver:
+    """Dependency: nombres de equipos/competiciones/temporadas por id, en lote"""
+    return request.app.state.metadata
+
+async def get_admin_user(current_user: dict = Depends(get_current_user)) -> dict:
+    """Dependency: usuario autenticado con rol admin (403 si no)"""
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Solo administradores")
+    return current_user
+
+def get_federated_search(request: Request) -> FederatedSearch:
+    """Dependency: búsqueda federada (con caché de consultas recientes por club)"""
+    return request.app.state.federated_search
+
 # FastAPI app
 app = FastAPI(
     title="Football Scouting API",
     description="API for football scouting with Wyscout integration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration
@@ -52,8 +250,18 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Data-Stale"],
 )
 
+@app.middleware("http")
+async def mark_stale_responses(request: Request, call_next):
+    """Si Wyscout estaba caído y se sirvieron datos de caché viejos, avisarlo en la cabecera"""
+    marker = begin_stale_tracking()
+    response = await call_next(request)
+    if marker["stale"]:
+        response.headers["X-Data-Stale"] = "true"
+    return response
+
 # Pydantic models
 class AreaResponse(BaseModel):
     id: int
@@ -85,6 +293,7 @@ class PlayerSearchResponse(BaseModel):
     age: Optional[int] = None
     nationality: Optional[str] = None
     birthDate: Optional[str] = None
+    foot: Optional[str] = None
     contractExpires: Optional[str] = None
     marketValue: Optional[float] = None
     imageDataURL: Optional[str] = None
@@ -126,21 +335,9 @@ class ScoutReportResponse(BaseModel):
     video_url: Optional[str] = None
 
 # Helper functions
-def calculate_age(birth_date: str) -> Optional[int]:
-    try:
-        birth = datetime.strptime(birth_date, "%Y-%m-%d")
-        today = datetime.today()
-        return today.year - birth.year - ((today.month, today.day) < (birth.month, birth.day))
-    except:
-        return None
-
 # Temporarily store reports in memory
 scout_reports = []
 
-# Cache global para competiciones
-competition_cache = {}
-season_cache = {}
-
 # Routes
 @app.get("/")
 async def root():
@@ -229,227 +426,223 @@ async def list_scouts_in_club(current_user: dict = Depends(get_current_user)):
 # ============= FIN ENDPOINTS AUTH =============
 
 @app.get("/api/test-wyscout")
-async def test_wyscout():
+async def test_wyscout(wyscout: WyscoutClient = Depends(get_wyscout)):
     try:
-        import base64
-        
-        username = os.getenv("WYSCOUT_API_KEY") or os.getenv("WYSCOUT_USERNAME")
-        password = os.getenv("WYSCOUT_API_SECRET") or os.getenv("WYSCOUT_PASSWORD")
-        
-        if not username or not password:
+        if not settings.wyscout_user or not settings.wyscout_pass:
             return {"error": "Wyscout credentials not configured"}
-        
-        credentials = f"{username}:{password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        
-        headers = {
-            "Authorization": f"Basic {encoded_credentials}",
-            "Content-Type": "application/json"
+
+        areas = await wyscout.get_areas()
+        return {
+            "status": "success",
+            "message": "Wyscout API connection successful",
+            "areas_count": len(areas)
+        }
+
+    except WyscoutError as e:
+        return {
+            "status": "error",
+            "message": f"Wyscout API error: {e.status_code}",
+            "details": e.message
         }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://apirest.wyscout.com/v3/areas",
-                headers=headers,
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "status": "success",
-                    "message": "Wyscout API connection successful",
-                    "areas_count": len(data) if isinstance(data, list) else "unknown"
-                }
-            else:
-                return {
-                    "status": "error",
-                    "message": f"Wyscout API error: {response.status_code}",
-                    "details": response.text
-                }
-                
     except Exception as e:
         return {
             "status": "error",
             "message": f"Connection failed: {str(e)}"
         }
 
+@app.get("/api/wyscout/metrics")
+async def wyscout_metrics(
+    wyscout: WyscoutClient = Depends(get_wyscout),
+    squad_store: SquadStore = Depends(get_squad_store),
+    player_indexes: PlayerIndexCache = Depends(get_player_indexes),
+    info_cache: PlayerInfoCache = Depends(get_player_info_cache),
+    federated: FederatedSearch = Depends(get_federated_search),
+    hierarchy: HierarchyIndex = Depends(get_hierarchy),
+    catalog: CatalogRepository = Depends(get_catalog),
+    metadata: MetadataResolver = Depends(get_metadata),
+    current_user: dict = Depends(get_admin_user),
+):
+    """Métricas del cliente Wyscout compartido (pool de conexiones, requests) y de las cachés de jugadores (sólo admin)"""
+    if wyscout.disk_cache:
+        await wyscout.disk_cache.count()
+    return {
+        **wyscout.stats(),
+        "squad_store": squad_store.stats(),
+        "image_pool": IMAGES.stats(),
+        "player_indexes": player_indexes.stats(),
+        "player_info_cache": info_cache.stats(),
+        "name_index": NAMES.stats(),
+        "player_search": PLAYER_SEARCH.stats(),
+        "federated_search": federated.stats(),
+        "hierarchy": hierarchy.stats(),
+        "catalog": catalog.stats(),
+        "metadata": metadata.stats(),
+    }
+
 # ==============================================
 # HIERARCHICAL SEARCH ENDPOINTS
 # ==============================================
 
 @app.get("/api/areas", response_model=List[AreaResponse])
-async def get_areas():
-    """Get all available areas/countries"""
+async def get_areas(hierarchy: HierarchyIndex = Depends(get_hierarchy)):
+    """Get all available areas/countries (desde el índice de navegación, ya ordenadas)"""
     try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-            areas_data = await wyscout.get_areas()
-            
-            areas = []
-            for area in areas_data:
-                areas.append(AreaResponse(
-                    id=area.get("id"),
-                    name=area.get("name"),
-                    alpha2_code=area.get("alpha2code"),
-                    alpha3_code=area.get("alpha3code")
-                ))
-            
-            return sorted(areas, key=lambda x: x.name)
-            
+        return await hierarchy.areas()
+
     except Exception as e:
         logger.error(f"Error getting areas: {e}")
         raise HTTPException(status_code=500, detail="Failed to get areas")
 
 @app.get("/api/areas/{area_id}/competitions", response_model=List[CompetitionResponse])
-async def get_competitions_by_area(area_id: int):
+async def get_competitions_by_area(area_id: int, hierarchy: HierarchyIndex = Depends(get_hierarchy)):
     """Get competitions for a specific area"""
     try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-            # Need to use area alpha3 code for Wyscout API
-            areas = await wyscout.get_areas()
-            area_code = None
-            area_name = "Unknown"
-            
-            for area in areas:
-                if area.get("id") == area_id:
-                    area_code = area.get("alpha3code")
-                    area_name = area.get("name")
-                    break
-            
-            if not area_code:
-                raise HTTPException(status_code=404, detail="Area not found")
-            
-            competitions_data = await wyscout.get_competitions(area_code)
-            
-            competitions = []
-            comp_list = competitions_data.get("competitions", [])
-            
-            for comp in comp_list:
-                competitions.append(CompetitionResponse(
-                    id=comp.get("wyId"),
-                    name=comp.get("name"),
-                    area_name=area_name,
-                    format=comp.get("format", "Unknown"),
-                    gender=comp.get("gender", "Unknown"),
-                    division_level=comp.get("divisionLevel", 0)
-                ))
-            
-            return sorted(competitions, key=lambda x: x.name)
-            
+        competitions = await hierarchy.competitions(area_id)
     except Exception as e:
         logger.error(f"Error getting competitions: {e}")
         raise HTTPException(status_code=500, detail="Failed to get competitions")
+    if competitions is None:
+        raise HTTPException(status_code=404, detail="Area not found")
+    return competitions
 
 @app.get("/api/competitions/{competition_id}/teams", response_model=List[TeamResponse])
-async def get_teams_by_competition(competition_id: int):
+async def get_teams_by_competition(competition_id: int, hierarchy: HierarchyIndex = Depends(get_hierarchy)):
     """Get teams for a specific competition"""
     try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-            teams_data = await wyscout.get_competition_teams(competition_id)
-            
-            teams = []
-            team_list = teams_data.get("teams", [])
-            
-            for team in team_list:
-                teams.append(TeamResponse(
-                    id=team.get("wyId"),
-                    name=team.get("name"),
-                    official_name=team.get("officialName"),
-                    city=team.get("city"),
-                    area_name=team.get("area", {}).get("name") if team.get("area") else None
-                ))
-            
-            return sorted(teams, key=lambda x: x.name)
-            
+        return await hierarchy.teams(competition_id)
+
     except Exception as e:
         logger.error(f"Error getting teams: {e}")
         raise HTTPException(status_code=500, detail="Failed to get teams")
 
-import time as _time_module
+def remember_players(players: List[Dict[str, Any]], team_name: Optional[str] = None):
+    """Jugadores (formato Wyscout) a los índices locales: nombre -> wyId y búsqueda."""
+    NAMES.add_players(players)
+    PLAYER_SEARCH.add_players(players, team_name)
 
-# Caché de squads por equipo
-_squad_cache_data: Dict[int, tuple] = {}
-_CACHE_TTL = 3600  # 1 hora
+def remember_player_name(name: Optional[str], wyscout_id: Any):
+    NAMES.add(name, wyscout_id)
+    PLAYER_SEARCH.add_name(name, wyscout_id)
 
-@app.get("/api/competitions/{competition_id}/players")
-async def get_competition_players_bulk(
-    competition_id: int,
-    team_ids: str = Query("", description="Comma-separated team IDs")
-):
-    """Trae jugadores de múltiples equipos en paralelo con caché"""
-    if not team_ids:
-        return []
-
-    ids = [int(x) for x in team_ids.split(",") if x.strip()]
-    if not ids:
-        return []
-
-    now = _time_module.time()
-    # Separar: cacheados vs pendientes
-    cached_players = []
-    pending_ids = []
-    for tid in ids:
-        if tid in _squad_cache_data:
-            ct, cp = _squad_cache_data[tid]
-            if now - ct < _CACHE_TTL:
-                cached_players.extend(cp)
-                continue
-        pending_ids.append(tid)
-
-    if not pending_ids:
-        return cached_players
+async def load_known_players():
+    """Nombres de informes y mercados (Supabase) a los índices locales, al arrancar."""
+    try:
+        rows = await asyncio.to_thread(supabase_service.get_known_players)
+    except Exception as e:
+        logger.warning(f"Índices de jugadores: no se pudieron cargar informes y mercados: {e}")
+        return
+    for name, wyscout_id in rows:
+        remember_player_name(name, wyscout_id)
+    logger.info(f"Índices de jugadores: {len(rows)} nombres de informes y mercados")
+
+def player_team_id(p: Dict[str, Any]) -> Optional[int]:
+    return p.get("currentTeamId") or (p.get("currentTeam") or {}).get("wyId")
+
+async def load_squad(
+    wyscout: WyscoutClient, squad_store: SquadStore, team_id: int, catalog: Optional[CatalogRepository] = None
+) -> SquadEntry:
+    """Plantilla normalizada desde el SquadStore; si no está, por el catálogo (memoria,
+    tablas al día o Wyscout) o directamente de Wyscout, y se guarda mientras el
+    dato de origen siga fresco."""
+    entry = squad_store.get(team_id)
+    if entry is not None:
+        return entry
+    if catalog:
+        squad_data, fresh_until = await catalog.get_team_squad_until(team_id)
+    else:
+        squad_data = await wyscout.get_team_squad(team_id)
+        fresh_until = wyscout.fresh_until(f"/v3/teams/{team_id}/squad")
+    team_name = squad_data.get("team", {}).get("name")
+    remember_players(squad_data.get("squad", []), team_name)
+    players = [SquadPlayer.from_wyscout(p) for p in squad_data.get("squad", [])]
+    if squad_data.get("stale"):
+        # Copia degradada: servirla pero no fijarla en el store
+        return SquadEntry(team_id, team_name, players, 0, 0, stale=True)
+    return squad_store.put(team_id, team_name, players, fresh_until)
+
+async def competition_player_batches(
+    wyscout: WyscoutClient, squad_store: SquadStore, competition_id: int, wanted: set,
+    marker: Optional[Dict[str, bool]] = None,
+) -> AsyncIterator[Tuple[Optional[int], List[Dict[str, Any]]]]:
+    """Jugadores de la competición en tandas (team_id, jugadores) según van llegando.
+
+    Orden: plantillas ya cacheadas (al instante), luego el listado paginado de
+    la competición (unas pocas llamadas para toda la liga) y por último las
+    plantillas de los equipos pedidos que el listado no cubrió (o todos, si el
+    listado falla), cada una en cuanto resuelve. Puede repetir jugadores.
+    Si falla algo (equipos, listado, una plantilla) o se usa una copia
+    degradada, marker["partial"] = True: el resultado puede estar incompleto.
+    """
+    marker = marker if marker is not None else {}
+
+    teams_task = asyncio.create_task(wyscout.get_competition_teams(competition_id))
+    # Calentar la primera página mientras llegan los nombres de equipo (iter_pages la coalesce)
+    first_page = asyncio.create_task(wyscout.get_competition_players(competition_id))
+    first_page.add_done_callback(lambda t: t.cancelled() or t.exception())
 
-    # Buscar pendientes en paralelo (max 5 concurrentes)
-    sem = asyncio.Semaphore(5)
+    try:
+        teams_data = await teams_task
+        team_names = {t.get("wyId"): t.get("name") for t in teams_data.get("teams", [])}
+        if teams_data.get("stale"):
+            marker["partial"] = True
+    except WyscoutError as e:
+        logger.warning(f"Error getting teams for competition {competition_id}: {e}")
+        team_names = {}
+        marker["partial"] = True
+    targets = wanted or set(team_names)
 
     async def fetch_squad(tid):
-        async with sem:
-            try:
-                async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-                    squad_data = await wyscout.get_team_squad(tid)
-                    player_list = squad_data.get("squad", [])
-                    team_name = squad_data.get("team", {}).get("name", "Unknown")
-
-                    players = []
-                    for p in player_list:
-                        wy_id = p.get("wyId")
-                        birth_area = p.get("birthArea", {}).get("name") if p.get("birthArea") else None
-                        passport_area = p.get("passportArea", {}).get("name") if p.get("passportArea") else None
-                        # Construir lista de nacionalidades (sin duplicados)
-                        nationalities = []
-                        if birth_area:
-                            nationalities.append(birth_area)
-                        if passport_area and passport_area != birth_area:
-                            nationalities.append(passport_area)
-                        nationality_str = " / ".join(nationalities) if nationalities else "Unknown"
-
-                        players.append({
-                            "id": str(wy_id or ""),
-                            "name": p.get("shortName", "Unknown"),
-                            "position": p.get("role", {}).get("name", "Unknown"),
-                            "team": team_name,
-                            "wyscout_id": wy_id,
-                            "age": calculate_age(p.get("birthDate")) if p.get("birthDate") else None,
-                            "nationality": nationality_str,
-                            "nationalities": nationalities,
-                            "birthDate": p.get("birthDate"),
-                            "imageDataURL": p.get("imageDataURL"),
-                        })
-                    # Cachear
-                    _squad_cache_data[tid] = (_time_module.time(), players)
-                    return players
-            except Exception as e:
-                logger.warning(f"Error fetching squad {tid}: {e}")
-                return []
-
-    results = await asyncio.gather(*[fetch_squad(tid) for tid in pending_ids])
-    for squad_players in results:
-        cached_players.extend(squad_players)
-
-    # Deduplicar jugadores por wyscout_id (un jugador puede aparecer en múltiples equipos)
-    seen_ids = set()
+        try:
+            squad = await load_squad(wyscout, squad_store, tid)
+        except Exception as e:
+            logger.warning(f"Error fetching squad {tid}: {e}")
+            marker["partial"] = True
+            return tid, []
+        if squad.stale:
+            marker["partial"] = True
+        return tid, squad.players_for(team_names.get(tid))
+
+    covered = set()
+    for tid in targets:
+        if tid in squad_store or wyscout.is_cached(f"/v3/teams/{tid}/squad"):
+            covered.add(tid)
+            yield await fetch_squad(tid)
+
+    listed = set()
+    pages: Dict[str, bool] = {"stale": False}
+    try:
+        async for page in wyscout.iter_pages(f"/v3/competitions/{competition_id}/players", "players", marker=pages):
+            for p in page:
+                remember_players([p], team_names.get(player_team_id(p)))
+            by_team: Dict[Optional[int], List[Dict[str, Any]]] = {}
+            for p in page:
+                tid = player_team_id(p)
+                if (wanted and tid not in wanted) or tid in covered:
+                    continue
+                by_team.setdefault(tid, []).append(p)
+            for tid, players in by_team.items():
+                listed.add(tid)
+                name = team_names.get(tid) or (players[0].get("currentTeam") or {}).get("name") or "Unknown"
+                yield tid, [SquadPlayer.from_wyscout(p).to_dict(name) for p in players]
+    except WyscoutError as e:
+        logger.warning(f"Listado de jugadores de la competición {competition_id} no disponible ({e.message}), usando plantillas")
+        # Equipos a medias: completar con su plantilla (los repetidos se descartan al deduplicar)
+        listed = set()
+        if e.is_upstream_failure:
+            marker["partial"] = True
+    if pages["stale"]:
+        marker["partial"] = True
+
+    # En paralelo: la concurrencia la limita el scheduler global (clase BROWSE)
+    for next_squad in asyncio.as_completed([fetch_squad(tid) for tid in targets - covered - listed]):
+        tid, players = await next_squad
+        if players:
+            yield tid, players
+
+def dedupe_players(players: List[Dict[str, Any]], seen_ids: set) -> List[Dict[str, Any]]:
+    """Deduplicar por wyscout_id de forma incremental (un jugador puede aparecer en varios equipos)."""
     unique_players = []
-    for player in cached_players:
+    for player in players:
         pid = player.get("wyscout_id") or player.get("id")
         if pid and pid not in seen_ids:
             seen_ids.add(pid)
@@ -458,81 +651,341 @@ async def get_competition_players_bulk(
             unique_players.append(player)
     return unique_players
 
-# Caché de squads: {team_id: (timestamp, players_list)}
-_squad_cache: Dict[int, tuple] = {}
+def split_csv(value: str) -> List[str]:
+    return [x.strip() for x in value.split(",") if x.strip()]
 
-@app.get("/api/teams/{team_id}/players", response_model=List[PlayerSearchResponse])
-async def get_players_by_team(team_id: int):
-    """Get players for a specific team (rápido, con caché)"""
-    import time
-    # Revisar caché
-    if team_id in _squad_cache:
-        cached_time, cached_players = _squad_cache[team_id]
-        if time.time() - cached_time < _SQUAD_CACHE_TTL:
-            return cached_players
+async def contract_expiry(wyscout: WyscoutClient, info_cache: PlayerInfoCache, player_id: Optional[int]) -> Optional[str]:
+    """Vencimiento de contrato: del batch-info ya cargado o de contractinfo (cacheado en WyscoutClient)."""
+    if not player_id:
+        return None
+    cached = info_cache.peek(player_id)
+    if cached is not None and cached.contract_expires_at > time.time() and cached.info.contract_expires:
+        return cached.info.contract_expires
+    try:
+        contract = await wyscout.get_player_contract_info(player_id)
+    except WyscoutError as e:
+        logger.warning(f"Error getting contract for {player_id}: {e.message}")
+        return None
+    return contract.get("contractExpiration") or contract.get("contractExpirationDate")
+
+def cached_contract_expiry(
+    wyscout: WyscoutClient, info_cache: PlayerInfoCache, player_id: Optional[int]
+) -> Tuple[bool, Optional[str]]:
+    """(hay datos, vencimiento) sólo con lo ya cacheado: batch-info o contractinfo fresco en WyscoutClient."""
+    if not player_id:
+        return False, None
+    cached = info_cache.peek(player_id)
+    if cached is not None and cached.contract_expires_at > time.time():
+        return True, cached.info.contract_expires
+    contract = wyscout.peek(f"/v3/players/{player_id}/contractinfo")
+    if isinstance(contract, dict):
+        return True, contract.get("contractExpiration") or contract.get("contractExpirationDate")
+    return False, None
+
+def in_contract_window(expires: Optional[str], start: Optional[date], end: Optional[date]) -> bool:
+    # Sin datos de contrato el jugador se mantiene (como hacía el filtro del front)
+    day = (expires or "")[:10]
+    if len(day) != 10:
+        return True
+    return (not start or day >= start.isoformat()) and (not end or day <= end.isoformat())
+
+async def competition_player_index(
+    wyscout: WyscoutClient, squad_store: SquadStore, player_indexes: PlayerIndexCache, competition_id: int, wanted: set
+) -> PlayerIndex:
+    key = (competition_id, tuple(sorted(wanted)))
+    index = player_indexes.get(key)
+    if index is None:
+        seen_ids: set = set()
+        players: List[Dict[str, Any]] = []
+        marker = {"partial": False}
+        async for _, batch in competition_player_batches(wyscout, squad_store, competition_id, wanted, marker):
+            players.extend(dedupe_players(batch, seen_ids))
+        index = PlayerIndex(players, partial=marker["partial"])
+        if index.partial:
+            # Incompleto (fallo o copia degradada): sirve para esta petición, no se cachea
+            player_indexes.partial += 1
+        else:
+            player_indexes.set(key, index)
+    return index
 
+@app.get("/api/competitions/{competition_id}/players")
+async def get_competition_players_bulk(
+    competition_id: int,
+    team_ids: str = Query("", description="Comma-separated team IDs (vacío = toda la competición)"),
+    stream: Optional[str] = Query(None, description="ndjson | sse: enviar cada equipo según llega"),
+    nationality: str = Query("", description="Nacionalidades separadas por comas (cualquiera)"),
+    position: str = Query("", description="Posiciones separadas por comas (Goalkeeper, Defender, ...)"),
+    foot: str = Query("", description="Pie hábil separado por comas (left, right, both)"),
+    min_age: Optional[int] = Query(None, ge=0),
+    max_age: Optional[int] = Query(None, ge=0),
+    contract_from: Optional[date] = Query(None, description="Contrato que vence desde (YYYY-MM-DD)"),
+    contract_to: Optional[date] = Query(None, description="Contrato que vence hasta (YYYY-MM-DD)"),
+    page: Optional[int] = Query(None, ge=1),
+    page_size: int = Query(100, ge=1, le=1000),
+    wyscout: WyscoutClient = Depends(get_wyscout),
+    squad_store: SquadStore = Depends(get_squad_store),
+    player_indexes: PlayerIndexCache = Depends(get_player_indexes),
+    info_cache: PlayerInfoCache = Depends(get_player_info_cache),
+):
+    """Jugadores de una competición, opcionalmente sólo de algunos equipos.
+
+    Con `stream=ndjson` (o `sse`) se emite un frame por tanda de jugadores en
+    cuanto está disponible, ya deduplicados, y un frame final `done`.
+
+    Con filtros o `page` la respuesta pasa a ser paginada
+    (`{players, total, page, page_size, nationalities, partial, contract_unknown}`):
+    nacionalidad, posición, pie y edad se resuelven con un índice en memoria de
+    la competición y el contrato se mira sólo en caché para los jugadores que
+    pasan esos filtros; `contract_unknown` son los wyIds de la página sin datos
+    de contrato. `partial` avisa de que faltó algún equipo (Wyscout no respondió).
+    """
+    set_priority(Priority.BROWSE)
+    wanted = {int(x) for x in team_ids.split(",") if x.strip()}
+
+    filtered = page is not None or any([
+        nationality, position, foot, min_age is not None, max_age is not None, contract_from, contract_to,
+    ])
+    if filtered:
+        if stream is not None:
+            raise HTTPException(status_code=400, detail="Filters and pagination are not available with stream")
+        index = await competition_player_index(wyscout, squad_store, player_indexes, competition_id, wanted)
+        selected = [
+            index.players[i]
+            for i in index.query(split_csv(nationality), split_csv(position), split_csv(foot), min_age, max_age)
+        ]
+        contract_unknown: List[int] = []
+        if contract_from or contract_to:
+            # Sólo contratos ya cacheados: nada de contractinfo en el camino de la petición. Los
+            # que no tienen datos se mantienen (como el filtro del front) y se listan aparte
+            # para que el cliente los pida por batch-info, que los deja en caché.
+            checked = []
+            for p in selected:
+                known, expires = cached_contract_expiry(wyscout, info_cache, p.get("wyscout_id"))
+                if not known:
+                    checked.append(p)
+                elif in_contract_window(expires, contract_from, contract_to):
+                    checked.append({**p, "contractExpires": expires})
+            selected = checked
+        page = page or 1
+        start = (page - 1) * page_size
+        players = selected[start:start + page_size]
+        if contract_from or contract_to:
+            contract_unknown = [p["wyscout_id"] for p in players if "contractExpires" not in p and p.get("wyscout_id")]
+        return {
+            "players": players,
+            "total": len(selected),
+            "page": page,
+            "page_size": page_size,
+            "nationalities": index.nationalities,
+            "partial": index.partial,
+            "contract_unknown": contract_unknown,
+        }
+
+    if stream is None:
+        seen_ids: set = set()
+        unique_players = []
+        async for _, players in competition_player_batches(wyscout, squad_store, competition_id, wanted):
+            unique_players.extend(dedupe_players(players, seen_ids))
+        return unique_players
+
+    if stream not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="stream must be 'ndjson' or 'sse'")
+
+    def frame(event: str, data: Dict[str, Any]) -> str:
+        if stream == "sse":
+            return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        return json.dumps({"type": event, **data}) + "\n"
+
+    async def frames():
+        # Las cabeceras ya salieron: el aviso de datos viejos va en el frame final
+        marker = begin_stale_tracking()
+        seen_ids: set = set()
+        total = 0
+        async for tid, players in competition_player_batches(wyscout, squad_store, competition_id, wanted):
+            unique_players = dedupe_players(players, seen_ids)
+            if unique_players:
+                total += len(unique_players)
+                yield frame("players", {"team_id": tid, "players": unique_players})
+        yield frame("done", {"total": total, "stale": marker["stale"]})
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream" if stream == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+class PlayerQueryRequest(BaseModel):
+    competition_ids: List[int]
+    nationalities: List[str] = []
+    positions: List[str] = []
+    feet: List[str] = []
+    min_age: Optional[int] = None
+    max_age: Optional[int] = None
+    contract_from: Optional[date] = None
+    contract_to: Optional[date] = None
+    limit: int = 500
+
+@app.post("/api/players/query")
+async def query_players(
+    query: PlayerQueryRequest,
+    wyscout: WyscoutClient = Depends(get_wyscout),
+    squad_store: SquadStore = Depends(get_squad_store),
+    player_indexes: PlayerIndexCache = Depends(get_player_indexes),
+    info_cache: PlayerInfoCache = Depends(get_player_info_cache),
+):
+    """Búsqueda de jugadores en varias competiciones a la vez, en NDJSON.
+
+    Por etapas y en paralelo por competición: se indexan sus jugadores
+    (listado paginado + plantillas, reutilizando el índice del browse), se
+    aplican los filtros baratos (edad, posición, pie, nacionalidad) y sólo para
+    los que quedan se consulta contractinfo, si hay filtro de contrato.
+    Frames: `progress`, `players` (según van cualificando, con `competition_id`),
+    `error` por competición fallida (o incompleta, con `partial`) y `done`.
+    """
+    competition_ids = list(dict.fromkeys(query.competition_ids))
+    if not competition_ids:
+        raise HTTPException(status_code=400, detail="competition_ids is required")
+    if len(competition_ids) > settings.PLAYER_QUERY_MAX_COMPETITIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.PLAYER_QUERY_MAX_COMPETITIONS} competitions per query",
+        )
+    limit = max(1, min(query.limit, 5000))
+    check_contracts = bool(query.contract_from or query.contract_to)
+
+    async def frames():
+        set_priority(Priority.BROWSE)
+        marker = begin_stale_tracking()
+        queue: asyncio.Queue = asyncio.Queue()
+        # Tope propio de contractinfo en vuelo: una consulta grande no acapara la clase BROWSE
+        contract_slots = asyncio.Semaphore(settings.PLAYER_QUERY_CONTRACT_CONCURRENCY)
+        progress = {
+            "competitions": len(competition_ids),
+            "competitions_done": 0,
+            "scanned": 0,
+            "candidates": 0,
+            "contracts_checked": 0,
+            "matched": 0,
+        }
+
+        async def checked(player):
+            async with contract_slots:
+                return player, await contract_expiry(wyscout, info_cache, player.get("wyscout_id"))
+
+        async def scan(competition_id):
+            try:
+                index = await competition_player_index(wyscout, squad_store, player_indexes, competition_id, set())
+                candidates = [
+                    {**index.players[i], "competition_id": competition_id}
+                    for i in index.query(query.nationalities, query.positions, query.feet, query.min_age, query.max_age)
+                ]
+                progress["scanned"] += len(index.players)
+                progress["candidates"] += len(candidates)
+                await queue.put(("progress", None))
+                if index.partial:
+                    await queue.put(("error", {
+                        "competition_id": competition_id,
+                        "detail": "Incomplete player list: Wyscout did not answer for some teams",
+                        "partial": True,
+                    }))
+                if not check_contracts:
+                    await queue.put(("players", candidates))
+                    return
+                checks = [asyncio.create_task(checked(p)) for p in candidates]
+                try:
+                    for next_check in asyncio.as_completed(checks):
+                        player, expires = await next_check
+                        progress["contracts_checked"] += 1
+                        if in_contract_window(expires, query.contract_from, query.contract_to):
+                            await queue.put(("players", [{**player, "contractExpires": expires}]))
+                finally:
+                    for task in checks:
+                        task.cancel()
+            except Exception as e:
+                logger.warning(f"Player query: competition {competition_id} failed: {e}")
+                await queue.put(("error", {"competition_id": competition_id, "detail": str(e)}))
+            finally:
+                progress["competitions_done"] += 1
+                await queue.put(("finished", None))
+
+        workers = [asyncio.create_task(scan(cid)) for cid in competition_ids]
+        seen_ids: set = set()
+        pending = len(workers)
+        truncated = False
+        try:
+            while pending:
+                kind, data = await queue.get()
+                if kind == "finished":
+                    pending -= 1
+                    yield json.dumps({"type": "progress", **progress}) + "\n"
+                elif kind == "progress":
+                    yield json.dumps({"type": "progress", **progress}) + "\n"
+                elif kind == "error":
+                    yield json.dumps({"type": "error", **data}) + "\n"
+                else:
+                    unique_players = dedupe_players(data, seen_ids)
+                    players = unique_players[:limit - progress["matched"]]
+                    if players:
+                        progress["matched"] += len(players)
+                        yield json.dumps({"type": "players", "players": players}) + "\n"
+                    if progress["matched"] >= limit:
+                        truncated = len(players) < len(unique_players) or pending > 0
+                        break
+            yield json.dumps({
+                "type": "done",
+                "total": progress["matched"],
+                "truncated": truncated,
+                "stale": marker["stale"],
+            }) + "\n"
+        finally:
+            # Cliente desconectado o límite alcanzado: no seguir gastando cupo de Wyscout
+            for worker in workers:
+                worker.cancel()
+
+    return StreamingResponse(
+        frames(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/teams/{team_id}/players", response_model=List[PlayerSearchResponse])
+async def get_players_by_team(
+    team_id: int,
+    wyscout: WyscoutClient = Depends(get_wyscout),
+    squad_store: SquadStore = Depends(get_squad_store),
+    catalog: CatalogRepository = Depends(get_catalog),
+):
+    """Get players for a specific team (misma plantilla normalizada que el endpoint de competición)"""
     try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-            squad_data = await wyscout.get_team_squad(team_id)
-
-            player_list = squad_data.get("squad", [])
-            team_name = squad_data.get("team", {}).get("name", "Unknown")
-
-            players = []
-            for p in player_list:
-                wy_id = p.get("wyId")
-                birth_area = p.get("birthArea", {}).get("name") if p.get("birthArea") else None
-                passport_area = p.get("passportArea", {}).get("name") if p.get("passportArea") else None
-                nationalities = []
-                if birth_area:
-                    nationalities.append(birth_area)
-                if passport_area and passport_area != birth_area:
-                    nationalities.append(passport_area)
-                nationality_str = " / ".join(nationalities) if nationalities else "Unknown"
-
-                players.append(PlayerSearchResponse(
-                    id=str(wy_id or ""),
-                    name=p.get("shortName", "Unknown"),
-                    position=p.get("role", {}).get("name", "Unknown"),
-                    team=team_name,
-                    wyscout_id=wy_id,
-                    age=calculate_age(p.get("birthDate")) if p.get("birthDate") else None,
-                    nationality=nationality_str,
-                    birthDate=p.get("birthDate"),
-                    contractExpires=None,
-                    marketValue=None,
-                    imageDataURL=p.get("imageDataURL")
-                ))
+        squad = await load_squad(wyscout, squad_store, team_id, catalog)
+        players = [PlayerSearchResponse(**p) for p in squad.players_for()]
 
-            result = sorted(players, key=lambda x: x.position)
-            _squad_cache[team_id] = (time.time(), result)
-            return result
+        return sorted(players, key=lambda x: x.position)
 
     except Exception as e:
         logger.error(f"Error getting team players: {e}")
         raise HTTPException(status_code=500, detail="Failed to get team players")
 
 @app.get("/api/competitions/{competition_id}/matches", response_model=List[MatchResponse])
-async def get_matches_by_competition(competition_id: int, limit: int = Query(20, le=100)):
+async def get_matches_by_competition(competition_id: int, limit: int = Query(20, le=100), wyscout: WyscoutClient = Depends(get_wyscout)):
     """Get recent matches for a specific competition"""
     try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-            matches_data = await wyscout.get_competition_matches(competition_id)
-            
-            matches = []
-            match_list = matches_data.get("matches", [])
-            
-            for match in match_list[:limit]:
-                matches.append(MatchResponse(
-                    id=match.get("matchId"),
-                    label=match.get("label", "Unknown"),
-                    date=match.get("date", "Unknown"),
-                    status=match.get("status", "Unknown"),
-                    competition_name=matches_data.get("competition", {}).get("name")
-                ))
-            
-            return matches
-            
+        matches_data = await wyscout.get_competition_matches(competition_id)
+        
+        matches = []
+        match_list = matches_data.get("matches", [])
+        
+        for match in match_list[:limit]:
+            matches.append(MatchResponse(
+                id=match.get("matchId"),
+                label=match.get("label", "Unknown"),
+                date=match.get("date", "Unknown"),
+                status=match.get("status", "Unknown"),
+                competition_name=matches_data.get("competition", {}).get("name")
+            ))
+        
+        return matches
+        
     except Exception as e:
         logger.error(f"Error getting matches: {e}")
         raise HTTPException(status_code=500, detail="Failed to get matches")
@@ -544,107 +997,261 @@ async def get_matches_by_competition(competition_id: int, limit: int = Query(20,
 @app.get("/api/search/smart")
 async def smart_search(
     query: str = Query(..., min_length=2),
-    search_type: str = Query("all", regex="^(all|teams|players)$")
+    search_type: str = Query("all", regex="^(all|teams|players)$"),
+    wyscout: WyscoutClient = Depends(get_wyscout)
 ):
-    """Smart search that can find teams or players directly"""
+    """Smart search that can find teams or players directly (equipos y jugadores en paralelo)"""
     try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-            results = {
-                "teams": [],
-                "players": []
-            }
-            
-            # Search teams if requested
-            if search_type in ["all", "teams"]:
-                try:
-                    team_results = await wyscout.search_teams(query)
-                    for team in team_results[:5]:
-                        results["teams"].append({
-                            "id": team.get("wyId"),
-                            "name": team.get("name"),
-                            "official_name": team.get("officialName"),
-                            "city": team.get("city"),
-                            "area_name": team.get("area", {}).get("name") if team.get("area") else None
-                        })
-                except:
-                    pass  # Teams search might fail, continue with players
-            
-            # Search players if requested
-            if search_type in ["all", "players"]:
-                try:
-                    player_results = await wyscout.search_players(query)
-                    for player in player_results[:10]:
-                        results["players"].append({
-                            "id": str(player.get("wyId", "")),
-                            "name": player.get("shortName", "Unknown"),
-                            "position": player.get("role", {}).get("name", "Unknown"),
-                            "team": player.get("currentTeam", {}).get("name", "Unknown") if player.get("currentTeam") else "Unknown",
-                            "wyscout_id": player.get("wyId"),
-                            "age": calculate_age(player.get("birthDate")) if player.get("birthDate") else None,
-                            "nationality": player.get("passportArea", {}).get("name", "Unknown") if player.get("passportArea") else "Unknown"
-                        })
-                except:
-                    pass  # Players search might fail
-            
-            return results
-            
+        async def teams():
+            if search_type not in ["all", "teams"]:
+                return []
+            try:
+                return [wyscout_team_hit(team) for team in (await wyscout.search_teams(query))[:5]]
+            except Exception:
+                return []  # Teams search might fail, continue with players
+
+        async def players():
+            if search_type not in ["all", "players"]:
+                return []
+            try:
+                player_results = await wyscout.search_players(query)
+            except Exception:
+                return []  # Players search might fail
+            remember_players(player_results)
+            return [wyscout_player_hit(player) for player in player_results[:10]]
+
+        team_hits, player_hits = await asyncio.gather(teams(), players())
+        return {
+            "teams": [
+                {"id": hit["id"], "name": hit["name"], "official_name": hit["official_name"],
+                 "city": hit["city"], "area_name": hit["area"]["name"]}
+                for hit in team_hits
+            ],
+            "players": [{k: v for k, v in hit.items() if k != "type"} for hit in player_hits],
+        }
+
     except Exception as e:
         logger.error(f"Error in smart search: {e}")
         raise HTTPException(status_code=500, detail="Search failed")
 
+def wyscout_team_hit(team: Dict[str, Any]) -> Dict[str, Any]:
+    area = team.get("area") or {}
+    return {
+        "type": "team",
+        "id": team.get("wyId"),
+        "name": team.get("name"),
+        "official_name": team.get("officialName"),
+        "city": team.get("city"),
+        "area": {"name": area.get("name")},
+        "wyscout_id": team.get("wyId"),
+    }
+
+def wyscout_player_hit(player: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "player",
+        "id": str(player.get("wyId", "")),
+        "name": player.get("shortName", "Unknown"),
+        "position": (player.get("role") or {}).get("name", "Unknown"),
+        "team": (player.get("currentTeam") or {}).get("name", "Unknown"),
+        "wyscout_id": player.get("wyId"),
+        "age": age_from_birth_date(player.get("birthDate")),
+        "nationality": (player.get("passportArea") or {}).get("name", "Unknown"),
+    }
+
+def club_player_hit(row: Dict[str, Any], name: Optional[str], team: Optional[str], nationality: Optional[str]) -> Dict[str, Any]:
+    """Jugador de una tabla del club (jugadores manuales, informes, perfiles)."""
+    wyscout_id = row.get("wyscout_id") or row.get("player_wyscout_id")
+    return {
+        "type": "player",
+        "id": str(wyscout_id or row.get("player_id") or row.get("id") or ""),
+        "name": name,
+        "position": row.get("position") or row.get("position_played"),
+        "team": team,
+        "wyscout_id": wyscout_id,
+        "age": row.get("age") or age_from_birth_date(row.get("birth_date")),
+        "nationality": nationality,
+        "image_url": row.get("image_url"),
+    }
+
+def club_search_sources(query: str, club_id: str) -> List[SearchSource]:
+    """Fuentes de la búsqueda federada con datos del club (Supabase, en un hilo)."""
+    # ilike sobre la palabra más larga tal como se escribió; el ranking fino se hace al unir
+    term = max(query.split(), key=len).replace("%", "").replace("_", "")
+    pattern = f"%{term}%"
+    deadline = settings.FEDERATED_SEARCH_DB_DEADLINE
+
+    def table_source(name: str, select: str, table: str, column: str, club_column: str, to_hit, extra=None):
+        def fetch():
+            q = supabase.table(table).select(select).eq(club_column, club_id).ilike(column, pattern)
+            if extra:
+                q = extra(q)
+            return [to_hit(row) for row in (q.limit(50).execute().data or [])]
+
+        async def run():
+            return await asyncio.to_thread(fetch)
+
+        return SearchSource(name, run, deadline)
+
+    return [
+        table_source(
+            "manual", "*", "players", "name", "organization_id",
+            lambda r: club_player_hit(r, r.get("name"), r.get("current_team_name"), r.get("passport_area")),
+            lambda q: q.eq("manually_created", True),
+        ),
+        table_source(
+            "manual_players", "*", "manual_players", "player_name", "club_id",
+            lambda r: club_player_hit(r, r.get("player_name"), r.get("team") or r.get("current_team"), r.get("nationality")),
+        ),
+        table_source(
+            "scout_reports", "id,player_id,player_name,player_wyscout_id,position_played", "scout_reports", "player_name", "club_id",
+            lambda r: club_player_hit(r, r.get("player_name"), None, None),
+        ),
+        table_source(
+            "player_profiles", "*", "player_profiles", "player_name", "club_id",
+            lambda r: club_player_hit(r, r.get("player_name"), r.get("current_team"), r.get("nationality")),
+        ),
+    ]
+
+# Cada fuente devuelve siempre hasta el máximo de `limit`: sus resultados se cachean por
+# consulta y el `limit` de cada petición se aplica al unir (merge_hits)
+FEDERATED_SOURCE_LIMIT = 50
+
+@app.get("/api/search/federated")
+async def federated_search(
+    query: str = Query(..., min_length=2),
+    search_type: str = Query("all", regex="^(all|teams|players)$"),
+    limit: int = Query(20, ge=1, le=FEDERATED_SOURCE_LIMIT),
+    current_user: dict = Depends(get_current_user),
+    wyscout: WyscoutClient = Depends(get_wyscout),
+    federated: FederatedSearch = Depends(get_federated_search),
+):
+    """Búsqueda rápida sobre todas las fuentes a la vez.
+
+    Wyscout (jugadores y equipos), el catálogo local de jugadores y los datos
+    del club (jugadores manuales, informes, perfiles) se consultan en paralelo,
+    cada uno con su plazo; se devuelve lo que llegó a tiempo, unido y ordenado.
+    `sources` dice qué pasó con cada fuente y `partial` si faltó alguna.
+    """
+    club_id = current_user.get("club_id")
+    wyscout_deadline = settings.FEDERATED_SEARCH_WYSCOUT_DEADLINE
+    sources: List[SearchSource] = []
+
+    if search_type in ["all", "players"]:
+        async def catalog():
+            return [
+                {**catalog_search_response(player).dict(), "type": "player"}
+                for _, player in PLAYER_SEARCH.search(query, FEDERATED_SOURCE_LIMIT)
+            ]
+
+        async def wyscout_players():
+            player_results = await wyscout.search_players(query)
+            remember_players(player_results)
+            return [wyscout_player_hit(player) for player in player_results[:FEDERATED_SOURCE_LIMIT]]
+
+        sources.append(SearchSource("catalog", catalog, wyscout_deadline))
+        sources.append(SearchSource("wyscout_players", wyscout_players, wyscout_deadline))
+        if club_id and supabase_service and query.split():
+            sources.extend(club_search_sources(query, club_id))
+
+    if search_type in ["all", "teams"]:
+        async def wyscout_teams():
+            return [wyscout_team_hit(team) for team in (await wyscout.search_teams(query))[:10]]
+
+        sources.append(SearchSource("wyscout_teams", wyscout_teams, wyscout_deadline))
+
+    results, status = await federated.search((club_id, search_type, " ".join(tokens(query))), sources)
+    return {
+        "query": query,
+        "results": merge_hits(query, results, limit),
+        "sources": status,
+        "partial": any(s in ("timeout", "error") for s in status.values()),
+    }
+
 # ==============================================
 # LEGACY SEARCH (mantener compatibilidad)
 # ==============================================
 
+def catalog_search_response(player: CatalogPlayer) -> PlayerSearchResponse:
+    return PlayerSearchResponse(
+        id=str(player.wyscout_id),
+        name=player.name,
+        position=player.position or "Unknown",
+        team=player.team or "Sin equipo",
+        wyscout_id=player.wyscout_id,
+        age=age_from_birth_date(player.birth_date),
+        nationality=player.nationality or "Unknown",
+    )
+
 @app.get("/api/search/players", response_model=List[PlayerSearchResponse])
 async def search_players(
     query: str = Query(..., min_length=2),
-    limit: int = Query(10, le=50)
+    limit: int = Query(10, le=50),
+    wyscout: WyscoutClient = Depends(get_wyscout)
 ):
-    """Legacy player search endpoint """
+    """Legacy player search endpoint
+
+    Primero el índice local (jugadores ya vistos, con erratas y prefijos); si
+    tiene suficientes coincidencias buenas se responde sin ir a Wyscout. Si no,
+    se completa con /v3/search.
+    """
     try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-            wyscout_results = await wyscout.search_players(query, limit=limit)
-            sliced = wyscout_results[:limit]
-
-            # Wyscout /v3/search returns minimal data without team info.
-            # Enriquecemos en paralelo cada jugador con /v3/players/{id}?details=currentTeam.
-            async def enrich(player: dict):
-                wy_id = player.get("wyId")
-                if not wy_id:
-                    return player
-                try:
-                    full = await wyscout.get_player(wy_id, details="currentTeam")
-                    if isinstance(full, dict):
-                        return {**player, **full}
-                except Exception as e:
-                    logger.warning(f"No se pudo enriquecer wyId={wy_id}: {e}")
+        local = PLAYER_SEARCH.search(query, limit)
+        strong = [player for score, player in local if score >= settings.PLAYER_SEARCH_STRONG_SCORE]
+        if len(strong) >= min(limit, settings.PLAYER_SEARCH_MIN_LOCAL_RESULTS):
+            return [catalog_search_response(player) for _, player in local]
+
+        wyscout_results = await wyscout.search_players(query, limit=limit)
+        remember_players(wyscout_results)
+        known = {player.wyscout_id for player in strong}
+        sliced = [p for p in wyscout_results if p.get("wyId") not in known][:max(0, limit - len(strong))]
+
+        # Wyscout /v3/search returns minimal data without team info.
+        # Enriquecemos en paralelo con /v3/players/{id}?details=currentTeam sólo
+        # a los que el catálogo local no conoce ya con equipo.
+        async def enrich(player: dict):
+            wy_id = player.get("wyId")
+            if not wy_id:
+                return player
+            cataloged = PLAYER_SEARCH.get(wy_id)
+            if cataloged is not None and cataloged.team:
                 return player
+            try:
+                full = await wyscout.get_player(wy_id, details="currentTeam")
+                if isinstance(full, dict):
+                    remember_players([full])
+                    return {**player, **full}
+            except Exception as e:
+                logger.warning(f"No se pudo enriquecer wyId={wy_id}: {e}")
+            return player
 
-            enriched = await asyncio.gather(*[enrich(p) for p in sliced], return_exceptions=False)
-
-            players = []
-            for player in enriched:
-                first = (player.get("firstName") or "").strip()
-                last = (player.get("lastName") or "").strip()
-                full_name = f"{first} {last}".strip() or player.get("shortName") or "Unknown"
-
-                team_obj = player.get("currentTeam") or {}
-                team_name = team_obj.get("name") if isinstance(team_obj, dict) else None
-                if not team_name:
-                    team_name = "Sin equipo"
-
-                players.append(PlayerSearchResponse(
-                    id=str(player.get("wyId", "")),
-                    name=full_name,
-                    position=(player.get("role") or {}).get("name", "Unknown"),
-                    team=team_name,
-                    wyscout_id=player.get("wyId"),
-                    age=calculate_age(player.get("birthDate")) if player.get("birthDate") else None,
-                    nationality=(player.get("passportArea") or {}).get("name", "Unknown")
-                ))
+        enriched = await asyncio.gather(*[enrich(p) for p in sliced], return_exceptions=False)
 
-            return players
+        players = [catalog_search_response(player) for player in strong]
+        for player in enriched:
+            cataloged = PLAYER_SEARCH.get(player.get("wyId"))
+            if cataloged is not None:
+                players.append(catalog_search_response(cataloged))
+                continue
+            first = (player.get("firstName") or "").strip()
+            last = (player.get("lastName") or "").strip()
+            full_name = f"{first} {last}".strip() or player.get("shortName") or "Unknown"
+
+            team_obj = player.get("currentTeam") or {}
+            team_name = team_obj.get("name") if isinstance(team_obj, dict) else None
+            if not team_name:
+                team_name = "Sin equipo"
+
+            players.append(PlayerSearchResponse(
+                id=str(player.get("wyId", "")),
+                name=full_name,
+                position=(player.get("role") or {}).get("name", "Unknown"),
+                team=team_name,
+                wyscout_id=player.get("wyId"),
+                age=age_from_birth_date(player.get("birthDate")),
+                nationality=(player.get("passportArea") or {}).get("name", "Unknown")
+            ))
+
+        return players
 
     except Exception as e:
         logger.error(f"Error searching players: {e}")
@@ -654,32 +1261,30 @@ async def search_players(
 # ==============================================
 
 @app.get("/api/player/{player_id}")
-async def get_player_details(player_id: int):
+async def get_player_details(player_id: int, catalog: CatalogRepository = Depends(get_catalog)):
     try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-            player = await wyscout.get_player(player_id, details="currentTeam")
-            return player
+        player = await catalog.get_player(player_id, details="currentTeam")
+        remember_players([player])
+        return player
     except Exception as e:
         logger.error(f"Error getting player details: {e}")
         raise HTTPException(status_code=500, detail="Failed to get player details")
 
 @app.get("/api/player/{player_id}/matches")
-async def get_player_matches(player_id: int):
+async def get_player_matches(player_id: int, wyscout: WyscoutClient = Depends(get_wyscout)):
     try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-            matches = await wyscout.get_player_matches(player_id)
-            return matches
+        matches = await wyscout.get_player_matches(player_id)
+        return matches
     except Exception as e:
         logger.error(f"Error getting player matches: {e}")
         raise HTTPException(status_code=500, detail="Failed to get player matches")
 
 @app.get("/api/match/{match_id}/players")
-async def get_match_players(match_id: int):
+async def get_match_players(match_id: int, wyscout: WyscoutClient = Depends(get_wyscout)):
     """Get players who participated in a specific match"""
     try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-            match_data = await wyscout.get_match_players(match_id)
-            return match_data
+        match_data = await wyscout.get_match_players(match_id)
+        return match_data
     except Exception as e:
         logger.error(f"Error getting match players: {e}")
         raise HTTPException(status_code=500, detail="Failed to get match players")
@@ -828,8 +1433,6 @@ class ScoutReportResponse(BaseModel):
 # In-memory storage
 scout_reports = []
 
-competition_cache = {}
-
 @app.post("/api/scout-reports", response_model=ScoutReportResponse)
 async def create_scout_report(
     report: ScoutReportCreate,
@@ -837,6 +1440,7 @@ async def create_scout_report(
 ):
     try:
         report_data = report.dict()
+        remember_player_name(report.player_name, report.player_wyscout_id)
         
         # Información del usuario
         report_data['created_by'] = current_user['id']
@@ -1023,24 +1627,28 @@ async def get_all_player_reports(player_id: str):
 # UTILITY ENDPOINTS
 # ==============================================
 
-@app.get("/api/sync/areas")
-async def sync_areas():
-   try:
-       async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-           areas_data = await wyscout.get_areas()
-           
-           return {
-               "message": f"Found {len(areas_data)} areas from Wyscout",
-               "areas": areas_data[:10]
-           }
-           
-   except Exception as e:
-       logger.error(f"Error syncing areas: {e}")
-       raise HTTPException(status_code=500, detail="Sync failed")
+@app.post("/api/sync/run")
+async def run_catalog_sync(
+    force: bool = Query(False, description="Reescribir todo sin mirar last_sync"),
+    current_user: dict = Depends(get_admin_user),
+    catalog_sync: CatalogSync = Depends(get_catalog_sync),
+):
+    """Lanza una pasada de sincronización Wyscout -> base de datos en segundo plano"""
+    started = catalog_sync.start(force)
+    return {"started": started, **catalog_sync.stats()}
+
+@app.get("/api/sync/status")
+async def catalog_sync_status(
+    current_user: dict = Depends(get_admin_user),
+    catalog_sync: CatalogSync = Depends(get_catalog_sync),
+):
+    """Estado de la sincronización y resumen de la última pasada"""
+    return catalog_sync.stats()
+
    # Agregar estos endpoints al archivo backend/app/main.py
 # (agregar después de los endpoints existentes)
 
-async def process_career_data_async(career_raw, wyscout_client):
+async def process_career_data_async(career_raw, metadata: MetadataResolver):
     """Process career data - Con nombres reales de competiciones"""
     if not career_raw or "career" not in career_raw:
         return []
@@ -1049,50 +1657,18 @@ async def process_career_data_async(career_raw, wyscout_client):
     career_list = career_raw["career"]
     
     # Solo últimas 6 entradas
-    recent_entries = career_list[-6:]
+    recent_entries = [e for e in career_list[-6:] if e.get("appearances", 0) > 0]
+    
+    # Equipos y competiciones de todas las entradas en un solo lote
+    resolved = await metadata.resolve(
+        team_ids=(e.get("teamId") for e in recent_entries),
+        competition_ids=(e.get("competitionId") for e in recent_entries),
+    )
     
     for entry in recent_entries:
-        if entry.get("appearances", 0) == 0:
-            continue
-        
-        team_id = entry.get("teamId")
-        competition_id = entry.get("competitionId")
         season_id = entry.get("seasonId")
-        
-        # EQUIPO - Una consulta
-        team_name = "Equipo Desconocido"
-        try:
-            if team_id:
-                team_data = await wyscout_client.get_team(team_id)
-                if team_data:
-                    team_name = team_data.get("name", "Equipo Desconocido")
-        except:
-            pass
-        
-        # COMPETICIÓN - Usar el sistema que ya funciona
-        competition_name = "Liga Desconocida"
-        if competition_id:
-            if competition_id in competition_cache:
-                competition_name = competition_cache[competition_id]
-            else:
-                try:
-                    credentials = f"{settings.wyscout_user}:{settings.wyscout_pass}"
-                    encoded = base64.b64encode(credentials.encode()).decode()
-                    headers = {"Authorization": f"Basic {encoded}"}
-                    
-                    async with httpx.AsyncClient() as client:
-                        response = await client.get(
-                            f"https://apirest.wyscout.com/v3/competitions/{competition_id}",
-                            headers=headers,
-                            timeout=5.0
-                        )
-                        
-                        if response.status_code == 200:
-                            comp_data = response.json()
-                            competition_name = comp_data.get("name", "Liga Desconocida")
-                            competition_cache[competition_id] = competition_name
-                except:
-                    competition_name = "Liga Desconocida"
+        team_name = resolved.team_name(entry.get("teamId"), "Equipo Desconocido")
+        competition_name = resolved.competition_name(entry.get("competitionId"), "Liga Desconocida")
         
         # Estimación de temporada
         if season_id and season_id > 190000:
@@ -1164,72 +1740,20 @@ def process_transfers(transfers_raw):
     return transfers_list
 
 
-async def process_career_data_enhanced(career_raw, wyscout_client):
-    """Enhanced career data processing - parallel fetching for speed"""
+async def process_career_data_enhanced(career_raw, metadata: MetadataResolver):
+    """Enhanced career data processing - equipos, competiciones y temporadas en un solo lote"""
     if not career_raw or "career" not in career_raw:
         return []
 
     career_list = career_raw["career"]
     entries_with_apps = [e for e in career_list if e.get("appearances", 0) > 0]
 
-    # Collect unique IDs to fetch
-    team_ids = set()
-    comp_ids = set()
-    season_ids = set()
-    for entry in entries_with_apps:
-        if entry.get("teamId"): team_ids.add(entry["teamId"])
-        cid = entry.get("competitionId")
-        if cid and cid not in competition_cache: comp_ids.add(cid)
-        sid = entry.get("seasonId")
-        if sid and sid not in season_cache: season_ids.add(sid)
-
-    # Fetch all teams, competitions, seasons in parallel
-    credentials = f"{settings.wyscout_user}:{settings.wyscout_pass}"
-    encoded = base64.b64encode(credentials.encode()).decode()
-    headers = {"Authorization": f"Basic {encoded}"}
-
-    team_data_map = {}
-    comp_data_map = {}
-    season_data_map = {}
-
-    async def fetch_team(tid):
-        try:
-            data = await wyscout_client.get_team(tid)
-            if data: team_data_map[tid] = data
-        except:
-            pass
-
-    async def fetch_comp(cid):
-        try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(f"https://apirest.wyscout.com/v3/competitions/{cid}", headers=headers, timeout=5.0)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    name = data.get("name", "Liga Desconocida")
-                    comp_data_map[cid] = name
-                    competition_cache[cid] = name
-        except:
-            pass
-
-    async def fetch_season(sid):
-        try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(f"https://apirest.wyscout.com/v3/seasons/{sid}", headers=headers, timeout=5.0)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    name = data.get("name", "")
-                    if name:
-                        season_data_map[sid] = name
-                        season_cache[sid] = name
-        except:
-            pass
-
-    # Run ALL fetches in parallel
-    await asyncio.gather(
-        *[fetch_team(tid) for tid in team_ids],
-        *[fetch_comp(cid) for cid in comp_ids],
-        *[fetch_season(sid) for sid in season_ids],
+    resolved = await metadata.resolve(
+        team_ids=(e.get("teamId") for e in entries_with_apps),
+        competition_ids=(e.get("competitionId") for e in entries_with_apps),
+        season_ids=(e.get("seasonId") for e in entries_with_apps),
     )
+    team_data_map = resolved.teams
 
     # Build timeline using cached/fetched data
     career_timeline = []
@@ -1248,13 +1772,8 @@ async def process_career_data_enhanced(career_raw, wyscout_client):
             area = td.get("area", {})
             team_country = area.get("name", "") if isinstance(area, dict) else ""
 
-        competition_name = "Liga Desconocida"
-        if competition_id:
-            competition_name = competition_cache.get(competition_id, comp_data_map.get(competition_id, "Liga Desconocida"))
-
-        season_name = ""
-        if season_id:
-            season_name = season_cache.get(season_id, season_data_map.get(season_id, ""))
+        competition_name = resolved.competition_name(competition_id, "Liga Desconocida")
+        season_name = resolved.season_name(season_id)
 
         if not season_name:
             if season_id and season_id > 190000: season_name = "2024/25"
@@ -1298,260 +1817,324 @@ class BatchInfoRequest(BaseModel):
     player_names: Optional[List[str]] = []
     skip_contract: Optional[bool] = False
 
-# In-memory cache for batch player info (persists across requests)
-_player_info_cache: Dict[str, Any] = {}
-
-@app.post("/api/players/batch-info")
-async def get_players_batch_info(request: BatchInfoRequest):
-    """Get basic info for multiple players - parallel + cached."""
-    try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-            results = {}
-
-            # Return cached results immediately
-            names_to_resolve = []
-            ids_to_fetch = []
-
-            for pid in (request.player_ids or []):
-                key = str(pid)
-                if key in _player_info_cache:
-                    results[key] = _player_info_cache[key]
-                else:
-                    ids_to_fetch.append(pid)
-
-            for name in (request.player_names or []):
-                key = f"name:{name}"
-                if key in _player_info_cache:
-                    results[key] = _player_info_cache[key]
-                else:
-                    names_to_resolve.append(name)
+async def batch_info_updates(
+    body: BatchInfoRequest, wyscout: WyscoutClient, info_cache: PlayerInfoCache, summary: Dict[str, int]
+) -> AsyncIterator[Dict[str, Dict[str, Any]]]:
+    """Resultados de batch-info por tandas `{clave: ficha}`.
+
+    Primero, de una vez, todo lo servible desde caché (lo caducado dentro de
+    la ventana stale se refresca en segundo plano); después cada jugador que
+    hubo que pedir a Wyscout, en cuanto llega. Los nombres que no estaban
+    resueltos se buscan mientras tanto. `summary` acumula los contadores.
+    """
+    need_contract = not body.skip_contract
+    names = list(dict.fromkeys(body.player_names or []))
+    ids_to_names: Dict[int, List[str]] = {}
+    handled: set = set()
+    pending: set = set()
+
+    def payload(pid, info: PlayerInfo) -> Dict[str, Dict[str, Any]]:
+        # El caché guarda registros compactos; el JSON se arma aquí
+        data = info.to_dict()
+        frame = {str(pid): data}
+        for name in ids_to_names.get(pid, ()):
+            frame[f"name:{name}"] = data
+        return frame
+
+    async def resolve_name(name):
+        try:
+            sr = await wyscout.search_players(name)
+            remember_players(sr)
+            if sr and len(sr) > 0:
+                return name, sr[0].get("wyId")
+        except:
+            pass
+        return name, None
 
-            # Resolve names to IDs in parallel
-            async def resolve_name(name):
-                try:
-                    sr = await wyscout.search_players(name)
-                    if sr and len(sr) > 0:
-                        return name, sr[0].get("wyId")
-                except:
-                    pass
-                return name, None
+    async def fetch_player_info(pid, bio: bool, contract: bool) -> Optional[CachedPlayerInfo]:
+        """Pide a Wyscout sólo las partes caducadas y actualiza la caché.
 
-            if names_to_resolve:
-                resolve_tasks = [resolve_name(n) for n in names_to_resolve]
-                resolve_results = await asyncio.gather(*resolve_tasks)
-                name_to_id = {n: wid for n, wid in resolve_results if wid}
+        Revalidando (sin la caché del cliente): esta caché pone su propio TTL
+        y una copia del cliente a punto de caducar duraría casi el doble."""
+        previous = info_cache.peek(pid)
+        bio = bio or previous is None
+        try:
+            calls = []
+            if bio:
+                calls.append(wyscout.get(
+                    f"/v3/players/{pid}", params={"imageDataURL": "true", "details": "currentTeam"}, revalidate=True,
+                ))
+            if contract:
+                calls.append(wyscout.get_player_contract_info(pid, revalidate=True))
+            responses = await asyncio.gather(*calls, return_exceptions=True)
+
+            contract_data = responses[-1] if contract else None
+            if isinstance(contract_data, Exception) or (isinstance(contract_data, dict) and contract_data.get("stale")):
+                # Sin contrato nuevo: no marcar como fresca una copia degradada
+                contract_data = None
+            if bio:
+                player = responses[0]
+                if isinstance(player, Exception):
+                    logger.warning(f"Player fetch failed for {pid}: {player}")
+                    return None
+                remember_players([player])
+                info = PlayerInfo(player, contract_data)
+                if contract_data is None and previous is not None and previous.contract_expires_at:
+                    # Contrato vigente en caché: conservarlo al renovar los datos del jugador
+                    info.contract_expires = previous.info.contract_expires
+                    info.market_value = previous.info.market_value
+                    info.agent = previous.info.agent
+                if player.get("stale"):
+                    # Copia degradada (Wyscout no respondió): la que ya había aquí o ésta, sin guardarla como fresca
+                    return previous if previous is not None else CachedPlayerInfo(info, 0, 0)
             else:
-                name_to_id = {}
-
-            id_to_name = {v: k for k, v in name_to_id.items()}
-            all_new_ids = list(set(ids_to_fetch + list(name_to_id.values())))
-
-            # Fetch player info (optionally with contract)
-            skip_contract = request.skip_contract or False
+                info = previous.info
+                info.set_contract(contract_data)
+            return info_cache.store(pid, info, bio=bio, contract=contract_data is not None)
+        except Exception as e:
+            logger.warning(f"Error fetching player {pid}: {e}")
+            return None
+
+    async def fetch_one(pid, bio, contract, fallback: Optional[CachedPlayerInfo]):
+        entry = await fetch_player_info(pid, bio, contract)
+        if entry is None and fallback is not None:
+            # Wyscout no respondió: mejor la copia vieja que nada
+            return pid, fallback.info
+        return pid, entry.info if entry else None
+
+    async def plan(pids: List[int]) -> Tuple[Dict[str, Dict[str, Any]], List[asyncio.Task]]:
+        """Sirve lo cacheado y lanza las peticiones del resto."""
+        ready: Dict[str, Dict[str, Any]] = {}
+        tasks = []
+        cached = await info_cache.get_many(pids)
+        for pid in pids:
+            handled.add(pid)
+            entry = cached.get(pid)
+            serve, bio, contract = info_cache.plan(entry, need_contract)
+            info_cache.record(serve, bio or contract)
+            if serve:
+                ready.update(payload(pid, entry.info))
+                summary["cached"] += 1
+                if bio or contract:
+                    info_cache.refresh_in_background(pid, lambda pid=pid, bio=bio, contract=contract: fetch_player_info(pid, bio, contract))
+            else:
+                pending.add(pid)
+                tasks.append(asyncio.create_task(fetch_one(pid, bio, contract, entry)))
+        return ready, tasks
+
+    # Nombres ya resueltos alguna vez (clave sin tildes ni mayúsculas) y, si no,
+    # el índice local de jugadores vistos; la búsqueda de Wyscout queda para los desconocidos
+    name_to_id = await info_cache.resolve_names(names)
+    for name in names:
+        if name not in name_to_id:
+            wid = NAMES.resolve(name)
+            if wid:
+                name_to_id[name] = wid
+                info_cache.remember_name(name, wid)
+    for name, pid in name_to_id.items():
+        ids_to_names.setdefault(pid, []).append(name)
+
+    tasks: List[asyncio.Task] = []
+    try:
+        ready, tasks = await plan(list(dict.fromkeys(list(body.player_ids or []) + list(name_to_id.values()))))
+        if ready:
+            yield ready
+
+        # El resto de nombres se busca mientras corren las peticiones de los ids
+        unresolved = [n for n in names if n not in name_to_id]
+        if unresolved:
+            new_ids = []
+            late: Dict[str, Dict[str, Any]] = {}
+            for name, wid in await asyncio.gather(*[resolve_name(n) for n in unresolved]):
+                if not wid:
+                    continue
+                info_cache.remember_name(name, wid)
+                ids_to_names.setdefault(wid, []).append(name)
+                if wid not in handled:
+                    new_ids.append(wid)
+                elif wid not in pending:
+                    # Ya servido desde caché arriba: sólo falta la clave por nombre
+                    cached = info_cache.peek(wid)
+                    if cached is not None:
+                        late.update(payload(wid, cached.info))
+            ready, more = await plan(list(dict.fromkeys(new_ids)))
+            tasks.extend(more)
+            late.update(ready)
+            if late:
+                yield late
+
+        for next_fetch in asyncio.as_completed(tasks):
+            pid, info = await next_fetch
+            pending.discard(pid)
+            if info is None:
+                summary["failed"] += 1
+                continue
+            summary["fetched"] += 1
+            yield payload(pid, info)
+        await info_cache.flush()
+    finally:
+        # Cliente desconectado: no seguir pidiendo (lo no escrito a disco queda para el próximo flush)
+        for task in tasks:
+            task.cancel()
 
-            async def fetch_player_info(pid):
-                try:
-                    player_task = wyscout.get(f"/v3/players/{pid}", params={"imageDataURL": "true", "details": "currentTeam"})
-
-                    if skip_contract:
-                        player = await player_task
-                        contract = None
-                    else:
-                        contract_task = wyscout.get_player_contract_info(pid)
-                        player, contract = await asyncio.gather(player_task, contract_task, return_exceptions=True)
-
-                    # Handle player data
-                    if isinstance(player, Exception):
-                        logger.warning(f"Player fetch failed for {pid}: {player}")
-                        return pid, None
-
-                    current_team = player.get("currentTeam", {}) or {}
-                    if not isinstance(current_team, dict):
-                        current_team = {}
-
-                    age = None
-                    bd = player.get("birthDate")
-                    if bd:
-                        try:
-                            birth = datetime.strptime(bd[:10], "%Y-%m-%d")
-                            today = datetime.today()
-                            age = today.year - birth.year - ((today.month, today.day) < (birth.month, birth.day))
-                        except:
-                            pass
-
-                    passport = player.get("passportArea", {}) or {}
-                    role = player.get("role", {}) or {}
-                    birth_area = player.get("birthArea", {}) or {}
-
-                    # Handle contract data
-                    contract_expires = None
-                    market_value = None
-                    agent = None
-                    if not skip_contract and not isinstance(contract, Exception) and isinstance(contract, dict):
-                        contract_expires = contract.get("contractExpiration") or contract.get("contractExpirationDate")
-                        market_value = contract.get("marketValue")
-                        agent = contract.get("agentName") or contract.get("agent")
-
-                    if not contract_expires:
-                        contract_expires = player.get("contractExpirationDate")
-
-                    return pid, {
-                        "player_image": player.get("imageDataURL"),
-                        "short_name": player.get("shortName"),
-                        "team_name": current_team.get("name"),
-                        "team_image": current_team.get("imageDataURL"),
-                        "age": age,
-                        "birth_date": bd,
-                        "height": player.get("height"),
-                        "weight": player.get("weight"),
-                        "foot": player.get("foot"),
-                        "nationality": passport.get("name") if isinstance(passport, dict) else None,
-                        "nationality_code": passport.get("alpha3code") if isinstance(passport, dict) else None,
-                        "birth_country": birth_area.get("name") if isinstance(birth_area, dict) else None,
-                        "position": role.get("name") if isinstance(role, dict) else None,
-                        "contract_expires": contract_expires,
-                        "market_value": market_value,
-                        "agent": agent,
-                    }
-                except Exception as e:
-                    logger.warning(f"Error fetching player {pid}: {e}")
-                    return pid, None
-
-            if all_new_ids:
-                sem = asyncio.Semaphore(5)
-                async def fetch_with_sem(pid):
-                    async with sem:
-                        return await fetch_player_info(pid)
-                fetch_tasks = [fetch_with_sem(pid) for pid in all_new_ids]
-                fetch_results = await asyncio.gather(*fetch_tasks)
-
-                for pid, info_data in fetch_results:
-                    if info_data:
-                        # Cache and store by ID
-                        _player_info_cache[str(pid)] = info_data
-                        results[str(pid)] = info_data
-                        # Also by name
-                        if pid in id_to_name:
-                            _player_info_cache[f"name:{id_to_name[pid]}"] = info_data
-                            results[f"name:{id_to_name[pid]}"] = info_data
-
-            logger.info(f"Batch-info returning {len(results)} results ({len(all_new_ids)} fetched, rest from cache)")
-            return results
-    except Exception as e:
-        logger.error(f"Error in batch player info: {e}")
-        return {}
+@app.post("/api/players/batch-info")
+async def get_players_batch_info(
+    request: BatchInfoRequest,
+    stream: Optional[str] = Query(None, description="ndjson | sse: cacheados al momento y luego cada jugador según llega"),
+    wyscout: WyscoutClient = Depends(get_wyscout),
+    info_cache: PlayerInfoCache = Depends(get_player_info_cache),
+):
+    """Get basic info for multiple players - parallel + cached.
+
+    Lo cacheado se devuelve al momento aunque haya caducado (dentro de la
+    ventana stale, y se refresca en segundo plano); sólo se espera a Wyscout
+    por lo que no está o es demasiado viejo. Con `stream=ndjson` (o `sse`) se
+    emite un frame `players` con lo cacheado, otro por cada jugador pedido y
+    un frame final `done` con el resumen.
+    """
+    set_priority(Priority.BROWSE)
+    if stream is not None and stream not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="stream must be 'ndjson' or 'sse'")
+
+    if stream is None:
+        summary = {"cached": 0, "fetched": 0, "failed": 0}
+        results: Dict[str, Dict[str, Any]] = {}
+        try:
+            async for update in batch_info_updates(request, wyscout, info_cache, summary):
+                results.update(update)
+        except Exception as e:
+            logger.error(f"Error in batch player info: {e}")
+            return {}
+        logger.info(f"Batch-info returning {len(results)} results ({summary['fetched']} fetched, rest from cache)")
+        return results
+
+    def frame(event: str, data: Dict[str, Any]) -> str:
+        if stream == "sse":
+            return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        return json.dumps({"type": event, **data}) + "\n"
+
+    async def frames():
+        # Las cabeceras ya salieron: el aviso de datos viejos va en el frame final
+        marker = begin_stale_tracking()
+        summary = {"cached": 0, "fetched": 0, "failed": 0}
+        try:
+            async for update in batch_info_updates(request, wyscout, info_cache, summary):
+                yield frame("players", {"players": update})
+        except Exception as e:
+            logger.error(f"Error in batch player info stream: {e}")
+            yield frame("error", {"detail": "Batch info failed"})
+        yield frame("done", {**summary, "stale": marker["stale"]})
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream" if stream == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/player/{player_id}/profile")
-async def get_player_profile(player_id: int):
+async def get_player_profile(
+    player_id: int,
+    wyscout: WyscoutClient = Depends(get_wyscout),
+    metadata: MetadataResolver = Depends(get_metadata),
+):
     """Get complete player profile with all data from Wyscout"""
     try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
 
-            # --- Funciones auxiliares para paralelizar ---
-            async def fetch_player():
-                try:
-                    p = await wyscout.get(f"/v3/players/{player_id}", params={"imageDataURL": "true", "details": "currentTeam"})
-                    logger.info(f"Player loaded: {p.get('shortName')}")
-                    return p
-                except Exception as e:
-                    logger.error(f"Error getting player {player_id}: {e}")
-                    return {"wyId": player_id, "shortName": f"Player {player_id}"}
-
-            async def fetch_career():
-                try:
-                    credentials = f"{settings.wyscout_user}:{settings.wyscout_pass}"
-                    encoded = base64.b64encode(credentials.encode()).decode()
-                    headers = {"Authorization": f"Basic {encoded}"}
-                    async with httpx.AsyncClient() as client:
-                        response = await client.get(
-                            f"https://apirest.wyscout.com/v3/players/{player_id}/career",
-                            headers=headers,
-                            timeout=15.0
-                        )
-                    if response.status_code == 200:
-                        return response.json()
-                    else:
-                        logger.warning(f"Career API error: {response.status_code}")
-                        return None
-                except Exception as e:
-                    logger.error(f"Error getting career: {e}")
-                    return None
+        # --- Funciones auxiliares para paralelizar ---
+        async def fetch_player():
+            try:
+                p = await wyscout.get(f"/v3/players/{player_id}", params={"imageDataURL": "true", "details": "currentTeam"})
+                logger.info(f"Player loaded: {p.get('shortName')}")
+                return p
+            except Exception as e:
+                logger.error(f"Error getting player {player_id}: {e}")
+                return {"wyId": player_id, "shortName": f"Player {player_id}"}
 
-            async def fetch_contract():
-                try:
-                    return await wyscout.get_player_contract_info(player_id)
-                except Exception as e:
-                    logger.warning(f"Contract info not available: {e}")
-                    return None
+        async def fetch_career():
+            try:
+                return await wyscout.get_player_career(player_id)
+            except WyscoutError as e:
+                logger.warning(f"Career API error: {e.status_code}")
+                return None
+            except Exception as e:
+                logger.error(f"Error getting career: {e}")
+                return None
 
-            async def fetch_transfers():
-                try:
-                    return await wyscout.get_player_transfers(player_id)
-                except Exception as e:
-                    logger.warning(f"Error getting transfers: {e}")
-                    return None
+        async def fetch_contract():
+            try:
+                return await wyscout.get_player_contract_info(player_id)
+            except Exception as e:
+                logger.warning(f"Contract info not available: {e}")
+                return None
 
-            # --- Ejecutar todas las llamadas en paralelo ---
-            player, career_raw, contract_raw, transfers_raw = await asyncio.gather(
-                fetch_player(), fetch_career(), fetch_contract(), fetch_transfers()
-            )
+        async def fetch_transfers():
+            try:
+                return await wyscout.get_player_transfers(player_id)
+            except Exception as e:
+                logger.warning(f"Error getting transfers: {e}")
+                return None
 
-            # Procesar career (necesita wyscout client para team names)
-            career_data = None
-            if career_raw:
-                try:
-                    career_data = await process_career_data_enhanced(career_raw, wyscout)
-                    logger.info(f"Career loaded: {len(career_data)} entries")
-                except Exception as e:
-                    logger.error(f"Error processing career: {e}")
-
-            # Procesar contract
-            if contract_raw:
-                contract_info = {
-                    "team": player.get("currentTeam", {}).get("name", "Unknown") if isinstance(player.get("currentTeam"), dict) else "Unknown",
-                    "team_id": player.get("currentTeam", {}).get("wyId") if isinstance(player.get("currentTeam"), dict) else None,
-                    "contract_expires": contract_raw.get("contractExpiration") or contract_raw.get("contractExpirationDate"),
-                    "market_value": contract_raw.get("marketValue"),
-                    "market_value_currency": contract_raw.get("marketValueCurrency", "EUR"),
-                    "agent": contract_raw.get("agentName") or contract_raw.get("agent"),
-                    "jersey_number": player.get("shirtNumber") or contract_raw.get("shirtNumber"),
-                    "contract_type": contract_raw.get("contractType"),
-                    "loan": contract_raw.get("onLoan", False),
-                    "loan_from": contract_raw.get("loanFromTeamName"),
-                    "wage": contract_raw.get("wage"),
-                }
-            else:
-                current_team = player.get("currentTeam", {}) if isinstance(player.get("currentTeam"), dict) else {}
-                contract_info = {
-                    "team": current_team.get("name", "Unknown"),
-                    "team_id": current_team.get("wyId"),
-                    "contract_expires": player.get("contractExpirationDate"),
-                    "market_value": None,
-                    "market_value_currency": "EUR",
-                    "agent": None,
-                    "jersey_number": player.get("shirtNumber"),
-                    "contract_type": None,
-                    "loan": False,
-                    "loan_from": None,
-                    "wage": None,
-                }
+        # --- Ejecutar todas las llamadas en paralelo ---
+        player, career_raw, contract_raw, transfers_raw = await asyncio.gather(
+            fetch_player(), fetch_career(), fetch_contract(), fetch_transfers()
+        )
 
-            # Procesar transfers
-            transfers = process_transfers(transfers_raw) if transfers_raw else None
-            if transfers:
-                logger.info(f"Transfers loaded: {len(transfers)} entries")
-
-            # Build complete profile
-            profile = {
-                "basic_info": player,
-                "career": career_data,
-                "recent_matches": None,
-                "transfers": transfers,
-                "contract_info": contract_info
+        # Procesar career (necesita wyscout client para team names)
+        career_data = None
+        if career_raw:
+            try:
+                career_data = await process_career_data_enhanced(career_raw, metadata)
+                logger.info(f"Career loaded: {len(career_data)} entries")
+            except Exception as e:
+                logger.error(f"Error processing career: {e}")
+
+        # Procesar contract
+        if contract_raw:
+            contract_info = {
+                "team": player.get("currentTeam", {}).get("name", "Unknown") if isinstance(player.get("currentTeam"), dict) else "Unknown",
+                "team_id": player.get("currentTeam", {}).get("wyId") if isinstance(player.get("currentTeam"), dict) else None,
+                "contract_expires": contract_raw.get("contractExpiration") or contract_raw.get("contractExpirationDate"),
+                "market_value": contract_raw.get("marketValue"),
+                "market_value_currency": contract_raw.get("marketValueCurrency", "EUR"),
+                "agent": contract_raw.get("agentName") or contract_raw.get("agent"),
+                "jersey_number": player.get("shirtNumber") or contract_raw.get("shirtNumber"),
+                "contract_type": contract_raw.get("contractType"),
+                "loan": contract_raw.get("onLoan", False),
+                "loan_from": contract_raw.get("loanFromTeamName"),
+                "wage": contract_raw.get("wage"),
+            }
+        else:
+            current_team = player.get("currentTeam", {}) if isinstance(player.get("currentTeam"), dict) else {}
+            contract_info = {
+                "team": current_team.get("name", "Unknown"),
+                "team_id": current_team.get("wyId"),
+                "contract_expires": player.get("contractExpirationDate"),
+                "market_value": None,
+                "market_value_currency": "EUR",
+                "agent": None,
+                "jersey_number": player.get("shirtNumber"),
+                "contract_type": None,
+                "loan": False,
+                "loan_from": None,
+                "wage": None,
             }
 
-            return profile
+        # Procesar transfers
+        transfers = process_transfers(transfers_raw) if transfers_raw else None
+        if transfers:
+            logger.info(f"Transfers loaded: {len(transfers)} entries")
+
+        # Build complete profile
+        profile = {
+            "basic_info": player,
+            "career": career_data,
+            "recent_matches": None,
+            "transfers": transfers,
+            "contract_info": contract_info
+        }
+
+        return profile
 
     except Exception as e:
         logger.error(f"ERROR GENERAL profile: {str(e)}")
@@ -1565,171 +2148,128 @@ async def get_player_profile(player_id: int):
    
 
 @app.get("/api/team/{team_id}/profile")
-async def get_team_profile(team_id: int):
+async def get_team_profile(
+    team_id: int,
+    wyscout: WyscoutClient = Depends(get_wyscout),
+    catalog: CatalogRepository = Depends(get_catalog),
+):
    """Get complete team profile with logo and details"""
    try:
-       async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-           # Get basic team info
-           team = await wyscout.get_team(team_id)
-           
-           # Get squad
-           try:
-               squad = await wyscout.get_team_squad(team_id)
-           except:
-               squad = None
-           
-           # Get recent matches
-           try:
-               matches = await wyscout.get_team_matches(team_id)
-           except:
-               matches = None
-           
-           profile = {
-               "basic_info": team,
-               "squad": squad,
-               "recent_matches": matches
-           }
-           
-           return profile
-           
+       # Equipo y plantilla del catálogo si están al día; los partidos siempre de Wyscout
+       team, squad, matches = await asyncio.gather(
+           catalog.get_team(team_id),
+           catalog.get_team_squad(team_id),
+           wyscout.get_team_matches(team_id),
+           return_exceptions=True,
+       )
+       if isinstance(team, BaseException):
+           raise team
+       
+       profile = {
+           "basic_info": team,
+           "squad": None if isinstance(squad, BaseException) else squad,
+           "recent_matches": None if isinstance(matches, BaseException) else matches
+       }
+       
+       return profile
+       
    except Exception as e:
        logger.error(f"Error getting team profile: {e}")
        raise HTTPException(status_code=500, detail="Failed to get team profile")
 
 @app.get("/api/player/{player_id}/recent-matches")
-async def get_player_recent_matches(player_id: int, limit: int = 50):
+async def get_player_recent_matches(
+    player_id: int,
+    limit: int = 50,
+    wyscout: WyscoutClient = Depends(get_wyscout),
+    metadata: MetadataResolver = Depends(get_metadata),
+):
     """Get recent matches for a player"""
     try:
-        async with WyscoutClient(settings.wyscout_user, settings.wyscout_pass, settings.WYSCOUT_HOST) as wyscout:
-            matches = await wyscout.get_player_matches(player_id)
-            
-            # Debug: ver qué datos llegan
-            logger.info(f"Raw matches data for player {player_id}: Found {len(matches.get('matches', []))} matches")
+        matches = await wyscout.get_player_matches(player_id)
+        
+        # Debug: ver qué datos llegan
+        logger.info(f"Raw matches data for player {player_id}: Found {len(matches.get('matches', []))} matches")
+        
+        # Procesar los partidos para formato más simple
+        formatted_matches = []
+        if matches and isinstance(matches, dict):
+            matches_list = matches.get("matches", [])
+        elif isinstance(matches, list):
+            matches_list = matches
+        else:
+            matches_list = []
+        matches_list = matches_list[:limit]
+        
+        # Nombres de competición de todos los partidos en un solo lote
+        resolved = await metadata.resolve(competition_ids=(m.get("competitionId") for m in matches_list))
+        
+        for match in matches_list:
+            # Extraer información del campo 'label' que tiene el formato: "Equipo1 - Equipo2, X-Y"
+            match_id = match.get("matchId", 0)
+            date = match.get("date", "")
+            label = match.get("label", "")
             
-            # Procesar los partidos para formato más simple
-            formatted_matches = []
-            if matches and isinstance(matches, dict):
-                matches_list = matches.get("matches", [])
-            elif isinstance(matches, list):
-                matches_list = matches
+            # Formatear fecha para que sea compatible
+            if date and " " in date:
+                formatted_date = date.split(" ")[0]  # Solo la fecha, sin hora
             else:
-                matches_list = []
+                formatted_date = date or "2025-07-29"
             
-            for match in matches_list[:limit]:
-                # Extraer información del campo 'label' que tiene el formato: "Equipo1 - Equipo2, X-Y"
-                match_id = match.get("matchId", 0)
-                date = match.get("date", "")
-                label = match.get("label", "")
-                
-                # Formatear fecha para que sea compatible
-                if date and " " in date:
-                    formatted_date = date.split(" ")[0]  # Solo la fecha, sin hora
-                else:
-                    formatted_date = date or "2025-07-29"
-                
-                # Extraer información del label
-                home_team = "Unknown"
-                away_team = "Unknown"
-                result = "0-0"
-                
-                if label:
-                    try:
-                        # Formato esperado: "Equipo1 - Equipo2, X-Y"
-                        if ", " in label:
-                            teams_part, score_part = label.split(", ")
-                            result = score_part
-                            
-                            if " - " in teams_part:
-                                home_team, away_team = teams_part.split(" - ")
-                    except:
-                        pass  # Si falla el parsing, mantener valores por defecto
-                
-                # Obtener competición por ID (mapeo básico)
-# Obtener competición con cache automático
-                competition_id = match.get("competitionId", 0)
-                competition_name = "Unknown"
-                
-                if competition_id:
-                    # Verificar si ya está en cache
-                    if competition_id in competition_cache:
-                        competition_name = competition_cache[competition_id]
-                    else:
-                        # Si no está en cache, obtenerlo de Wyscout
-                        try:
-                            credentials = f"{settings.wyscout_user}:{settings.wyscout_pass}"
-                            encoded = base64.b64encode(credentials.encode()).decode()
-                            headers = {"Authorization": f"Basic {encoded}"}
-                            
-                            async with httpx.AsyncClient() as client:
-                                response = await client.get(
-                                    f"https://apirest.wyscout.com/v3/competitions/{competition_id}",
-                                    headers=headers,
-                                    timeout=5.0
-                                )
-                                
-                                if response.status_code == 200:
-                                    comp_data = response.json()
-                                    competition_name = comp_data.get("name", f"Liga {competition_id}")
-                                    # Guardar en cache
-                                    competition_cache[competition_id] = competition_name
-                                    logger.info(f"✅ Nueva competición: {competition_name}")
-                                else:
-                                    competition_name = f"Liga {competition_id}"
-                                    competition_cache[competition_id] = competition_name
-                                    
-                        except Exception as e:
-                            logger.warning(f"❌ Error obteniendo competición {competition_id}: {e}")
-                            competition_name = f"Liga {competition_id}"
-                            competition_cache[competition_id] = competition_name
-                
-                # Extraer scores del resultado
-                home_score = 0
-                away_score = 0
-                if "-" in result:
-                    try:
-                        scores = result.split("-")
-                        home_score = int(scores[0])
-                        away_score = int(scores[1])
-                    except:
-                        pass
-                
-                formatted_match = {
-                    "match_id": match_id,
-                    "date": formatted_date,
-                    "competition": competition_name,
-                    "home_team": home_team,
-                    "away_team": away_team,
-                    "home_score": home_score,
-                    "away_score": away_score,
-                    "result": result,
-                    "minutes_played": 90,  # Por defecto
-                    "player_team": "home",  # Por defecto
-                    "description": f"{home_team} vs {away_team} ({result})"
-                }
-                
-                logger.info(f"Formatted match: {formatted_match['description']}")
-                formatted_matches.append(formatted_match)
+            # Extraer información del label
+            home_team = "Unknown"
+            away_team = "Unknown"
+            result = "0-0"
+            
+            if label:
+                try:
+                    # Formato esperado: "Equipo1 - Equipo2, X-Y"
+                    if ", " in label:
+                        teams_part, score_part = label.split(", ")
+                        result = score_part
+                        
+                        if " - " in teams_part:
+                            home_team, away_team = teams_part.split(" - ")
+                except:
+                    pass  # Si falla el parsing, mantener valores por defecto
+            
+            competition_id = match.get("competitionId", 0)
+            competition_name = resolved.competition_name(competition_id, f"Liga {competition_id}") if competition_id else "Unknown"
+            
+            # Extraer scores del resultado
+            home_score = 0
+            away_score = 0
+            if "-" in result:
+                try:
+                    scores = result.split("-")
+                    home_score = int(scores[0])
+                    away_score = int(scores[1])
+                except:
+                    pass
             
-            logger.info(f"Returning {len(formatted_matches)} formatted matches")
-            return formatted_matches
+            formatted_match = {
+                "match_id": match_id,
+                "date": formatted_date,
+                "competition": competition_name,
+                "home_team": home_team,
+                "away_team": away_team,
+                "home_score": home_score,
+                "away_score": away_score,
+                "result": result,
+                "minutes_played": 90,  # Por defecto
+                "player_team": "home",  # Por defecto
+                "description": f"{home_team} vs {away_team} ({result})"
+            }
+            
+            logger.info(f"Formatted match: {formatted_match['description']}")
+            formatted_matches.append(formatted_match)
+        
+        logger.info(f"Returning {len(formatted_matches)} formatted matches")
+        return formatted_matches
             
     except Exception as e:
         logger.error(f"Error getting player matches: {e}")
-        return [
-            {
-                "match_id": 1,
-                "date": "2025-07-29",
-                "competition": "La Liga",
-                "home_team": "Barcelona",
-                "away_team": "Real Madrid",
-                "home_score": 2,
-                "away_score": 1,
-                "result": "2-1",
-                "minutes_played": 90,
-                "description": "Barcelona vs Real Madrid (2-1)",
-                "player_team": "home"
-            }
-        ]
+        raise HTTPException(status_code=503, detail="Failed to get player matches")
     
 # ========== ENDPOINTS PARA JUGADORES MANUALES ==========
 
@@ -1948,6 +2488,8 @@ async def add_player_to_market(market_id: str, player_data: dict, current_user:
                 name = existing.data[0].get('player_name') or 'El jugador'
                 raise HTTPException(status_code=409, detail=f"{name} ya esta agregado a este mercado")
 
+        if player_data.get('player_type', 'wyscout') == 'wyscout':
+            remember_player_name(player_data.get('player_name'), player_id)
         player_data['market_id'] = market_id
         player_data['added_by'] = current_user['id']
         result = supabase.table('market_players').insert(player_data).execute()
@@ -2162,22 +2704,10 @@ async def get_manual_players(current_user: dict = Depends(get_current_user)):
         return []
 
 @app.get("/api/wyscout/player/{player_id}")
-async def get_wyscout_player_details(player_id: str, current_user: dict = Depends(get_current_user)):
+async def get_wyscout_player_details(player_id: str, current_user: dict = Depends(get_current_user), wyscout: WyscoutClient = Depends(get_wyscout)):
     """Obtener detalles de un jugador específico de Wyscout"""
     try:
-        wyscout_headers = {
-            'Authorization': 'Basic ' + base64.b64encode(f'{settings.WYSCOUT_API_KEY}:{settings.WYSCOUT_API_SECRET}'.encode()).decode()
-        }
-        
-        response = requests.get(
-            f'https://apirest.wyscout.com/v3/players/{player_id}',
-            headers=wyscout_headers
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return {}
+        return await wyscout.get_player(int(player_id))
             
     except Exception as e:
         logger.error(f"Error getting player details: {e}")
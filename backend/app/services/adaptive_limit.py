@@ -0,0 +1,97 @@
+import time
+from typing import Any, Dict, Optional
+
+
+class AIMDLimit:
+    """Límite de concurrencia adaptativo (additive increase / multiplicative decrease).
+
+    Con respuestas sanas y el límite en uso (o peticiones esperando en cola),
+    crece ~1 cada `limit` éxitos (como la ventana de TCP). Ante un 429/5xx/error
+    de red o un pico de latencia (por encima del SLO o, pasadas `warmup`
+    muestras, de `latency_tolerance` veces la media) se multiplica por
+    `decrease_factor`, como mucho una vez por `cooldown` segundos para que una
+    ráfaga de fallos simultáneos no lo hunda de golpe.
+    """
+
+    def __init__(
+        self,
+        initial: int = 8,
+        min_limit: int = 2,
+        max_limit: int = 64,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_slo: float = 5.0,
+        cooldown: float = 1.0,
+        warmup: int = 20,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.latency_slo = latency_slo
+        self.cooldown = cooldown
+        self.warmup = warmup
+
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._latency_ewma: Optional[float] = None
+        self._samples = 0
+        self._last_decrease = 0.0
+
+        self.increases = 0
+        self.decreases: Dict[str, int] = {}
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def _is_latency_spike(self, latency: float) -> bool:
+        if self.latency_slo and latency > self.latency_slo:
+            return True
+        # Con pocas muestras la media no dice nada (la arrancan las primeras latencias)
+        return (
+            self._samples >= self.warmup
+            and self._latency_ewma is not None
+            and latency > self._latency_ewma * self.latency_tolerance
+        )
+
+    def on_success(self, latency: float, in_flight: int, queued: bool = False) -> bool:
+        """Registra una respuesta sana. Devuelve True si el límite creció."""
+        spike = self._is_latency_spike(latency)
+        self._latency_ewma = latency if self._latency_ewma is None else 0.95 * self._latency_ewma + 0.05 * latency
+        self._samples += 1
+        if spike:
+            self._decrease("latency")
+            return False
+
+        # Sólo crecer si el límite actual se está usando de verdad: en vuelo casi
+        # al tope o con peticiones en cola (las clases no interactivas nunca llegan
+        # al límite global, tienen su cuota)
+        if (in_flight < self.limit - 1 and not queued) or self._limit >= self.max_limit:
+            return False
+        before = self.limit
+        self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+        if self.limit > before:
+            self.increases += 1
+            return True
+        return False
+
+    def on_failure(self, reason: str):
+        self._decrease(reason)
+
+    def _decrease(self, reason: str):
+        now = time.monotonic()
+        if now - self._last_decrease < max(self.cooldown, self._latency_ewma or 0):
+            return
+        self._last_decrease = now
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        self.decreases[reason] = self.decreases.get(reason, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "latency_ewma_ms": round(self._latency_ewma * 1000, 1) if self._latency_ewma is not None else None,
+            "increases": self.increases,
+            "decreases": dict(self.decreases),
+        }
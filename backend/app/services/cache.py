@@ -0,0 +1,161 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class CachePolicy:
+    """TTL de una clase de endpoints.
+
+    `ttl`: segundos en los que la respuesta es fresca.
+    `stale_ttl`: segundos extra en los que se sirve la copia vieja mientras se
+    refresca en segundo plano (stale-while-revalidate).
+    `persist`: guardar también en la caché en disco (sobrevive reinicios).
+    """
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0, max_entries: int = 1000, persist: bool = False):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.persist = persist
+
+
+class CacheEntry:
+    """Respuesta cacheada más sus validadores HTTP (ETag / Last-Modified) y tamaño en bytes."""
+
+    __slots__ = ("value", "stored_at", "expires_at", "stale_until", "etag", "last_modified", "size")
+
+    def __init__(
+        self,
+        value: Any,
+        ttl: float,
+        stale_ttl: float,
+        now: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        size: int = 0,
+    ):
+        now = time.time() if now is None else now
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+        self.size = size
+        self.renew(ttl, stale_ttl, now)
+
+    def renew(self, ttl: float, stale_ttl: float, now: Optional[float] = None):
+        """Vuelve a dar por fresca la entrada (p. ej. tras un 304 Not Modified)."""
+        now = time.time() if now is None else now
+        self.stored_at = now
+        self.expires_at = now + ttl
+        self.stale_until = self.expires_at + stale_ttl
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) < self.expires_at
+
+    def is_servable(self, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) < self.stale_until
+
+
+class TTLCache:
+    """LRU acotado por número de entradas.
+
+    Las entradas caducadas no se borran al leerlas: el llamador decide si están
+    frescas, servibles (stale) o sólo sirven como último dato conocido. El LRU
+    se encarga de liberarlas.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, entry: CacheEntry):
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class TieredCache:
+    """Un TTLCache por clase de endpoint, elegido por regex sobre el path.
+
+    Cada tier tiene su propia capacidad para que, p. ej., las búsquedas no
+    expulsen los datos de referencia (áreas, competiciones).
+    """
+
+    def __init__(self, tiers: List[Tuple[str, CachePolicy]]):
+        self._routes = [(re.compile(pattern), policy) for pattern, policy in tiers]
+        self._caches: Dict[str, TTLCache] = {}
+        for _, policy in tiers:
+            self._caches.setdefault(policy.name, TTLCache(policy.max_entries))
+
+    def policy_for(self, endpoint: str) -> Optional[CachePolicy]:
+        for pattern, policy in self._routes:
+            if pattern.match(endpoint):
+                return policy
+        return None
+
+    def get(self, policy: CachePolicy, key: Hashable) -> Optional[CacheEntry]:
+        return self._caches[policy.name].get(key)
+
+    def set(self, policy: CachePolicy, key: Hashable, value: Any, **validators) -> CacheEntry:
+        entry = CacheEntry(value, policy.ttl, policy.stale_ttl, **validators)
+        self._caches[policy.name].set(key, entry)
+        return entry
+
+    def put(self, policy: CachePolicy, key: Hashable, entry: CacheEntry):
+        """Inserta una entrada conservando sus tiempos (p. ej. leída de disco)."""
+        self._caches[policy.name].set(key, entry)
+
+    def record(self, policy: CachePolicy, outcome: str):
+        cache = self._caches[policy.name]
+        if outcome == "hit":
+            cache.hits += 1
+        elif outcome == "stale":
+            cache.stale_hits += 1
+        else:
+            cache.misses += 1
+
+    def clear(self):
+        for cache in self._caches.values():
+            cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: cache.stats() for name, cache in self._caches.items()}
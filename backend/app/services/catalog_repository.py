@@ -0,0 +1,354 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.catalog_sync import (
+    DAY, KEEP_WHEN_MISSING, competition_row, iso_timestamp, keep_stored, parse_timestamp, player_row, team_row,
+)
+
+logger = logging.getLogger(__name__)
+
+TEAM_COLUMNS = ("id", "wyscout_id", "name", "official_name", "area_id", "city", "category", "gender", "type", "gsm_id", "last_sync")
+COMPETITION_COLUMNS = ("id", "wyscout_id", "name", "area_id", "category", "division_level", "format", "gender", "type", "gsm_id", "last_sync")
+PLAYER_COLUMNS = ("id", "wyscout_id", "current_team_id", "photo_url", "wyscout_data", "last_sync")
+
+
+class CatalogRepository:
+    """Lecturas de jugadores, equipos y competiciones a través del catálogo local.
+
+    Primero la caché en memoria de WyscoutClient (sin ida y vuelta a la base).
+    Si no está y la fila está en las tablas que llena CatalogSync con un
+    `last_sync` dentro de `max_age` (por tipo de entidad) se responde desde
+    ahí, en el mismo formato que Wyscout; si falta o está vieja se pide a
+    Wyscout y la respuesta se escribe de vuelta en el catálogo en segundo
+    plano. Sin store (catálogo no configurado) o si la base falla, todo va
+    directo a Wyscout.
+    """
+
+    def __init__(self, wyscout, store=None, max_age: Optional[Dict[str, float]] = None):
+        self.wyscout = wyscout
+        self.store = store
+        self.max_age = {"players": DAY, "teams": DAY, "competitions": 7 * DAY, "squads": DAY}
+        self.max_age.update(max_age or {})
+        # Áreas casi no cambian: uuid <-> (wyId, nombre) en memoria
+        self._areas_by_id: Dict[str, Dict[str, Any]] = {}
+        self._area_ids: Dict[int, str] = {}
+        self._background: set = set()
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.db_errors = 0
+
+    # ---- base ----
+
+    async def _select(self, table: str, columns: Iterable[str], column: str, values: List[Any]) -> List[Dict[str, Any]]:
+        if self.store is None or not values:
+            return []
+        try:
+            return await asyncio.to_thread(self.store.select, table, list(columns), column, values)
+        except Exception as e:
+            self.db_errors += 1
+            logger.warning(f"Catálogo: lectura de {table} falló, se usa Wyscout: {e}")
+            return []
+
+    def _fresh(self, entity: str, row: Optional[Dict[str, Any]]) -> bool:
+        return row is not None and time.time() - parse_timestamp(row.get("last_sync")) < self.max_age[entity]
+
+    def _record(self, entity: str, outcome: str, n: int = 1):
+        counts = self.counts.setdefault(entity, {"memory": 0, "hits": 0, "stale": 0, "misses": 0})
+        counts[outcome] += n
+
+    def _write_back(self, coro):
+        if self.store is None:
+            coro.close()
+            return
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        task.add_done_callback(lambda t: t.cancelled() or t.exception() and logger.warning(
+            f"Catálogo: no se pudo guardar: {t.exception()}"
+        ))
+
+    async def _upsert(self, table: str, rows: List[Dict[str, Any]]) -> Dict[int, str]:
+        missing = [row["wyscout_id"] for row in rows if any(row.get(c) is None for c in KEEP_WHEN_MISSING.intersection(row))]
+        if missing:
+            # Misma regla que la sincronización: una respuesta sin foto no borra la guardada
+            columns = ["wyscout_id", *KEEP_WHEN_MISSING.intersection(rows[0])]
+            stored = {old["wyscout_id"]: old for old in await self._select(table, columns, "wyscout_id", missing)}
+            for row in rows:
+                keep_stored(row, stored.get(row["wyscout_id"]))
+        stamp = iso_timestamp(time.time())
+        for row in rows:
+            row["last_sync"] = stamp
+            if table in ("teams", "players"):
+                row["updated_at"] = stamp
+        written = await asyncio.to_thread(self.store.upsert, table, rows)
+        return {row["wyscout_id"]: row["id"] for row in written}
+
+    def _peek_many(self, entity: str, endpoint: str, ids: Iterable[Optional[int]]) -> Dict[int, Dict[str, Any]]:
+        """Los que ya estén frescos en la caché en memoria de WyscoutClient."""
+        found = {}
+        for wyscout_id in ids:
+            cached = self.wyscout.peek(endpoint.format(wyscout_id)) if wyscout_id else None
+            if cached is not None:
+                found[wyscout_id] = cached
+        self._record(entity, "memory", len(found))
+        return found
+
+    # ---- áreas ----
+
+    async def _areas(self, ids: Iterable[Optional[str]]) -> Dict[str, Dict[str, Any]]:
+        missing = [i for i in set(ids) if i and i not in self._areas_by_id]
+        for row in await self._select("areas", ("id", "wyscout_id", "name", "alpha2_code", "alpha3_code"), "id", missing):
+            self._remember_area(row)
+        return self._areas_by_id
+
+    def _remember_area(self, row: Dict[str, Any]):
+        self._areas_by_id[row["id"]] = {
+            "id": row["wyscout_id"], "name": row["name"],
+            "alpha2code": row.get("alpha2_code"), "alpha3code": row.get("alpha3_code"),
+        }
+        self._area_ids[row["wyscout_id"]] = row["id"]
+
+    async def _area_uuids(self, areas: Iterable[Any]) -> Dict[int, str]:
+        """wyId de área -> uuid en el catálogo (las que no estén no aparecen)."""
+        wanted = {a.get("id") for a in areas if isinstance(a, dict)} - {None}
+        missing = [a for a in wanted if a not in self._area_ids]
+        for row in await self._select("areas", ("id", "wyscout_id", "name", "alpha2_code", "alpha3_code"), "wyscout_id", missing):
+            self._remember_area(row)
+        return self._area_ids
+
+    async def _area_uuid(self, area: Any) -> Optional[str]:
+        if not isinstance(area, dict):
+            return None
+        return (await self._area_uuids([area])).get(area.get("id"))
+
+    # ---- formato Wyscout ----
+
+    def _team(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "wyId": row["wyscout_id"],
+            "name": row["name"],
+            "officialName": row.get("official_name"),
+            "city": row.get("city"),
+            "area": self._areas_by_id.get(row.get("area_id")) or {},
+            "category": row.get("category"),
+            "gender": row.get("gender"),
+            "type": row.get("type"),
+            "gsmId": row.get("gsm_id"),
+        }
+
+    def _competition(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "wyId": row["wyscout_id"],
+            "name": row["name"],
+            "area": self._areas_by_id.get(row.get("area_id")) or {},
+            "category": row.get("category"),
+            "divisionLevel": row.get("division_level"),
+            "format": row.get("format"),
+            "gender": row.get("gender"),
+            "type": row.get("type"),
+            "gsmId": row.get("gsm_id"),
+        }
+
+    @staticmethod
+    def _player(row: Dict[str, Any]) -> Dict[str, Any]:
+        player = dict(row["wyscout_data"])
+        if row.get("photo_url"):
+            player["imageDataURL"] = row["photo_url"]
+        return player
+
+    # ---- jugadores ----
+
+    async def get_player(self, player_id: int, details: Optional[str] = None) -> Dict[str, Any]:
+        """Como WyscoutClient.get_player; con details="currentTeam" incluye el equipo actual."""
+        cached = self.wyscout.peek(f"/v3/players/{player_id}", {"details": details} if details else None)
+        if cached is not None:
+            self._record("players", "memory")
+            return cached
+        rows = await self._select("players", PLAYER_COLUMNS, "wyscout_id", [player_id])
+        row = rows[0] if rows else None
+        if self._fresh("players", row) and row.get("wyscout_data"):
+            player = self._player(row)
+            team_row_ = None
+            if details == "currentTeam" and row.get("current_team_id"):
+                teams = await self._select("teams", TEAM_COLUMNS, "id", [row["current_team_id"]])
+                team_row_ = teams[0] if teams else None
+            if details != "currentTeam" or team_row_ is not None or not player.get("currentTeamId"):
+                if team_row_ is not None:
+                    await self._areas([team_row_.get("area_id")])
+                    player["currentTeam"] = self._team(team_row_)
+                self._record("players", "hits")
+                return player
+        self._record("players", "stale" if row else "misses")
+        player = await self.wyscout.get_player(player_id, details=details)
+        if isinstance(player, dict) and player.get("wyId") and not player.get("stale"):
+            self._write_back(self._store_player(player))
+        return player
+
+    async def _store_player(self, player: Dict[str, Any]):
+        team = player.get("currentTeam")
+        team_uuid = None
+        if isinstance(team, dict) and team.get("wyId"):
+            team_uuid = (await self._store_teams([team])).get(team["wyId"])
+        elif player.get("currentTeamId"):
+            rows = await self._select("teams", ("id", "wyscout_id"), "wyscout_id", [player["currentTeamId"]])
+            team_uuid = rows[0]["id"] if rows else None
+        birth_area = await self._area_uuid(player.get("birthArea"))
+        await self._upsert("players", [player_row({k: v for k, v in player.items() if k != "currentTeam"}, team_uuid, birth_area)])
+
+    # ---- equipos ----
+
+    async def get_teams(self, team_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """wyId -> equipo (formato Wyscout); los que no se puedan obtener no aparecen."""
+        found = self._peek_many("teams", "/v3/teams/{}", team_ids)
+        team_ids = [t for t in dict.fromkeys(t for t in team_ids if t) if t not in found]
+        rows = {row["wyscout_id"]: row for row in await self._select("teams", TEAM_COLUMNS, "wyscout_id", team_ids)}
+        fresh = [row for row in rows.values() if self._fresh("teams", row)]
+        await self._areas(row.get("area_id") for row in fresh)
+        for row in fresh:
+            found[row["wyscout_id"]] = self._team(row)
+        self._record("teams", "hits", len(fresh))
+        missing = [t for t in team_ids if t not in found]
+        for t in missing:
+            self._record("teams", "stale" if t in rows else "misses")
+
+        async def fetch(tid):
+            try:
+                return await self.wyscout.get_team(tid)
+            except Exception as e:
+                logger.warning(f"Catálogo: no se pudo obtener equipo {tid}: {e}")
+                return None
+
+        fetched = [t for t in await asyncio.gather(*(fetch(t) for t in missing)) if isinstance(t, dict) and t.get("wyId")]
+        for team in fetched:
+            found[team["wyId"]] = team
+        fresh_copies = [t for t in fetched if not t.get("stale")]
+        if fresh_copies:
+            self._write_back(self._store_teams(fresh_copies))
+        return found
+
+    async def get_team(self, team_id: int) -> Dict[str, Any]:
+        team = (await self.get_teams([team_id])).get(team_id)
+        if team is None:
+            # Mismo error que daría Wyscout
+            return await self.wyscout.get_team(team_id)
+        return team
+
+    async def _store_teams(self, teams: List[Dict[str, Any]]) -> Dict[int, str]:
+        areas = await self._area_uuids(team.get("area") for team in teams)
+        rows = [team_row(team, areas.get((team.get("area") or {}).get("id"))) for team in teams]
+        return await self._upsert("teams", rows)
+
+    async def _catalog_squad(self, team_id: int) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]], float]]:
+        """(equipo, jugadores, fresco hasta) en formato Wyscout si el catálogo tiene la plantilla al día."""
+        teams = await self._select("teams", TEAM_COLUMNS, "wyscout_id", [team_id])
+        if not teams or not self._fresh("squads", teams[0]):
+            self._record("squads", "stale" if teams else "misses")
+            return None
+        rows = await self._select("players", PLAYER_COLUMNS, "current_team_id", [teams[0]["id"]])
+        if not rows or not all(self._fresh("squads", row) and row.get("wyscout_data") for row in rows):
+            self._record("squads", "stale" if rows else "misses")
+            return None
+        self._record("squads", "hits")
+        await self._areas([teams[0].get("area_id")])
+        synced = min(parse_timestamp(row.get("last_sync")) for row in [teams[0], *rows])
+        return self._team(teams[0]), [self._player(row) for row in rows], synced + self.max_age["squads"]
+
+    async def get_team_squad(self, team_id: int) -> Dict[str, Any]:
+        """Como WyscoutClient.get_team_squad, siempre con "team" además de "squad"
+        (venga de memoria, del catálogo o de Wyscout)."""
+        data, _ = await self.get_team_squad_until(team_id)
+        return data
+
+    async def get_team_squad_until(self, team_id: int) -> Tuple[Dict[str, Any], Optional[float]]:
+        """get_team_squad y hasta cuándo es fresca la copia (epoch, ver WyscoutClient.fresh_until)."""
+        endpoint = f"/v3/teams/{team_id}/squad"
+        data = self.wyscout.peek(endpoint)
+        fetched = data is None
+        if not fetched:
+            self._record("squads", "memory")
+        else:
+            cached = await self._catalog_squad(team_id)
+            if cached is not None:
+                return {"team": cached[0], "squad": cached[1]}, cached[2]
+            data = await self.wyscout.get_team_squad(team_id)
+        fresh_until = self.wyscout.fresh_until(endpoint)
+        team = data.get("team")
+        if not (isinstance(team, dict) and team.get("wyId")):
+            # /squad no siempre trae el equipo: referencia barata (memoria, catálogo o caché del cliente)
+            team = (await self.get_teams([team_id])).get(team_id) or {}
+            data = {**data, "team": team}
+        if fetched and not data.get("stale") and not team.get("stale") and team.get("wyId") and data.get("squad"):
+            self._write_back(self._store_squad(team, data["squad"]))
+        return data, fresh_until
+
+    async def _store_squad(self, team: Dict[str, Any], squad: List[Dict[str, Any]]):
+        team_id = team["wyId"]
+        team_uuid = (await self._store_teams([team])).get(team_id)
+        squad = [p for p in squad if p.get("wyId")]
+        areas = await self._area_uuids(p.get("birthArea") for p in squad)
+        rows = [player_row(p, team_uuid, areas.get((p.get("birthArea") or {}).get("id"))) for p in squad]
+        if rows:
+            await self._upsert("players", rows)
+        if team_uuid:
+            # Los que ya no están en la plantilla dejan de apuntar al equipo; si no,
+            # _catalog_squad los seguiría devolviendo (y daría la plantilla por vieja)
+            current = {p["wyId"] for p in squad}
+            stored = await self._select("players", ("id", "wyscout_id"), "current_team_id", [team_uuid])
+            departed = [row["id"] for row in stored if row["wyscout_id"] not in current]
+            if departed:
+                stamp = iso_timestamp(time.time())
+                await asyncio.to_thread(
+                    self.store.update, "players", {"current_team_id": None, "updated_at": stamp}, "id", departed
+                )
+
+    # ---- competiciones ----
+
+    async def get_competitions(self, competition_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """wyId -> competición (formato Wyscout); las que no se puedan obtener no aparecen."""
+        found = self._peek_many("competitions", "/v3/competitions/{}", competition_ids)
+        competition_ids = [c for c in dict.fromkeys(c for c in competition_ids if c) if c not in found]
+        rows = {row["wyscout_id"]: row for row in await self._select("competitions", COMPETITION_COLUMNS, "wyscout_id", competition_ids)}
+        fresh = [row for row in rows.values() if self._fresh("competitions", row)]
+        await self._areas(row.get("area_id") for row in fresh)
+        for row in fresh:
+            found[row["wyscout_id"]] = self._competition(row)
+        self._record("competitions", "hits", len(fresh))
+        missing = [c for c in competition_ids if c not in found]
+        for c in missing:
+            self._record("competitions", "stale" if c in rows else "misses")
+
+        async def fetch(cid):
+            try:
+                return await self.wyscout.get_competition(cid)
+            except Exception as e:
+                logger.warning(f"Catálogo: no se pudo obtener competición {cid}: {e}")
+                return None
+
+        fetched = [c for c in await asyncio.gather(*(fetch(c) for c in missing)) if isinstance(c, dict) and c.get("wyId")]
+        for comp in fetched:
+            found[comp["wyId"]] = comp
+        fresh_copies = [c for c in fetched if not c.get("stale")]
+        if fresh_copies:
+            self._write_back(self._store_competitions(fresh_copies))
+        return found
+
+    async def _store_competitions(self, competitions: List[Dict[str, Any]]):
+        areas = await self._area_uuids(comp.get("area") for comp in competitions)
+        await self._upsert("competitions", [competition_row(comp, areas.get((comp.get("area") or {}).get("id"))) for comp in competitions])
+
+    # ---- ciclo de vida ----
+
+    async def aclose(self):
+        """Al apagar: esperar (poco) las escrituras pendientes."""
+        if self._background:
+            await asyncio.wait(self._background, timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.store is not None,
+            "max_age": self.max_age,
+            **self.counts,
+            "db_errors": self.db_errors,
+            "pending_writes": len(self._background),
+        }
@@ -0,0 +1,440 @@
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from app.services.scheduler import Priority, priority
+from app.services.sync_store import TABLE_COLUMNS
+from app.services.wyscout_client import count_requests
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 3600
+
+# Columnas que no cuentan para decidir si una fila cambió
+_NOT_COMPARED = frozenset({"last_sync", "updated_at", "wyscout_data"})
+# Los listados de Wyscout no traen imageDataURL: sin valor nuevo se conserva el guardado
+KEEP_WHEN_MISSING = frozenset({"photo_url"})
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+def iso_timestamp(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds")
+
+
+def parse_timestamp(value: Any) -> float:
+    """Timestamp de Postgres/SQLite/Wyscout a epoch; 0 si no se entiende."""
+    if not value:
+        return 0.0
+    text = str(value).strip().replace("Z", "+00:00").replace(" ", "T", 1)
+    # fromisoformat (< 3.11) sólo acepta 3 o 6 decimales
+    text = _FRACTION.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), text, count=1)
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return 0.0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def keep_stored(row: Dict[str, Any], old: Optional[Dict[str, Any]]):
+    """Completa en `row` las columnas de KEEP_WHEN_MISSING que vienen vacías con las de `old`."""
+    if old is None:
+        return
+    for column in KEEP_WHEN_MISSING.intersection(row):
+        if row[column] is None and old.get(column) is not None:
+            row[column] = old[column]
+
+
+def _same(new: Any, old: Any) -> bool:
+    return new == old or (new is not None and old is not None and str(new) == str(old))
+
+
+def _int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def area_row(area: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "wyscout_id": area["id"],
+        "name": area.get("name") or "",
+        "alpha2_code": area.get("alpha2code"),
+        "alpha3_code": area.get("alpha3code"),
+    }
+
+
+def competition_row(comp: Dict[str, Any], area_id: Optional[str]) -> Dict[str, Any]:
+    return {
+        "wyscout_id": comp["wyId"],
+        "name": comp.get("name") or "",
+        "area_id": area_id,
+        "category": comp.get("category") or "default",
+        "division_level": comp.get("divisionLevel") or 0,
+        "format": comp.get("format"),
+        "gender": comp.get("gender") or "male",
+        "type": comp.get("type"),
+        "gsm_id": comp.get("gsmId"),
+    }
+
+
+def team_row(team: Dict[str, Any], area_id: Optional[str]) -> Dict[str, Any]:
+    return {
+        "wyscout_id": team["wyId"],
+        "name": team.get("name") or "",
+        "official_name": team.get("officialName"),
+        "area_id": area_id,
+        "city": team.get("city"),
+        "category": team.get("category") or "default",
+        "gender": team.get("gender") or "male",
+        "type": team.get("type"),
+        "gsm_id": team.get("gsmId"),
+    }
+
+
+def player_row(player: Dict[str, Any], team_id: Optional[str], birth_area_id: Optional[str]) -> Dict[str, Any]:
+    role = player.get("role") or {}
+    image = player.get("imageDataURL")
+    return {
+        "wyscout_id": player["wyId"],
+        "first_name": player.get("firstName") or "",
+        "last_name": player.get("lastName") or "",
+        "short_name": player.get("shortName"),
+        "birth_date": (player.get("birthDate") or "")[:10] or None,
+        "birth_area_id": birth_area_id,
+        "nationality": (player.get("passportArea") or {}).get("name"),
+        "gender": player.get("gender") or "male",
+        "foot": player.get("foot"),
+        "height": player.get("height") or None,
+        "weight": player.get("weight") or None,
+        "status": player.get("status") or "active",
+        "current_team_id": team_id,
+        "position_code2": role.get("code2"),
+        "position_name": role.get("name"),
+        # URL o data URI tal como lo da Wyscout: el catálogo sirve la ficha sin volver a pedirla
+        "photo_url": image if isinstance(image, str) and image else None,
+        "gsm_id": player.get("gsmId"),
+        "wyscout_data": {k: v for k, v in player.items() if k != "imageDataURL"},
+    }
+
+
+def parse_match_label(label: str):
+    """"Local - Visitante, 2-1" -> (local, visitante, 2, 1); lo que falte, None."""
+    teams, _, score = label.rpartition(", ")
+    if not teams:
+        teams, score = label, ""
+    home, _, away = teams.partition(" - ")
+    home_score, _, away_score = score.partition("-")
+    return home.strip() or None, away.strip() or None, _int(home_score), _int(away_score)
+
+
+def match_row(match: Dict[str, Any], competition_id: Optional[str], team_ids_by_name: Dict[str, str]) -> Dict[str, Any]:
+    home, away, home_score, away_score = parse_match_label(match.get("label") or "")
+    kickoff = parse_timestamp(match.get("dateutc") or match.get("date"))
+    return {
+        "wyscout_id": match.get("matchId") or match.get("wyId"),
+        "competition_id": competition_id,
+        "home_team_id": team_ids_by_name.get(home),
+        "away_team_id": team_ids_by_name.get(away),
+        "match_date": iso_timestamp(kickoff) if kickoff else None,
+        "gameweek": match.get("gameweek"),
+        "status": match.get("status"),
+        "home_score": home_score or 0,
+        "away_score": away_score or 0,
+        "label": match.get("label"),
+        "has_data_available": bool(match.get("hasDataAvailable")),
+        "gsm_id": match.get("gsmId"),
+        "wyscout_data": match,
+    }
+
+
+class SyncRun:
+    """Contadores de una pasada de sincronización."""
+
+    __slots__ = ("processed", "created", "updated", "skipped", "competitions_skipped", "errors", "tables")
+
+    def __init__(self):
+        self.processed = 0
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.competitions_skipped = 0
+        self.errors: List[str] = []
+        self.tables: Dict[str, Dict[str, int]] = {}
+
+    def count(self, table: str, processed: int, created: int, updated: int):
+        counts = self.tables.setdefault(table, {"processed": 0, "created": 0, "updated": 0})
+        counts["processed"] += processed
+        counts["created"] += created
+        counts["updated"] += updated
+        self.processed += processed
+        self.created += created
+        self.updated += updated
+        self.skipped += processed - created - updated
+
+
+class CatalogSync:
+    """Sincronización incremental Wyscout -> tablas de catálogo (database/schema.sql).
+
+    Una pasada recorre áreas y competiciones de todas las áreas y, para las
+    competiciones objetivo (las configuradas o las de primera división),
+    equipos, jugadores (listado paginado de la competición) y partidos.
+
+    Sólo se escriben filas nuevas, con cambios en alguna columna o cuyo
+    `last_sync` ya venció (`max_age` por tabla); el resto se cuentan como
+    saltadas. Si todos los equipos de una competición tienen jugadores con
+    `last_sync` vigente no se vuelve a pedir el listado de jugadores, y lo
+    mismo con los partidos. Las escrituras van por lotes de `batch_size` y las
+    competiciones en paralelo de a `concurrency`, con prioridad BACKGROUND.
+    Cada pasada deja una fila en sync_logs.
+    """
+
+    def __init__(
+        self,
+        wyscout,
+        store,
+        competition_ids: Optional[Iterable[int]] = None,
+        max_division: int = 1,
+        concurrency: int = 4,
+        batch_size: int = 500,
+        max_age: Optional[Dict[str, float]] = None,
+    ):
+        self.wyscout = wyscout
+        self.store = store
+        self.competition_ids = sorted(set(competition_ids or ()))
+        self.max_division = max_division
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_age = {"areas": 7 * DAY, "competitions": 7 * DAY, "teams": DAY, "players": DAY, "matches": 6 * 3600}
+        self.max_age.update(max_age or {})
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    async def _db(self, fn, *args):
+        return await asyncio.to_thread(fn, *args)
+
+    async def _upsert_changed(self, table: str, rows: List[Dict[str, Any]], run: SyncRun, force: bool) -> Dict[int, str]:
+        """Escribe lo nuevo, lo cambiado y lo vencido; devuelve wyscout_id -> id de todas las filas."""
+        rows = list({row["wyscout_id"]: row for row in rows if row.get("wyscout_id") is not None}.values())
+        if not rows:
+            return {}
+        columns = TABLE_COLUMNS[table]
+        compared = [c for c in columns if c not in _NOT_COMPARED]
+        existing = {
+            row["wyscout_id"]: row
+            for row in await self._db(
+                self.store.select, table, ["id", "wyscout_id", "last_sync", *compared], "wyscout_id",
+                [row["wyscout_id"] for row in rows],
+            )
+        }
+        ids = {wyscout_id: row["id"] for wyscout_id, row in existing.items()}
+        now = time.time()
+        stamp = iso_timestamp(now)
+        to_write = []
+        created = 0
+        for row in rows:
+            old = existing.get(row["wyscout_id"])
+            keep_stored(row, old)
+            if old is None:
+                created += 1
+            elif (
+                not force
+                and now - parse_timestamp(old.get("last_sync")) < self.max_age[table]
+                and all(_same(row.get(c), old.get(c)) for c in compared)
+            ):
+                continue
+            row["last_sync"] = stamp
+            if "updated_at" in columns:
+                row["updated_at"] = stamp
+            to_write.append(row)
+        for start in range(0, len(to_write), self.batch_size):
+            written = await self._db(self.store.upsert, table, to_write[start:start + self.batch_size])
+            ids.update({row["wyscout_id"]: row["id"] for row in written})
+        run.count(table, len(rows), created, len(to_write) - created)
+        return ids
+
+    async def _fresh(self, table: str, column: str, values: Sequence[str], force: bool) -> bool:
+        """¿Hay filas de `table` para cada valor de `column` y todas con last_sync vigente?"""
+        if force or not values:
+            return False
+        rows = await self._db(self.store.select, table, [column, "last_sync"], column, list(values))
+        if {row[column] for row in rows} != set(values):
+            return False
+        oldest = min(parse_timestamp(row.get("last_sync")) for row in rows)
+        return time.time() - oldest < self.max_age[table]
+
+    # ---- etapas ----
+
+    async def _sync_competitions(self, areas: List[Dict[str, Any]], area_ids: Dict[int, str], run: SyncRun, force: bool):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        rows: List[Dict[str, Any]] = []
+        raw: Dict[int, Dict[str, Any]] = {}
+
+        async def one(area):
+            async with semaphore:
+                try:
+                    data = await self.wyscout.get_competitions(area["alpha3code"])
+                except Exception as e:
+                    run.errors.append(f"competitions {area.get('alpha3code')}: {e}")
+                    return
+            for comp in data.get("competitions", []):
+                if comp.get("wyId") is None:
+                    continue
+                raw[comp["wyId"]] = comp
+                rows.append(competition_row(comp, area_ids.get(area["id"])))
+
+        await asyncio.gather(*(one(area) for area in areas if area.get("alpha3code")))
+        ids = await self._upsert_changed("competitions", rows, run, force)
+        return raw, ids
+
+    def _targets(self, competitions: Dict[int, Dict[str, Any]]) -> List[int]:
+        if self.competition_ids:
+            return self.competition_ids
+        return sorted(
+            cid for cid, comp in competitions.items()
+            if 0 < (comp.get("divisionLevel") or 0) <= self.max_division
+        )
+
+    async def _sync_competition(self, competition_id: int, comp_uuid: Optional[str], area_ids: Dict[int, str], run: SyncRun, force: bool):
+        teams = (await self.wyscout.get_competition_teams(competition_id)).get("teams", [])
+        team_ids = await self._upsert_changed(
+            "teams",
+            [team_row(t, area_ids.get((t.get("area") or {}).get("id"))) for t in teams if t.get("wyId") is not None],
+            run,
+            force,
+        )
+
+        if await self._fresh("players", "current_team_id", list(team_ids.values()), force):
+            run.competitions_skipped += 1
+        else:
+            batch: List[Dict[str, Any]] = []
+            async for page in self.wyscout.iter_pages(f"/v3/competitions/{competition_id}/players", "players"):
+                for p in page:
+                    if p.get("wyId") is None:
+                        continue
+                    team_wy_id = p.get("currentTeamId") or (p.get("currentTeam") or {}).get("wyId")
+                    batch.append(player_row(p, team_ids.get(team_wy_id), area_ids.get((p.get("birthArea") or {}).get("id"))))
+                if len(batch) >= self.batch_size:
+                    await self._upsert_changed("players", batch, run, force)
+                    batch = []
+            await self._upsert_changed("players", batch, run, force)
+
+        if comp_uuid and await self._fresh("matches", "competition_id", [comp_uuid], force):
+            return
+        matches = (await self.wyscout.get_competition_matches(competition_id)).get("matches", [])
+        by_name = {t.get("name"): team_ids.get(t.get("wyId")) for t in teams if t.get("name")}
+        await self._upsert_changed("matches", [match_row(m, comp_uuid, by_name) for m in matches], run, force)
+
+    # ---- pasadas ----
+
+    async def run_once(self, force: bool = False) -> Dict[str, Any]:
+        """Una pasada completa; `force` reescribe todo sin mirar last_sync."""
+        run = SyncRun()
+        started = time.perf_counter()
+        status = "success"
+        targets: List[int] = []
+        try:
+            # Sólo las llamadas de la sincronización, no las de los usuarios mientras corre
+            with priority(Priority.BACKGROUND), count_requests() as calls:
+                areas = [a for a in await self.wyscout.get_areas() if a.get("id") is not None]
+                area_ids = await self._upsert_changed("areas", [area_row(a) for a in areas], run, force)
+                competitions, competition_ids = await self._sync_competitions(areas, area_ids, run, force)
+                targets = self._targets(competitions)
+                semaphore = asyncio.Semaphore(self.concurrency)
+
+                async def one(cid):
+                    async with semaphore:
+                        try:
+                            await self._sync_competition(cid, competition_ids.get(cid), area_ids, run, force)
+                        except Exception as e:
+                            run.errors.append(f"competition {cid}: {e}")
+
+                await asyncio.gather(*(one(cid) for cid in targets))
+        except Exception as e:
+            status = "error"
+            run.errors.append(str(e))
+        if run.errors and status == "success":
+            status = "partial"
+
+        summary = {
+            "status": status,
+            "sync_type": "full" if force else "incremental",
+            "competitions": len(targets),
+            "competitions_skipped": run.competitions_skipped,
+            "api_calls_made": calls["requests"],
+            "sync_duration_ms": int((time.perf_counter() - started) * 1000),
+            "records_processed": run.processed,
+            "records_created": run.created,
+            "records_updated": run.updated,
+            "records_skipped": run.skipped,
+            "tables": run.tables,
+            "errors": run.errors[:20],
+            "finished_at": iso_timestamp(time.time()),
+        }
+        try:
+            await self._db(self.store.insert, "sync_logs", {
+                "entity_type": "catalog",
+                "entity_id": ",".join(map(str, targets))[:100] or None,
+                "sync_type": summary["sync_type"],
+                "status": status,
+                "error_message": "; ".join(run.errors[:5])[:2000] or None,
+                "api_calls_made": summary["api_calls_made"],
+                "sync_duration_ms": summary["sync_duration_ms"],
+                "records_processed": run.processed,
+                "records_created": run.created,
+                "records_updated": run.updated,
+            })
+        except Exception as e:
+            logger.warning(f"Sincronización: no se pudo escribir sync_logs: {e}")
+        self.runs += 1
+        self.last_run = summary
+        logger.info(
+            f"Sincronización {status}: {run.created} nuevas, {run.updated} actualizadas, {run.skipped} sin cambios, "
+            f"{summary['api_calls_made']} llamadas a Wyscout en {summary['sync_duration_ms']} ms"
+        )
+        return summary
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, force: bool = False) -> bool:
+        """Lanza una pasada en segundo plano; False si ya hay una en curso."""
+        if self.running:
+            return False
+        self._task = asyncio.ensure_future(self.run_once(force))
+        return True
+
+    async def run(self, interval: float, initial_delay: float = 60):
+        """Pasadas periódicas (task de fondo del lifespan); nunca dos a la vez."""
+        await asyncio.sleep(initial_delay)
+        while True:
+            if self.start():
+                try:
+                    await self._task
+                except Exception as e:
+                    logger.warning(f"Sincronización fallida: {e}")
+            await asyncio.sleep(interval)
+
+    async def aclose(self):
+        if self.running:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        close = getattr(self.store, "close", None)
+        if close:
+            close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "runs": self.runs,
+            "competition_ids": self.competition_ids or None,
+            "max_division": self.max_division,
+            "last_run": self.last_run,
+        }
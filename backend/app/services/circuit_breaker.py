@@ -0,0 +1,102 @@
+import re
+import time
+from typing import Any, Dict
+
+
+def endpoint_family(endpoint: str) -> str:
+    """Agrupa endpoints por forma: /v3/players/123/career -> /v3/players/{id}/career"""
+    return re.sub(r"/\d+", "/{id}", endpoint)
+
+
+class CircuitBreaker:
+    """Circuit breaker clásico closed -> open -> half-open.
+
+    Se abre tras `failure_threshold` fallos consecutivos; las llamadas más
+    lentas que `latency_slo` cuentan como fallo. Abierto, rechaza todo durante
+    `reset_timeout` segundos y después deja pasar una única llamada de prueba
+    (half-open): si va bien se cierra, si no vuelve a abrirse.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0, latency_slo: float = 5.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_slo = latency_slo
+
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+
+        self.opened_total = 0
+        self.rejected_total = 0
+        self.slow_calls_total = 0
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            # Una prueba cada vez; si la anterior se perdió (cancelada) se permite otra
+            now = time.monotonic()
+            if not self._probe_in_flight or now - self._probe_started_at >= self.reset_timeout:
+                self._probe_in_flight = True
+                self._probe_started_at = now
+                return True
+        self.rejected_total += 1
+        return False
+
+    def record_success(self, latency: float):
+        if self.latency_slo and latency > self.latency_slo:
+            self.slow_calls_total += 1
+            self.record_failure()
+            return
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened_total += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "opened_total": self.opened_total,
+            "rejected_total": self.rejected_total,
+            "slow_calls_total": self.slow_calls_total,
+        }
+
+
+class CircuitBreakerRegistry:
+    """Un breaker por familia de endpoints, creado bajo demanda."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, latency_slo: float = 5.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_slo = latency_slo
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_endpoint(self, endpoint: str) -> CircuitBreaker:
+        family = endpoint_family(endpoint)
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            breaker = CircuitBreaker(family, self.failure_threshold, self.reset_timeout, self.latency_slo)
+            self._breakers[family] = breaker
+        return breaker
+
+    def stats(self) -> Dict[str, Any]:
+        return {family: breaker.stats() for family, breaker in self._breakers.items()}
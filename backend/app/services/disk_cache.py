@@ -0,0 +1,250 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from app.services.cache import CacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Subir cuando cambie el formato de lo que se guarda: las filas viejas se ignoran
+# y la compactación las borra.
+FORMAT_VERSION = 1
+
+_SCHEMA = """
+create table if not exists cache_entries (
+    key text primary key,
+    tier text not null,
+    format_version integer not null,
+    revision integer not null default 1,
+    value text not null,
+    stored_at real not null,
+    expires_at real not null,
+    stale_until real not null,
+    etag text,
+    last_modified text,
+    size integer not null default 0
+);
+create index if not exists idx_cache_entries_stale_until on cache_entries(stale_until);
+"""
+
+_UPSERT = (
+    "insert into cache_entries (key, tier, format_version, value, stored_at, expires_at, stale_until, "
+    "etag, last_modified, size) values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "on conflict(key) do update set tier = excluded.tier, format_version = excluded.format_version, "
+    "revision = cache_entries.revision + 1, value = excluded.value, stored_at = excluded.stored_at, "
+    "expires_at = excluded.expires_at, stale_until = excluded.stale_until, etag = excluded.etag, "
+    "last_modified = excluded.last_modified, size = excluded.size"
+)
+
+
+class DiskCache:
+    """Caché persistente en SQLite para datos de referencia de Wyscout.
+
+    Sobrevive a reinicios/deploys: la caché en memoria lee a través de ella en
+    cada miss y escribe en ella cada respuesta nueva. Las operaciones corren en
+    un thread para no bloquear el event loop.
+    """
+
+    def __init__(self, path: str, retention: float = 30 * 24 * 3600):
+        self.path = path
+        self.retention = retention
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute("pragma synchronous=normal")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+        self.reads = 0
+        self.hits = 0
+        self.writes = 0
+        self.compactions = 0
+        self.rows_compacted = 0
+        # Último recuento de filas (se actualiza fuera del event loop, ver count())
+        self.rows: Optional[int] = None
+
+    @staticmethod
+    def encode_key(key: Hashable) -> str:
+        return json.dumps(key, separators=(",", ":"), default=str)
+
+    def _get(self, key: Hashable) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "select value, stored_at, expires_at, stale_until, etag, last_modified, size from cache_entries "
+                "where key = ? and format_version = ?",
+                (self.encode_key(key), FORMAT_VERSION),
+            ).fetchone()
+        self.reads += 1
+        if row is None:
+            return None
+        self.hits += 1
+        return self._entry_from_row(row)
+
+    @staticmethod
+    def _entry_from_row(row) -> CacheEntry:
+        value, stored_at, expires_at, stale_until, etag, last_modified, size = row
+        entry = CacheEntry(json.loads(value), 0, 0, now=stored_at, etag=etag, last_modified=last_modified, size=size)
+        entry.expires_at = expires_at
+        entry.stale_until = stale_until
+        return entry
+
+    def _get_many(self, keys: List[Hashable]) -> Dict[str, CacheEntry]:
+        found: Dict[str, CacheEntry] = {}
+        encoded = [self.encode_key(k) for k in keys]
+        # Por tandas: sqlite limita el número de parámetros por consulta
+        for start in range(0, len(encoded), 500):
+            chunk = encoded[start:start + 500]
+            with self._lock:
+                rows = self._conn.execute(
+                    "select key, value, stored_at, expires_at, stale_until, etag, last_modified, size "
+                    f"from cache_entries where format_version = ? and key in ({','.join('?' * len(chunk))})",
+                    (FORMAT_VERSION, *chunk),
+                ).fetchall()
+            for row in rows:
+                found[row[0]] = self._entry_from_row(row[1:])
+        self.reads += len(keys)
+        self.hits += len(found)
+        return found
+
+    def _rows(self, tier: str, items: Iterable[Tuple[Hashable, CacheEntry]]) -> List[tuple]:
+        return [
+            (self.encode_key(key), tier, FORMAT_VERSION, json.dumps(entry.value, separators=(",", ":")),
+             entry.stored_at, entry.expires_at, entry.stale_until, entry.etag, entry.last_modified, entry.size)
+            for key, entry in items
+        ]
+
+    def _set_many(self, tier: str, items: List[Tuple[Hashable, CacheEntry]]):
+        rows = self._rows(tier, items)
+        with self._lock:
+            self._conn.execute("begin")
+            try:
+                self._conn.executemany(_UPSERT, rows)
+                self._conn.execute("commit")
+            except BaseException:
+                self._conn.execute("rollback")
+                raise
+        self.writes += len(rows)
+
+    def _set(self, tier: str, key: Hashable, entry: CacheEntry):
+        rows = self._rows(tier, [(key, entry)])
+        with self._lock:
+            self._conn.execute(_UPSERT, rows[0])
+        self.writes += 1
+
+    def _delete_expired(self) -> int:
+        cutoff = time.time() - self.retention
+        with self._lock:
+            cursor = self._conn.execute(
+                "delete from cache_entries where stale_until < ? or format_version != ?",
+                (cutoff, FORMAT_VERSION),
+            )
+        return cursor.rowcount
+
+    def _vacuum(self):
+        """VACUUM con su propia conexión: no retiene el lock de lecturas/escrituras mientras reescribe el fichero."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("vacuum")
+        finally:
+            conn.close()
+
+    def _count(self) -> int:
+        with self._lock:
+            return self._conn.execute("select count(*) from cache_entries").fetchone()[0]
+
+    async def get(self, key: Hashable) -> Optional[CacheEntry]:
+        try:
+            return await asyncio.to_thread(self._get, key)
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache: error leyendo {key}: {e}")
+            return None
+
+    def _touch(self, key: Hashable, entry: CacheEntry):
+        with self._lock:
+            self._conn.execute(
+                "update cache_entries set stored_at = ?, expires_at = ?, stale_until = ? where key = ?",
+                (entry.stored_at, entry.expires_at, entry.stale_until, self.encode_key(key)),
+            )
+        self.writes += 1
+
+    async def touch(self, key: Hashable, entry: CacheEntry):
+        """Sólo renueva los tiempos (revalidación 304): no reescribe el cuerpo."""
+        try:
+            await asyncio.to_thread(self._touch, key, entry)
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache: error renovando {key}: {e}")
+
+    async def set(self, tier: str, key: Hashable, entry: CacheEntry):
+        try:
+            await asyncio.to_thread(self._set, tier, key, entry)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Disk cache: error guardando {key}: {e}")
+
+    async def get_many(self, keys: List[Hashable]) -> Dict[str, CacheEntry]:
+        """Varias claves en una sola consulta; el resultado va por clave codificada (encode_key)."""
+        if not keys:
+            return {}
+        try:
+            return await asyncio.to_thread(self._get_many, keys)
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache: error leyendo {len(keys)} claves: {e}")
+            return {}
+
+    async def set_many(self, tier: str, items: List[Tuple[Hashable, CacheEntry]]):
+        """Varias entradas en una sola transacción."""
+        if not items:
+            return
+        try:
+            await asyncio.to_thread(self._set_many, tier, items)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Disk cache: error guardando {len(items)} entradas: {e}")
+
+    async def compact(self) -> int:
+        deleted = await asyncio.to_thread(self._delete_expired)
+        if deleted:
+            await asyncio.to_thread(self._vacuum)
+        self.compactions += 1
+        self.rows_compacted += deleted
+        await self.count()
+        return deleted
+
+    async def count(self) -> Optional[int]:
+        """Recuenta las filas en un thread; stats() devuelve el último recuento."""
+        try:
+            self.rows = await asyncio.to_thread(self._count)
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache: error contando filas: {e}")
+        return self.rows
+
+    async def compaction_loop(self, interval: float):
+        """Compacta periódicamente (filas caducadas hace más de `retention` o de otro formato)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                deleted = await self.compact()
+                if deleted:
+                    logger.info(f"Disk cache: compactadas {deleted} entradas")
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache: compactación falló: {e}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "rows": self.rows,
+            "reads": self.reads,
+            "hits": self.hits,
+            "writes": self.writes,
+            "compactions": self.compactions,
+            "rows_compacted": self.rows_compacted,
+        }
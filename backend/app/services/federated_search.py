@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+from app.services.name_index import name_key
+from app.services.player_search import name_score
+
+logger = logging.getLogger(__name__)
+
+# Fuentes con datos del propio club: a igual parecido de nombre van primero
+CLUB_SOURCES = frozenset({"manual", "manual_players", "scout_reports", "player_profiles"})
+CLUB_BOOST = 0.1
+
+
+class SearchSource:
+    """Una fuente de la búsqueda federada: corrutina sin argumentos + plazo en segundos."""
+
+    __slots__ = ("name", "run", "deadline")
+
+    def __init__(self, name: str, run: Callable[[], Awaitable[List[Dict[str, Any]]]], deadline: float):
+        self.name = name
+        self.run = run
+        self.deadline = deadline
+
+
+class RecentQueries:
+    """Resultados por fuente de las consultas recientes, por (club, tipo, consulta). LRU con TTL."""
+
+    def __init__(self, max_entries: int = 2000, ttl: float = 120):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Dict[str, List[Dict[str, Any]]]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Dict[str, List[Dict[str, Any]]]:
+        item = self._data.get(key)
+        if item is None or time.time() >= item[0]:
+            self._data.pop(key, None)
+            self.misses += 1
+            return {}
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def put(self, key: Hashable, source: str, hits: List[Dict[str, Any]]):
+        item = self._data.get(key)
+        if item is None or time.time() >= item[0]:
+            item = (time.time() + self.ttl, {})
+        item[1][source] = hits
+        self._data[key] = item
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class FederatedSearch:
+    """Búsqueda en varias fuentes a la vez (Wyscout, catálogo local, datos del club).
+
+    Cada fuente tiene su plazo: lo que llega dentro se devuelve y lo que no se
+    marca como "timeout". Una fuente que se pasa del plazo sigue corriendo
+    (hasta `late_timeout`) y su resultado entra en la caché de consultas
+    recientes, así que la misma consulta un momento después ya sale completa
+    aunque la búsqueda de Wyscout vaya lenta.
+    """
+
+    def __init__(self, cache_ttl: float = 120, max_entries: int = 2000, late_timeout: float = 10.0):
+        self.cache = RecentQueries(max_entries, cache_ttl)
+        self.late_timeout = late_timeout
+        self._in_flight: Dict[Tuple[Hashable, str], asyncio.Task] = {}
+        self.searches = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.late_fills = 0
+
+    async def search(self, key: Hashable, sources: List[SearchSource]) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, str]]:
+        """(resultados por fuente, estado por fuente: ok/cached/timeout/error)."""
+        self.searches += 1
+        cached = self.cache.get(key)
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        status: Dict[str, str] = {}
+        waits = []
+        for source in sources:
+            if source.name in cached:
+                results[source.name] = cached[source.name]
+                status[source.name] = "cached"
+                continue
+            task = self._in_flight.get((key, source.name))
+            if task is None:
+                task = self._start(key, source)
+            waits.append(self._wait(source, task, results, status))
+        if waits:
+            await asyncio.gather(*waits)
+        return results, status
+
+    def _start(self, key: Hashable, source: SearchSource) -> asyncio.Task:
+        task = asyncio.ensure_future(asyncio.wait_for(source.run(), self.late_timeout))
+        self._in_flight[(key, source.name)] = task
+
+        def done(t: asyncio.Task):
+            self._in_flight.pop((key, source.name), None)
+            if t.cancelled():
+                return
+            if t.exception() is not None:
+                logger.warning(f"Búsqueda federada: fuente {source.name} falló: {t.exception()!r}")
+                return
+            self.cache.put(key, source.name, t.result())
+
+        task.add_done_callback(done)
+        return task
+
+    async def _wait(self, source: SearchSource, task: asyncio.Task, results: Dict, status: Dict):
+        # asyncio.wait no cancela la task: si se pasa del plazo sigue y llena la caché
+        await asyncio.wait({task}, timeout=source.deadline)
+        if not task.done():
+            status[source.name] = "timeout"
+            self.timeouts += 1
+            task.add_done_callback(self._count_late_fill)
+        elif task.cancelled() or task.exception() is not None:
+            status[source.name] = "error"
+            self.errors += 1
+        else:
+            results[source.name] = task.result()
+            status[source.name] = "ok"
+
+    def _count_late_fill(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is None:
+            self.late_fills += 1
+
+    async def aclose(self):
+        tasks = list(self._in_flight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "searches": self.searches,
+            "cached_queries": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "late_fills": self.late_fills,
+            "in_flight": len(self._in_flight),
+        }
+
+
+def merge_hits(query: str, results: Dict[str, List[Dict[str, Any]]], limit: int = 20) -> List[Dict[str, Any]]:
+    """Une los resultados de todas las fuentes y los ordena por parecido con la consulta.
+
+    El mismo jugador o equipo visto en varias fuentes sale una vez (por wyId o,
+    sin wyId, por nombre), completando los campos vacíos y con `sources`.
+    """
+    merged: Dict[Tuple, Dict[str, Any]] = {}
+    for source, hits in results.items():
+        for hit in hits:
+            name = hit.get("name")
+            if not name:
+                continue
+            kind = hit.get("type", "player")
+            key = (kind, hit["wyscout_id"]) if hit.get("wyscout_id") else (kind, "name", name_key(name))
+            current = merged.get(key)
+            if current is None:
+                merged[key] = current = {**hit, "sources": []}
+            else:
+                for field, value in hit.items():
+                    if current.get(field) in (None, "", "Unknown") and value not in (None, ""):
+                        current[field] = value
+            if source not in current["sources"]:
+                current["sources"].append(source)
+
+    def rank(hit: Dict[str, Any]) -> Tuple[float, int]:
+        score = name_score(query, hit["name"])
+        if CLUB_SOURCES.intersection(hit["sources"]):
+            score += CLUB_BOOST
+        hit["score"] = round(score, 3)
+        return score, len(hit["sources"])
+
+    return sorted(merged.values(), key=rank, reverse=True)[:limit]
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.player_records import intern_str
+from app.services.scheduler import Priority, priority
+
+logger = logging.getLogger(__name__)
+
+
+class HierarchyIndex:
+    """Árbol áreas -> competiciones -> equipos de Wyscout, en memoria.
+
+    Las filas se guardan ya en el formato de respuesta y los hijos de cada
+    nodo ya ordenados por nombre, con diccionarios por id para las búsquedas
+    (área -> alpha3, competición, equipo). Al arrancar se precargan las áreas,
+    todas las competiciones y los equipos de las competiciones de primera(s)
+    división(es); el resto de equipos se cargan la primera vez que se piden y
+    desde entonces se quedan. `run` refresca todo lo cargado cada `interval`
+    en segundo plano, cambiando cada lista entera (nunca a medias).
+
+    Las respuestas degradadas (copia caducada que sirve el cliente cuando
+    Wyscout falla) se sirven pero no se guardan.
+    """
+
+    def __init__(self, wyscout, preload_max_division: int = 2, concurrency: int = 4):
+        self.wyscout = wyscout
+        self.preload_max_division = preload_max_division
+        self.concurrency = concurrency
+        self._areas: Dict[int, Dict[str, Any]] = {}
+        self._area_list: List[Dict[str, Any]] = []
+        self._competitions: Dict[int, Dict[str, Any]] = {}
+        self._area_competitions: Dict[int, List[Dict[str, Any]]] = {}
+        self._teams: Dict[int, Dict[str, Any]] = {}
+        self._competition_teams: Dict[int, List[Dict[str, Any]]] = {}
+        self.loaded_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    # ---- lecturas O(1) ----
+
+    def area(self, area_id: int) -> Optional[Dict[str, Any]]:
+        return self._areas.get(area_id)
+
+    def competition(self, competition_id: int) -> Optional[Dict[str, Any]]:
+        return self._competitions.get(competition_id)
+
+    def team(self, team_id: int) -> Optional[Dict[str, Any]]:
+        return self._teams.get(team_id)
+
+    # ---- navegación (carga lo que falte) ----
+
+    async def areas(self) -> List[Dict[str, Any]]:
+        if self._area_list:
+            self.hits += 1
+            return self._area_list
+        self.misses += 1
+        return await self._load_areas()
+
+    async def competitions(self, area_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Competiciones del área ordenadas por nombre; None si el área no existe."""
+        rows = self._area_competitions.get(area_id)
+        if rows is not None:
+            self.hits += 1
+            return rows
+        if not self._areas:
+            await self._load_areas()
+        if not (self._areas.get(area_id) or {}).get("alpha3_code"):
+            return None
+        self.misses += 1
+        return await self._load_competitions(area_id)
+
+    async def teams(self, competition_id: int) -> List[Dict[str, Any]]:
+        rows = self._competition_teams.get(competition_id)
+        if rows is not None:
+            self.hits += 1
+            return rows
+        self.misses += 1
+        return await self._load_teams(competition_id)
+
+    # ---- carga ----
+
+    async def _load_areas(self) -> List[Dict[str, Any]]:
+        data = await self.wyscout.get_areas()
+        rows = sorted(
+            (
+                {
+                    "id": area.get("id"),
+                    "name": intern_str(area.get("name")),
+                    "alpha2_code": intern_str(area.get("alpha2code")),
+                    "alpha3_code": intern_str(area.get("alpha3code")),
+                }
+                for area in data
+                if area.get("id") is not None and area.get("name")
+            ),
+            key=lambda row: row["name"],
+        )
+        self._areas = {row["id"]: row for row in rows}
+        self._area_list = rows
+        return rows
+
+    async def _load_competitions(self, area_id: int) -> List[Dict[str, Any]]:
+        area = self._areas[area_id]
+        data = await self.wyscout.get_competitions(area["alpha3_code"])
+        rows = sorted(
+            (
+                {
+                    "id": comp.get("wyId"),
+                    "name": comp.get("name"),
+                    "area_name": area["name"],
+                    "format": intern_str(comp.get("format", "Unknown")),
+                    "gender": intern_str(comp.get("gender", "Unknown")),
+                    "division_level": comp.get("divisionLevel", 0),
+                }
+                for comp in data.get("competitions", [])
+                if comp.get("wyId") is not None
+            ),
+            key=lambda row: row["name"] or "",
+        )
+        if data.get("stale"):
+            return rows
+        for row in self._area_competitions.get(area_id, ()):
+            self._competitions.pop(row["id"], None)
+        for row in rows:
+            self._competitions[row["id"]] = row
+        self._area_competitions[area_id] = rows
+        return rows
+
+    async def _load_teams(self, competition_id: int) -> List[Dict[str, Any]]:
+        data = await self.wyscout.get_competition_teams(competition_id)
+        rows = sorted(
+            (
+                {
+                    "id": team.get("wyId"),
+                    "name": team.get("name"),
+                    "official_name": team.get("officialName"),
+                    "city": intern_str(team.get("city")),
+                    "area_name": intern_str((team.get("area") or {}).get("name")),
+                }
+                for team in data.get("teams", [])
+                if team.get("wyId") is not None
+            ),
+            key=lambda row: row["name"] or "",
+        )
+        if data.get("stale"):
+            return rows
+        for row in rows:
+            self._teams[row["id"]] = row
+        self._competition_teams[competition_id] = rows
+        return rows
+
+    # ---- precarga y refresco ----
+
+    async def _load_all(self, loader, ids: List[int]) -> int:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        failed = 0
+
+        async def one(item_id):
+            nonlocal failed
+            async with semaphore:
+                try:
+                    await loader(item_id)
+                except Exception as e:
+                    failed += 1
+                    logger.warning(f"Índice de navegación: no se pudo cargar {item_id}: {e}")
+
+        await asyncio.gather(*(one(item_id) for item_id in ids))
+        return failed
+
+    async def refresh(self):
+        """Recarga áreas, competiciones de todas las áreas y los equipos ya cargados
+        más los de las competiciones de primeras divisiones."""
+        started = time.perf_counter()
+        with priority(Priority.BACKGROUND):
+            await self._load_areas()
+            failed = await self._load_all(
+                self._load_competitions, [aid for aid, row in self._areas.items() if row["alpha3_code"]]
+            )
+            competitions = set(self._competition_teams)
+            if self.preload_max_division > 0:
+                competitions.update(
+                    cid for cid, row in self._competitions.items()
+                    if 0 < (row["division_level"] or 0) <= self.preload_max_division
+                )
+            failed += await self._load_all(self._load_teams, sorted(competitions))
+        self.loaded_at = time.time()
+        self.refreshes += 1
+        self.refresh_errors += failed
+        logger.info(
+            f"Índice de navegación: {len(self._areas)} áreas, {len(self._competitions)} competiciones, "
+            f"{len(self._teams)} equipos en {time.perf_counter() - started:.1f}s ({failed} fallos)"
+        )
+
+    async def run(self, interval: float):
+        """Precarga al arrancar y refresco periódico (task de fondo del lifespan)."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.warning(f"Índice de navegación: refresco fallido: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "areas": len(self._areas),
+            "competitions": len(self._competitions),
+            "competitions_with_teams": len(self._competition_teams),
+            "teams": len(self._teams),
+            "loaded_at": self.loaded_at,
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Metadata:
+    """Resultado de MetadataResolver.resolve: objetos Wyscout por wyId (los que no se pudieron obtener no están)."""
+
+    __slots__ = ("teams", "competitions", "seasons")
+
+    def __init__(self, teams: Dict[int, Dict[str, Any]], competitions: Dict[int, Dict[str, Any]], seasons: Dict[int, Dict[str, Any]]):
+        self.teams = teams
+        self.competitions = competitions
+        self.seasons = seasons
+
+    def team_name(self, team_id: Optional[int], default: str = "") -> str:
+        return (self.teams.get(team_id) or {}).get("name") or default
+
+    def competition_name(self, competition_id: Optional[int], default: str = "") -> str:
+        return (self.competitions.get(competition_id) or {}).get("name") or default
+
+    def season_name(self, season_id: Optional[int], default: str = "") -> str:
+        return (self.seasons.get(season_id) or {}).get("name") or default
+
+
+class MetadataResolver:
+    """Equipos, competiciones y temporadas por id, en una sola llamada por lote.
+
+    Todo se pide a la vez: equipos y competiciones por el catálogo local
+    (CatalogRepository: filas al día sin ir a Wyscout, el resto a Wyscout y de
+    vuelta al catálogo) y temporadas directamente al cliente Wyscout, cuya
+    caché de referencia (memoria + disco) y coalescing evitan repetir llamadas
+    entre requests. Un id que falla no tumba el lote: simplemente no aparece.
+    """
+
+    def __init__(self, wyscout, catalog):
+        self.wyscout = wyscout
+        self.catalog = catalog
+        self.batches = 0
+        self.requested = {"teams": 0, "competitions": 0, "seasons": 0}
+        self.unresolved = {"teams": 0, "competitions": 0, "seasons": 0}
+
+    async def resolve(
+        self,
+        team_ids: Iterable[Optional[int]] = (),
+        competition_ids: Iterable[Optional[int]] = (),
+        season_ids: Iterable[Optional[int]] = (),
+    ) -> Metadata:
+        team_ids = {t for t in team_ids if t}
+        competition_ids = {c for c in competition_ids if c}
+        season_ids = {s for s in season_ids if s}
+        self.batches += 1
+        teams, competitions, seasons = await asyncio.gather(
+            self._guard("teams", self.catalog.get_teams(team_ids)),
+            self._guard("competitions", self.catalog.get_competitions(competition_ids)),
+            self._guard("seasons", self._seasons(season_ids)),
+        )
+        for kind, wanted, found in (("teams", team_ids, teams), ("competitions", competition_ids, competitions), ("seasons", season_ids, seasons)):
+            self.requested[kind] += len(wanted)
+            self.unresolved[kind] += len(wanted - set(found))
+        return Metadata(teams, competitions, seasons)
+
+    async def _guard(self, kind: str, coro) -> Dict[int, Dict[str, Any]]:
+        try:
+            return await coro
+        except Exception as e:
+            logger.warning(f"Metadatos: no se pudieron resolver {kind}: {e}")
+            return {}
+
+    async def _seasons(self, season_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        async def fetch(sid):
+            try:
+                return sid, await self.wyscout.get_season(sid)
+            except Exception as e:
+                logger.warning(f"Metadatos: no se pudo obtener temporada {sid}: {e}")
+                return sid, None
+
+        results = await asyncio.gather(*(fetch(sid) for sid in season_ids))
+        return {sid: season for sid, season in results if isinstance(season, dict)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"batches": self.batches, "requested": self.requested, "unresolved": self.unresolved}
@@ -0,0 +1,103 @@
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def fold(name: str) -> str:
+    """Sin tildes y en minúsculas ("Peñarol" -> "penarol")."""
+    folded = unicodedata.normalize("NFKD", name)
+    return "".join(c for c in folded if not unicodedata.combining(c)).casefold()
+
+
+def tokens(name: str) -> List[str]:
+    """Palabras del nombre sin tildes, mayúsculas ni puntuación, en orden."""
+    return [t for t in _SEPARATORS.split(fold(name)) if t]
+
+
+def name_key(name: str) -> str:
+    """Clave independiente de tildes, mayúsculas, puntuación y orden de palabras.
+
+    "Sánchez, Alexis", "alexis  sanchez" y "Alexis Sánchez" dan la misma clave.
+    """
+    return " ".join(sorted(tokens(name)))
+
+
+class NameIndex:
+    """Nombre de jugador -> wyId, en memoria, con todo jugador que pasa por el backend.
+
+    Se alimenta de plantillas, listados de competición, búsquedas, fichas de
+    batch-info, informes y mercados. Por cada jugador se indexan varias formas
+    (shortName, nombre + apellidos completos y primer nombre + primer apellido,
+    como se suelen escribir los nombres hispanos). Una clave que apunta a
+    jugadores distintos es ambigua y no se resuelve: ahí decide la búsqueda de
+    Wyscout.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, Union[int, Tuple[int, ...]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.ambiguous_lookups = 0
+
+    def add(self, name: Optional[str], wyscout_id: Any):
+        if not name or not wyscout_id:
+            return
+        try:
+            wyscout_id = int(wyscout_id)
+        except (TypeError, ValueError):
+            return
+        key = name_key(name)
+        if not key:
+            return
+        current = self._ids.get(key)
+        if current is None:
+            self._ids[key] = wyscout_id
+        elif isinstance(current, int):
+            if current != wyscout_id:
+                self._ids[key] = (current, wyscout_id)
+        elif wyscout_id not in current:
+            self._ids[key] = current + (wyscout_id,)
+
+    def add_player(self, player: Dict[str, Any]):
+        """Jugador en formato Wyscout (wyId, shortName, firstName, lastName)."""
+        wyscout_id = player.get("wyId")
+        if not wyscout_id:
+            return
+        self.add(player.get("shortName"), wyscout_id)
+        first = (player.get("firstName") or "").split()
+        last = (player.get("lastName") or "").split()
+        if first and last:
+            self.add(" ".join(first + last), wyscout_id)
+            if len(first) > 1 or len(last) > 1:
+                self.add(f"{first[0]} {last[0]}", wyscout_id)
+
+    def add_players(self, players: Iterable[Dict[str, Any]]):
+        for player in players:
+            if isinstance(player, dict):
+                self.add_player(player)
+
+    def resolve(self, name: str) -> Optional[int]:
+        """wyId si el nombre es conocido y no ambiguo."""
+        found = self._ids.get(name_key(name))
+        if isinstance(found, int):
+            self.hits += 1
+            return found
+        if found is None:
+            self.misses += 1
+        else:
+            self.ambiguous_lookups += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self._ids),
+            "ambiguous_keys": sum(1 for v in self._ids.values() if not isinstance(v, int)),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ambiguous_lookups": self.ambiguous_lookups,
+        }
+
+
+NAMES = NameIndex()
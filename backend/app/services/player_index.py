@@ -0,0 +1,116 @@
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+def years_before(today: date, years: int) -> date:
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:  # 29 de febrero
+        return today.replace(year=today.year - years, day=28)
+
+
+class PlayerIndex:
+    """Índice en memoria sobre los jugadores (formato browse) de una competición.
+
+    Nacionalidad, posición y pie por listas invertidas, edad por fechas de
+    nacimiento ordenadas (búsqueda binaria). Las consultas devuelven
+    posiciones en `players`, en el orden original.
+    """
+
+    def __init__(self, players: List[Dict[str, Any]], partial: bool = False):
+        self.players = players
+        self.partial = partial  # faltó algún equipo o el listado (no se cachea)
+        self.by_nationality: Dict[str, List[int]] = {}
+        self.by_position: Dict[str, List[int]] = {}
+        self.by_foot: Dict[str, List[int]] = {}
+        births: List[Tuple[str, int]] = []
+        for i, p in enumerate(players):
+            for nationality in p.get("nationalities") or []:
+                self.by_nationality.setdefault(nationality.casefold(), []).append(i)
+            self.by_position.setdefault((p.get("position") or "").casefold(), []).append(i)
+            if p.get("foot"):
+                self.by_foot.setdefault(p["foot"].casefold(), []).append(i)
+            birth_date = (p.get("birthDate") or "")[:10]
+            if len(birth_date) == 10:
+                births.append((birth_date, i))
+        births.sort()
+        self._birth_keys = [b for b, _ in births]
+        self._birth_rows = [i for _, i in births]
+        self.nationalities = sorted({n for p in players for n in p.get("nationalities") or []})
+
+    def _lookup(self, index: Dict[str, List[int]], values: Iterable[str]) -> set:
+        rows: set = set()
+        for value in values:
+            rows.update(index.get(value.casefold(), ()))
+        return rows
+
+    def _age_range(self, min_age: Optional[int], max_age: Optional[int], today: date) -> set:
+        # edad >= min  <=>  nacido como tarde hace `min` años; edad <= max  <=>  nacido después de hace max+1 años
+        lo = bisect_right(self._birth_keys, years_before(today, max_age + 1).isoformat()) if max_age is not None else 0
+        hi = bisect_right(self._birth_keys, years_before(today, min_age).isoformat()) if min_age is not None else len(self._birth_keys)
+        return set(self._birth_rows[lo:hi])
+
+    def query(
+        self,
+        nationalities: Optional[List[str]] = None,
+        positions: Optional[List[str]] = None,
+        feet: Optional[List[str]] = None,
+        min_age: Optional[int] = None,
+        max_age: Optional[int] = None,
+        today: Optional[date] = None,
+    ) -> List[int]:
+        selected: Optional[set] = None
+        if nationalities:
+            selected = self._lookup(self.by_nationality, nationalities)
+        if positions:
+            rows = self._lookup(self.by_position, positions)
+            selected = rows if selected is None else selected & rows
+        if feet:
+            rows = self._lookup(self.by_foot, feet)
+            selected = rows if selected is None else selected & rows
+        if min_age is not None or max_age is not None:
+            rows = self._age_range(min_age, max_age, today or date.today())
+            selected = rows if selected is None else selected & rows
+        if selected is None:
+            return list(range(len(self.players)))
+        return sorted(selected)
+
+
+class PlayerIndexCache:
+    """Índices recientes por (competición, equipos), LRU con TTL corto."""
+
+    def __init__(self, max_entries: int = 32, ttl: float = 600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, PlayerIndex]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.partial = 0  # índices incompletos que no se cachearon
+
+    def get(self, key: Hashable) -> Optional[PlayerIndex]:
+        item = self._data.get(key)
+        if item is None or time.time() >= item[0]:
+            self._data.pop(key, None)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: Hashable, index: PlayerIndex):
+        self._data[key] = (time.time() + self.ttl, index)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "indexes": len(self._data),
+            "players": sum(len(index.players) for _, index in self._data.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "partial": self.partial,
+        }
@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services.cache import CacheEntry
+from app.services.disk_cache import DiskCache
+from app.services.name_index import fold
+from app.services.player_records import ImageCharges, PlayerInfo
+from app.services.scheduler import Priority, priority
+
+logger = logging.getLogger(__name__)
+
+DISK_TIER = "batch_info"
+
+
+def normalize_name(name: str) -> str:
+    """Clave de nombre sin tildes, mayúsculas ni espacios de más ("José  Pérez" == "jose perez")."""
+    return " ".join(fold(name).split())
+
+
+class CachedPlayerInfo:
+    """PlayerInfo con vencimientos separados para los datos del jugador y los de contrato."""
+
+    __slots__ = ("info", "bio_expires_at", "contract_expires_at", "size")
+
+    def __init__(self, info: PlayerInfo, bio_expires_at: float, contract_expires_at: float):
+        self.info = info
+        self.bio_expires_at = bio_expires_at
+        self.contract_expires_at = contract_expires_at  # 0 = contrato nunca pedido
+        self.size = sys.getsizeof(self) + info.nbytes()
+
+
+class PlayerInfoCache:
+    """Caché de /api/players/batch-info.
+
+    Los datos del jugador (equipo, físico, posición) y los de contrato (vencimiento,
+    valor, agente) caducan por separado. Pasado el TTL se sirve la copia y se
+    refresca en segundo plano durante `stale_ttl`; después hay que esperar a
+    Wyscout. En memoria es un LRU acotado por bytes (fotos y escudos cuentan
+    una vez aunque los compartan muchos jugadores); con DiskCache cada entrada
+    se guarda también en SQLite, así que los tableros de mercado grandes se
+    vuelven a pintar desde caché tras un reinicio. Los nombres se guardan
+    normalizados (tildes, mayúsculas) y apuntan al wyId.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 16 * 1024 * 1024,
+        bio_ttl: float = 6 * 3600,
+        contract_ttl: float = 24 * 3600,
+        stale_ttl: float = 7 * 24 * 3600,
+        name_ttl: float = 30 * 24 * 3600,
+        max_names: int = 50000,
+        disk: Optional[DiskCache] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.bio_ttl = bio_ttl
+        self.contract_ttl = contract_ttl
+        self.stale_ttl = stale_ttl
+        self.name_ttl = name_ttl
+        self.max_names = max_names
+        self.disk = disk
+        self._data: "OrderedDict[int, CachedPlayerInfo]" = OrderedDict()
+        self._names: "OrderedDict[str, int]" = OrderedDict()
+        self._dirty: set = set()
+        self._dirty_names: set = set()
+        self._refreshing: set = set()
+        self._background_tasks: set = set()
+        self._images = ImageCharges()
+        self.bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.disk_loads = 0
+        self.evictions = 0
+
+    # ---- lectura ----
+
+    def peek(self, player_id: int) -> Optional[CachedPlayerInfo]:
+        """Sólo memoria, sin contar estadísticas (para otros endpoints que aprovechan lo cargado)."""
+        return self._data.get(player_id)
+
+    async def get_many(self, player_ids: List[int]) -> Dict[int, CachedPlayerInfo]:
+        found: Dict[int, CachedPlayerInfo] = {}
+        missing = []
+        for pid in player_ids:
+            entry = self._data.get(pid)
+            if entry is not None:
+                self._data.move_to_end(pid)
+                found[pid] = entry
+            else:
+                missing.append(pid)
+        if missing and self.disk:
+            rows = await self.disk.get_many([(DISK_TIER, pid) for pid in missing])
+            for pid in missing:
+                row = rows.get(DiskCache.encode_key((DISK_TIER, pid)))
+                if row is None:
+                    continue
+                try:
+                    value = row.value
+                    entry = CachedPlayerInfo(
+                        PlayerInfo.from_state(value["info"]), value["bio_expires_at"], value["contract_expires_at"]
+                    )
+                except (KeyError, TypeError) as e:
+                    logger.warning(f"Batch-info: entrada en disco inválida para {pid}: {e}")
+                    continue
+                self._insert(pid, entry)
+                found[pid] = entry
+                self.disk_loads += 1
+        return found
+
+    async def resolve_names(self, names: List[str]) -> Dict[str, int]:
+        """Nombre (tal como llega) -> wyId de los que ya se resolvieron alguna vez."""
+        resolved: Dict[str, int] = {}
+        missing: Dict[str, List[str]] = {}
+        for name in names:
+            key = normalize_name(name)
+            pid = self._names.get(key)
+            if pid is not None:
+                self._names.move_to_end(key)
+                resolved[name] = pid
+            elif key:
+                missing.setdefault(key, []).append(name)
+        if missing and self.disk:
+            rows = await self.disk.get_many([(DISK_TIER, "name", key) for key in missing])
+            now = time.time()
+            for key, originals in missing.items():
+                row = rows.get(DiskCache.encode_key((DISK_TIER, "name", key)))
+                if row is None or now >= row.expires_at:
+                    continue
+                self._remember(key, row.value)
+                for name in originals:
+                    resolved[name] = row.value
+        return resolved
+
+    def plan(self, entry: Optional[CachedPlayerInfo], need_contract: bool, now: Optional[float] = None) -> Tuple[bool, bool, bool]:
+        """(servir ya, pedir jugador, pedir contrato).
+
+        Si se sirve ya y hay algo que pedir, es un refresco en segundo plano;
+        si no, el llamador tiene que esperar a Wyscout.
+        """
+        now = time.time() if now is None else now
+        if entry is None or now >= entry.bio_expires_at + self.stale_ttl:
+            return False, True, need_contract
+        contract_missing = need_contract and now >= entry.contract_expires_at + self.stale_ttl
+        bio_stale = now >= entry.bio_expires_at
+        contract_stale = need_contract and now >= entry.contract_expires_at
+        if contract_missing:
+            return False, bio_stale, True
+        return True, bio_stale, contract_stale
+
+    # ---- escritura ----
+
+    def store(self, player_id: int, info: PlayerInfo, bio: bool, contract: bool) -> CachedPlayerInfo:
+        """Guarda el registro; `bio`/`contract` dicen qué partes se acaban de pedir a Wyscout."""
+        now = time.time()
+        previous = self._data.get(player_id)
+        bio_expires_at = now + self.bio_ttl if bio or previous is None else previous.bio_expires_at
+        if contract:
+            contract_expires_at = now + self.contract_ttl
+        else:
+            contract_expires_at = previous.contract_expires_at if previous is not None else 0
+        entry = CachedPlayerInfo(info, bio_expires_at, contract_expires_at)
+        self._insert(player_id, entry)
+        self._dirty.add(player_id)
+        return entry
+
+    def remember_name(self, name: str, player_id: int):
+        key = normalize_name(name)
+        if key:
+            self._remember(key, player_id)
+            self._dirty_names.add(key)
+
+    def _remember(self, key: str, player_id: int):
+        self._names[key] = player_id
+        self._names.move_to_end(key)
+        while len(self._names) > self.max_names:
+            self._names.popitem(last=False)
+
+    def _insert(self, player_id: int, entry: CachedPlayerInfo):
+        previous = self._data.pop(player_id, None)
+        if previous is not None:
+            self._release(previous)
+        if entry.size + ImageCharges.distinct_bytes(entry.info.images()) > self.max_bytes:
+            return
+        self._data[player_id] = entry
+        self.bytes += entry.size + self._images.add(entry.info.images())
+        while self.bytes > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self._release(evicted)
+            self.evictions += 1
+
+    def _release(self, entry: CachedPlayerInfo):
+        self.bytes -= entry.size + self._images.remove(entry.info.images())
+
+    async def flush(self):
+        """Escribe en disco lo guardado desde el último flush (una transacción)."""
+        dirty, self._dirty = self._dirty, set()
+        dirty_names, self._dirty_names = self._dirty_names, set()
+        if not self.disk:
+            return
+        items = []
+        for pid in dirty:
+            entry = self._data.get(pid)
+            if entry is None:
+                continue
+            disk_entry = CacheEntry(
+                {
+                    "info": entry.info.to_state(),
+                    "bio_expires_at": entry.bio_expires_at,
+                    "contract_expires_at": entry.contract_expires_at,
+                },
+                0,
+                0,
+            )
+            disk_entry.expires_at = min(entry.bio_expires_at, entry.contract_expires_at or entry.bio_expires_at)
+            disk_entry.stale_until = entry.bio_expires_at + self.stale_ttl
+            items.append(((DISK_TIER, pid), disk_entry))
+        for key in dirty_names:
+            if key in self._names:
+                items.append(((DISK_TIER, "name", key), CacheEntry(self._names[key], self.name_ttl, 0)))
+        await self.disk.set_many(DISK_TIER, items)
+
+    # ---- refresco ----
+
+    def refresh_in_background(self, player_id: int, refresh: Callable[[], Awaitable[Any]]):
+        if player_id in self._refreshing:
+            return
+
+        async def run():
+            try:
+                with priority(Priority.BACKGROUND):
+                    await refresh()
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Refresco en segundo plano de batch-info {player_id} falló: {e}")
+            finally:
+                self._refreshing.discard(player_id)
+
+        self._refreshing.add(player_id)
+        task = asyncio.ensure_future(run())
+        # Guardar referencia para que el GC no se lleve la task a medias
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def aclose(self):
+        """Al apagar: cortar refrescos pendientes y escribir lo que falte a disco."""
+        for task in list(self._background_tasks):
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await self.flush()
+
+    def record(self, served: bool, refetch: bool):
+        if not served:
+            self.misses += 1
+        elif refetch:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "players": len(self._data),
+            "names": len(self._names),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "disk_loads": self.disk_loads,
+            "evictions": self.evictions,
+            "refreshing": len(self._refreshing),
+        }
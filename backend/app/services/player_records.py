@@ -0,0 +1,259 @@
+import sys
+import weakref
+from datetime import date
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+def intern_str(value: Any) -> Any:
+    """sys.intern para strings repetidos (equipos, áreas, roles); el resto tal cual."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def age_from_birth_date(birth_date: Optional[str], today: Optional[date] = None) -> Optional[int]:
+    if not birth_date:
+        return None
+    try:
+        birth = date.fromisoformat(str(birth_date)[:10])
+    except ValueError:
+        return None
+    today = today or date.today()
+    return today.year - birth.year - ((today.month, today.day) < (birth.month, birth.day))
+
+
+class ImageRef:
+    __slots__ = ("data", "__weakref__")
+
+    def __init__(self, data: str):
+        self.data = data
+
+
+class ImagePool:
+    """Imágenes (URLs o data URLs base64) guardadas una sola vez y referenciadas.
+
+    Muchos jugadores comparten la silueta por defecto y todos los de un equipo
+    el mismo escudo. Una imagen se libera sola cuando ningún registro la usa;
+    `bytes` lleva la cuenta de las vivas, cada una una vez.
+    """
+
+    def __init__(self):
+        self._refs: "weakref.WeakValueDictionary[str, ImageRef]" = weakref.WeakValueDictionary()
+        self.bytes = 0
+
+    def ref(self, data: Optional[str]) -> Optional[ImageRef]:
+        if not data:
+            return None
+        image = self._refs.get(data)
+        if image is None:
+            image = ImageRef(data)
+            self._refs[data] = image
+            self.bytes += len(data)
+            weakref.finalize(image, self._release, len(data))
+        return image
+
+    def _release(self, nbytes: int):
+        self.bytes -= nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        return {"images": len(self._refs), "bytes": self.bytes}
+
+
+IMAGES = ImagePool()
+
+
+class ImageCharges:
+    """Imágenes del pool que retiene una caché, cargadas a su presupuesto una sola vez.
+
+    Una foto o escudo compartido por muchos registros cuenta lo que ocupa en el
+    pool, no una vez por registro: se suma al entrar el primero que la usa y
+    se resta al salir el último.
+    """
+
+    def __init__(self):
+        self._users: Dict[ImageRef, int] = {}
+
+    def add(self, images: Iterable[Optional[ImageRef]]) -> int:
+        """Bytes que pasan a cargarse (imágenes que esta caché no tenía)."""
+        charged = 0
+        for image in images:
+            if image is None:
+                continue
+            users = self._users.get(image, 0)
+            if users == 0:
+                charged += len(image.data)
+            self._users[image] = users + 1
+        return charged
+
+    def remove(self, images: Iterable[Optional[ImageRef]]) -> int:
+        """Bytes que dejan de cargarse (imágenes que ya no usa ningún registro)."""
+        released = 0
+        for image in images:
+            users = self._users.get(image)
+            if users is None:
+                continue
+            if users == 1:
+                del self._users[image]
+                released += len(image.data)
+            else:
+                self._users[image] = users - 1
+        return released
+
+    def clear(self):
+        self._users.clear()
+
+    @staticmethod
+    def distinct_bytes(images: Iterable[Optional[ImageRef]]) -> int:
+        return sum(len(image.data) for image in {i for i in images if i is not None})
+
+_nationality_combos: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _nationalities(birth_area: Optional[str], passport_area: Optional[str]) -> Tuple[str, ...]:
+    # Lista de nacionalidades sin duplicados; las combinaciones se comparten entre registros
+    combo = tuple(intern_str(n) for n in (birth_area, passport_area if passport_area != birth_area else None) if n)
+    return _nationality_combos.setdefault(combo, combo)
+
+
+def _area_name(area: Any) -> Optional[str]:
+    return area.get("name") if isinstance(area, dict) else None
+
+
+class SquadPlayer:
+    """Jugador normalizado para el browse (plantillas y listados de competición).
+
+    Sin equipo: lo pone quien serializa. La edad y el dict de respuesta se
+    calculan al serializar, no se guardan.
+    """
+
+    __slots__ = ("wyscout_id", "name", "position", "nationalities", "birth_date", "foot", "image")
+
+    def __init__(self, wyscout_id, name, position, nationalities, birth_date, foot, image):
+        self.wyscout_id = wyscout_id
+        self.name = name
+        self.position = position
+        self.nationalities = nationalities
+        self.birth_date = birth_date
+        self.foot = foot
+        self.image = image
+
+    @classmethod
+    def from_wyscout(cls, p: Dict[str, Any]) -> "SquadPlayer":
+        return cls(
+            p.get("wyId"),
+            p.get("shortName", "Unknown"),
+            intern_str((p.get("role") or {}).get("name", "Unknown")),
+            _nationalities(_area_name(p.get("birthArea")), _area_name(p.get("passportArea"))),
+            intern_str(p.get("birthDate")),
+            intern_str(p.get("foot") or None),
+            IMAGES.ref(p.get("imageDataURL")),
+        )
+
+    def nbytes(self) -> int:
+        """Memoria aproximada del registro (sin strings compartidos ni la imagen, ver images())."""
+        return sys.getsizeof(self) + sys.getsizeof(self.name)
+
+    def images(self) -> Tuple[Optional[ImageRef], ...]:
+        return (self.image,)
+
+    def to_dict(self, team_name: Optional[str]) -> Dict[str, Any]:
+        return {
+            "id": str(self.wyscout_id or ""),
+            "name": self.name,
+            "position": self.position,
+            "team": team_name,
+            "wyscout_id": self.wyscout_id,
+            "age": age_from_birth_date(self.birth_date),
+            "nationality": " / ".join(self.nationalities) if self.nationalities else "Unknown",
+            "nationalities": list(self.nationalities),
+            "birthDate": self.birth_date,
+            "foot": self.foot,
+            "imageDataURL": self.image.data if self.image else None,
+        }
+
+
+class PlayerInfo:
+    """Ficha corta de /api/players/batch-info (jugador + contrato)."""
+
+    __slots__ = (
+        "player_image", "short_name", "team_name", "team_image", "birth_date", "height", "weight", "foot",
+        "nationality", "nationality_code", "birth_country", "position", "contract_expires", "market_value", "agent",
+    )
+
+    def __init__(self, player: Dict[str, Any], contract: Optional[Dict[str, Any]] = None):
+        current_team = player.get("currentTeam") or {}
+        if not isinstance(current_team, dict):
+            current_team = {}
+        passport = player.get("passportArea") or {}
+        role = player.get("role") or {}
+
+        self.player_image = IMAGES.ref(player.get("imageDataURL"))
+        self.short_name = player.get("shortName")
+        self.team_name = intern_str(current_team.get("name"))
+        self.team_image = IMAGES.ref(current_team.get("imageDataURL"))
+        self.birth_date = intern_str(player.get("birthDate"))
+        self.height = player.get("height")
+        self.weight = player.get("weight")
+        self.foot = intern_str(player.get("foot"))
+        self.nationality = intern_str(passport.get("name")) if isinstance(passport, dict) else None
+        self.nationality_code = intern_str(passport.get("alpha3code")) if isinstance(passport, dict) else None
+        self.birth_country = intern_str(_area_name(player.get("birthArea")))
+        self.position = intern_str(role.get("name")) if isinstance(role, dict) else None
+        self.contract_expires = intern_str(player.get("contractExpirationDate"))
+        self.market_value = None
+        self.agent = None
+        self.set_contract(contract)
+
+    def set_contract(self, contract: Optional[Dict[str, Any]]):
+        """Campos de contractinfo (en caché tienen su propio TTL, se refrescan aparte)."""
+        if not isinstance(contract, dict):
+            return
+        self.contract_expires = intern_str(
+            contract.get("contractExpiration") or contract.get("contractExpirationDate") or self.contract_expires
+        )
+        self.market_value = contract.get("marketValue")
+        self.agent = intern_str(contract.get("agentName") or contract.get("agent"))
+
+    def to_state(self) -> Dict[str, Any]:
+        """Forma serializable (JSON) para la caché en disco."""
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state["player_image"] = self.player_image.data if self.player_image else None
+        state["team_image"] = self.team_image.data if self.team_image else None
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "PlayerInfo":
+        info = cls.__new__(cls)
+        for name in cls.__slots__:
+            value = state.get(name)
+            if name in ("player_image", "team_image"):
+                value = IMAGES.ref(value)
+            elif isinstance(value, str) and name != "short_name":
+                value = intern_str(value)
+            setattr(info, name, value)
+        return info
+
+    def nbytes(self) -> int:
+        """Memoria aproximada del registro (sin strings compartidos ni las imágenes, ver images())."""
+        return sys.getsizeof(self) + sys.getsizeof(self.short_name)
+
+    def images(self) -> Tuple[Optional[ImageRef], ...]:
+        return (self.player_image, self.team_image)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "player_image": self.player_image.data if self.player_image else None,
+            "short_name": self.short_name,
+            "team_name": self.team_name,
+            "team_image": self.team_image.data if self.team_image else None,
+            "age": age_from_birth_date(self.birth_date),
+            "birth_date": self.birth_date,
+            "height": self.height,
+            "weight": self.weight,
+            "foot": self.foot,
+            "nationality": self.nationality,
+            "nationality_code": self.nationality_code,
+            "birth_country": self.birth_country,
+            "position": self.position,
+            "contract_expires": self.contract_expires,
+            "market_value": self.market_value,
+            "agent": self.agent,
+        }
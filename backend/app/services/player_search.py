@@ -0,0 +1,218 @@
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.services.name_index import tokens
+from app.services.player_records import intern_str
+
+
+def _trigrams(token: str, partial: bool = False) -> Set[str]:
+    # Relleno al principio para que los prefijos cortos tengan sus propios trigramas
+    # ("  m", " me"); sin relleno final si el token está a medio escribir.
+    padded = f"  {token}" if partial else f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(query: str, token: str, partial: bool) -> float:
+    if token == query:
+        return 1.0
+    if token.startswith(query):
+        return 0.9 if partial else 0.8
+    a, b = _trigrams(query, partial), _trigrams(token, partial)
+    return len(a & b) / len(a | b)
+
+
+# Por palabra de la consulta: palabras del vocabulario (las más parecidas primero) y
+# jugadores que se llegan a puntuar. Un prefijo de una o dos letras casa con media
+# base; para el typeahead basta con los mejores.
+MAX_WORDS_PER_TOKEN = 64
+MAX_DOCS_PER_TOKEN = 2000
+
+
+def _query_words(query: str) -> Tuple[List[str], Optional[str]]:
+    """(palabras sin repetir, la que se está escribiendo). Las iniciales sueltas que no son
+    la última ("l messi") no aportan nada al ranking y casan con todo: se descartan."""
+    words = tokens(query)
+    if not words:
+        return [], None
+    typing = words[-1]
+    words = [w for w in dict.fromkeys(words) if len(w) > 1 or w == typing]
+    return words, typing
+
+
+def name_score(query: str, name: Optional[str]) -> float:
+    """Parecido 0..1 entre una consulta y un nombre, con el mismo criterio que el índice."""
+    words, typing = _query_words(query)
+    name_tokens = tokens(name or "")
+    if not words or not name_tokens:
+        return 0.0
+    total = sum(max(_similarity(word, token, word == typing) for token in name_tokens) for word in words)
+    return total / len(words)
+
+
+class CatalogPlayer:
+    """Lo mínimo para responder una búsqueda sin ir a Wyscout."""
+
+    __slots__ = ("wyscout_id", "name", "short_name", "position", "team", "birth_date", "nationality", "tokens")
+
+    def __init__(self, wyscout_id: int, name: str, short_name: Optional[str], position: Optional[str],
+                 team: Optional[str], birth_date: Optional[str], nationality: Optional[str]):
+        self.wyscout_id = wyscout_id
+        self.name = name
+        self.short_name = short_name
+        self.position = intern_str(position)
+        self.team = intern_str(team)
+        self.birth_date = intern_str(birth_date)
+        self.nationality = intern_str(nationality)
+        self.tokens = tuple(dict.fromkeys(tokens(name) + tokens(short_name or "")))
+
+
+class PlayerSearchIndex:
+    """Búsqueda local de jugadores por nombre: trigramas + prefijos, con ranking.
+
+    Indexa cada jugador que ve el backend (plantillas, listados, búsquedas,
+    fichas, informes, mercados). Los trigramas indexan el vocabulario (las
+    palabras distintas, sin tildes ni mayúsculas), no los jugadores: cada
+    palabra de la consulta se compara con las palabras parecidas y de ahí se
+    pasa a sus jugadores. El último token de la consulta se trata como prefijo
+    (typeahead) y el resto admite erratas. Un jugador que vuelve a verse se
+    actualiza (equipo, posición) sin duplicarse.
+    """
+
+    def __init__(self):
+        self._docs: List[CatalogPlayer] = []
+        self._doc_by_id: Dict[int, int] = {}
+        self._vocab: Dict[str, int] = {}
+        self._words: List[str] = []
+        self._word_docs: List[List[int]] = []
+        self._grams: Dict[str, List[int]] = {}
+        self.searches = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def get(self, wyscout_id: int) -> Optional[CatalogPlayer]:
+        doc = self._doc_by_id.get(wyscout_id)
+        return self._docs[doc] if doc is not None else None
+
+    def _word_id(self, word: str) -> int:
+        wid = self._vocab.get(word)
+        if wid is None:
+            wid = self._vocab[word] = len(self._words)
+            self._words.append(word)
+            self._word_docs.append([])
+            for gram in _trigrams(word):
+                self._grams.setdefault(gram, []).append(wid)
+        return wid
+
+    def add(self, entry: CatalogPlayer):
+        doc = self._doc_by_id.get(entry.wyscout_id)
+        previous_tokens: Tuple[str, ...] = ()
+        if doc is None:
+            doc = len(self._docs)
+            self._docs.append(entry)
+            self._doc_by_id[entry.wyscout_id] = doc
+        else:
+            previous = self._docs[doc]
+            # Lo que no traiga la fuente nueva se conserva de la anterior
+            for field in ("short_name", "position", "team", "birth_date", "nationality"):
+                if getattr(entry, field) is None:
+                    setattr(entry, field, getattr(previous, field))
+            self._docs[doc] = entry
+            previous_tokens = previous.tokens
+            for word in set(previous_tokens) - set(entry.tokens):
+                self._word_docs[self._vocab[word]].remove(doc)
+        for word in set(entry.tokens) - set(previous_tokens):
+            self._word_docs[self._word_id(word)].append(doc)
+
+    def add_player(self, player: Dict[str, Any], team_name: Optional[str] = None):
+        """Jugador en formato Wyscout; `team_name` si la fuente no trae currentTeam."""
+        wyscout_id = player.get("wyId")
+        if not wyscout_id:
+            return
+        first = (player.get("firstName") or "").strip()
+        last = (player.get("lastName") or "").strip()
+        short_name = player.get("shortName")
+        name = f"{first} {last}".strip() or short_name
+        if not name:
+            return
+        current_team = player.get("currentTeam")
+        team = current_team.get("name") if isinstance(current_team, dict) else None
+        role = player.get("role")
+        passport = player.get("passportArea")
+        self.add(CatalogPlayer(
+            int(wyscout_id),
+            name,
+            short_name,
+            role.get("name") if isinstance(role, dict) else None,
+            team or team_name,
+            player.get("birthDate"),
+            passport.get("name") if isinstance(passport, dict) else None,
+        ))
+
+    def add_players(self, players: Iterable[Dict[str, Any]], team_name: Optional[str] = None):
+        for player in players:
+            if isinstance(player, dict):
+                self.add_player(player, team_name)
+
+    def add_name(self, name: Optional[str], wyscout_id: Any):
+        """Sólo nombre + id (informes, mercados): no pisa un jugador ya conocido."""
+        try:
+            wyscout_id = int(wyscout_id)
+        except (TypeError, ValueError):
+            return
+        if name and wyscout_id not in self._doc_by_id:
+            self.add(CatalogPlayer(wyscout_id, name, None, None, None, None, None))
+
+    def _matches(self, word: str, partial: bool, min_similarity: float) -> Dict[int, float]:
+        """Jugador -> mejor similitud de alguna de sus palabras con `word`.
+
+        Primero se ordenan las palabras parecidas (más similitud y, a igualdad,
+        más cortas) y se pasa a sus jugadores en ese orden hasta los topes
+        MAX_WORDS_PER_TOKEN / MAX_DOCS_PER_TOKEN.
+        """
+        candidates: Set[int] = set()
+        for gram in _trigrams(word, partial):
+            candidates.update(self._grams.get(gram, ()))
+        similar = []
+        for wid in candidates:
+            similarity = _similarity(word, self._words[wid], partial)
+            if similarity >= min_similarity:
+                similar.append((similarity, -len(self._words[wid]), wid))
+        best: Dict[int, float] = {}
+        for similarity, _, wid in heapq.nlargest(MAX_WORDS_PER_TOKEN, similar):
+            # En orden de similitud: el primero que pone un jugador ya le da su mejor valor
+            for doc in self._word_docs[wid][:MAX_DOCS_PER_TOKEN - len(best)]:
+                best.setdefault(doc, similarity)
+            if len(best) >= MAX_DOCS_PER_TOKEN:
+                break
+        return best
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.35) -> List[Tuple[float, CatalogPlayer]]:
+        """(puntuación 0..1, jugador) de mayor a menor."""
+        self.searches += 1
+        words, typing = _query_words(query)  # la última vale como prefijo
+        if not words:
+            return []
+
+        matches = [self._matches(word, word == typing, min_score) for word in words]
+        scores: Dict[int, float] = {}
+        for best in matches:
+            for doc, similarity in best.items():
+                scores[doc] = scores.get(doc, 0.0) + similarity
+        ranked = heapq.nlargest(
+            limit,
+            ((total / len(words), doc) for doc, total in scores.items() if total / len(words) >= min_score),
+            key=lambda item: (item[0], -len(self._docs[item[1]].name)),
+        )
+        return [(score, self._docs[doc]) for score, doc in ranked]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "players": len(self._docs),
+            "words": len(self._words),
+            "trigrams": len(self._grams),
+            "searches": self.searches,
+        }
+
+
+PLAYER_SEARCH = PlayerSearchIndex()
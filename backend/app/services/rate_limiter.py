@@ -0,0 +1,72 @@
+import asyncio
+import time
+from typing import Any, Dict
+
+
+class TokenBucket:
+    """Token bucket async compartido para respetar la cuota de Wyscout.
+
+    `rate` tokens por segundo con ráfagas de hasta `capacity`. Los que esperan
+    se atienden en orden (FIFO) gracias al lock. `rate <= 0` lo desactiva.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+        self._acquired_total = 0
+        self._throttled_total = 0
+        self._wait_seconds_total = 0.0
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    async def acquire(self) -> float:
+        """Consume un token, esperando si hace falta. Devuelve los segundos esperados."""
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                else:
+                    delay = (1 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+        self._acquired_total += 1
+        if waited > 0:
+            self._throttled_total += 1
+            self._wait_seconds_total += waited
+        return waited
+
+    def pause(self, seconds: float):
+        """Bloquea el bucket (p. ej. tras un 429 con Retry-After) para todos los llamadores."""
+        if seconds <= 0:
+            return
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill(time.monotonic())
+        return {
+            "rate_per_second": self.rate,
+            "capacity": self.capacity,
+            "tokens_available": round(self._tokens, 2),
+            "acquired_total": self._acquired_total,
+            "throttled_total": self._throttled_total,
+            "wait_seconds_total": round(self._wait_seconds_total, 3),
+        }
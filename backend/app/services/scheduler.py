@@ -0,0 +1,174 @@
+import asyncio
+import contextvars
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Any, Deque, Dict, Optional
+
+from app.services.adaptive_limit import AIMDLimit
+
+
+class Priority(IntEnum):
+    """Clases de tráfico hacia Wyscout (menor valor = más prioridad)."""
+
+    INTERACTIVE = 0  # perfil de jugador, búsquedas: un scout esperando
+    BROWSE = 1  # cargas masivas de plantillas, batch-info
+    BACKGROUND = 2  # refrescos de caché, sincronizaciones
+
+
+_current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "wyscout_priority", default=Priority.INTERACTIVE
+)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+def set_priority(priority: Priority):
+    """Fija la prioridad de las llamadas a Wyscout del request/task actual."""
+    _current_priority.set(priority)
+
+
+@contextmanager
+def priority(value: Priority):
+    token = _current_priority.set(value)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class UpstreamScheduler:
+    """Límite global de llamadas concurrentes a Wyscout con colas por prioridad.
+
+    Cada clase puede usar sólo una fracción del límite (`class_shares`) y las
+    que no son interactivas dejan siempre al menos un hueco libre, de modo que
+    las cargas masivas nunca ocupan todo y un scout que abre un perfil siempre
+    encuentra sitio. Al liberarse un hueco se despacha primero la clase de
+    mayor prioridad con espera.
+
+    Con `adaptive` el límite global lo ajusta un AIMDLimit según las
+    respuestas de Wyscout (ver `on_response`).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        class_shares: Optional[Dict[Priority, float]] = None,
+        adaptive: Optional[AIMDLimit] = None,
+    ):
+        self._static_limit = max_concurrency
+        self.adaptive = adaptive
+        self.class_shares = {p: 1.0 for p in Priority}
+        self.class_shares.update(class_shares or {})
+
+        self._in_flight: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._waiting: Dict[Priority, Deque[asyncio.Future]] = {p: deque() for p in Priority}
+
+        self._acquired_total: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._queued_total: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._wait_seconds_total: Dict[Priority, float] = {p: 0.0 for p in Priority}
+        self._max_queue_depth: Dict[Priority, int] = {p: 0 for p in Priority}
+
+    @property
+    def limit(self) -> int:
+        return self.adaptive.limit if self.adaptive else self._static_limit
+
+    @property
+    def in_flight(self) -> int:
+        return sum(self._in_flight.values())
+
+    def class_limit(self, priority: Priority) -> int:
+        limit = self.limit
+        class_limit = max(1, int(limit * self.class_shares[priority]))
+        if priority != Priority.INTERACTIVE and limit > 1:
+            class_limit = min(class_limit, limit - 1)
+        return class_limit
+
+    def _can_run(self, priority: Priority) -> bool:
+        return self.in_flight < self.limit and self._in_flight[priority] < self.class_limit(priority)
+
+    def _has_waiters_at_or_above(self, priority: Priority) -> bool:
+        return any(self._waiting[p] for p in Priority if p <= priority)
+
+    def _start(self, priority: Priority):
+        self._in_flight[priority] += 1
+        self._acquired_total[priority] += 1
+
+    def _dispatch(self):
+        for p in Priority:
+            queue = self._waiting[p]
+            while queue and self._can_run(p):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._start(p)
+                waiter.set_result(None)
+
+    async def acquire(self, priority: Priority):
+        # Sin colarse: si ya hay gente esperando de igual o mayor prioridad, a la cola
+        if self._can_run(priority) and not self._has_waiters_at_or_above(priority):
+            self._start(priority)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._waiting[priority]
+        queue.append(waiter)
+        self._queued_total[priority] += 1
+        self._max_queue_depth[priority] = max(self._max_queue_depth[priority], len(queue))
+        started = time.monotonic()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Nos dieron hueco justo al cancelar: devolverlo
+                self.release(priority)
+            elif waiter in queue:
+                queue.remove(waiter)
+            raise
+        finally:
+            self._wait_seconds_total[priority] += time.monotonic() - started
+
+    def release(self, priority: Priority):
+        self._in_flight[priority] -= 1
+        self._dispatch()
+
+    def on_response(self, latency: float, ok: bool, reason: str = "error"):
+        """Señal para el límite adaptativo: respuesta sana (con su latencia) o fallo."""
+        if not self.adaptive:
+            return
+        if ok:
+            if self.adaptive.on_success(latency, self.in_flight, queued=any(self._waiting[p] for p in Priority)):
+                self._dispatch()
+        else:
+            self.adaptive.on_failure(reason)
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[Priority] = None):
+        priority = current_priority() if priority is None else priority
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "adaptive": self.adaptive.stats() if self.adaptive else None,
+            "classes": {
+                p.name.lower(): {
+                    "limit": self.class_limit(p),
+                    "in_flight": self._in_flight[p],
+                    "queue_depth": len(self._waiting[p]),
+                    "max_queue_depth": self._max_queue_depth[p],
+                    "acquired_total": self._acquired_total[p],
+                    "queued_total": self._queued_total[p],
+                    "wait_seconds_total": round(self._wait_seconds_total[p], 3),
+                }
+                for p in Priority
+            },
+        }
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Agrupa llamadas idénticas en vuelo: sólo la primera va a upstream.
+
+    Las demás esperan el mismo resultado (o la misma excepción). La llamada corre
+    en su propia task, así que si el primer llamador se cancela (cliente que
+    cierra la conexión) el resto sigue recibiendo la respuesta. El resultado es
+    el mismo objeto para todos: no mutarlo.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._leaders_total = 0
+        self._shared_total = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self._leaders_total += 1
+        else:
+            self._shared_total += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Evita "Task exception was never retrieved" si todos se cancelaron
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders_total": self._leaders_total,
+            "shared_total": self._shared_total,
+        }
@@ -0,0 +1,120 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.services.player_records import ImageCharges, SquadPlayer, intern_str
+
+
+class SquadEntry:
+    """Plantilla normalizada de un equipo: registros compactos, el JSON se arma al servir."""
+
+    __slots__ = ("team_id", "team_name", "players", "size", "expires_at", "stale")
+
+    def __init__(
+        self, team_id: int, team_name: Optional[str], players: Sequence[SquadPlayer], size: int, expires_at: float,
+        stale: bool = False,
+    ):
+        self.team_id = team_id
+        self.team_name = intern_str(team_name)
+        self.players = tuple(players)
+        self.size = size
+        self.expires_at = expires_at
+        self.stale = stale  # copia degradada (Wyscout no respondió): no se guarda
+
+    def images(self):
+        return (p.image for p in self.players)
+
+    def players_for(self, team_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Jugadores con el nombre de equipo (el que pase el llamador o el guardado)."""
+        name = team_name or self.team_name or "Unknown"
+        return [p.to_dict(name) for p in self.players]
+
+
+class SquadStore:
+    """Única caché de plantillas normalizadas, compartida por los endpoints de plantillas.
+
+    LRU acotado por bytes (memoria aproximada de los registros más las fotos
+    que retienen, cada foto una vez; los strings compartidos van aparte), no
+    por número de entradas, para que la memoria no crezca con las ligas que
+    se naveguen.
+    La respuesta cruda de Wyscout la sigue cacheando WyscoutClient (con ETag
+    y en disco); aquí sólo vive la forma ya procesada.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 6 * 3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[int, SquadEntry]" = OrderedDict()
+        self._images = ImageCharges()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.unpinned = 0
+
+    def get(self, team_id: int) -> Optional[SquadEntry]:
+        entry = self._data.get(team_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time.time() >= entry.expires_at:
+            self._remove(team_id)
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(team_id)
+        self.hits += 1
+        return entry
+
+    def __contains__(self, team_id: int) -> bool:
+        entry = self._data.get(team_id)
+        return entry is not None and time.time() < entry.expires_at
+
+    def put(
+        self, team_id: int, team_name: Optional[str], players: Sequence[SquadPlayer], fresh_until: Optional[float] = None
+    ) -> SquadEntry:
+        """Guarda la plantilla hasta `ttl` o, si es antes, hasta que caduque el dato de origen
+        (`fresh_until`); un origen ya caducado se sirve pero no se guarda."""
+        now = time.time()
+        expires_at = now + self.ttl if fresh_until is None else min(now + self.ttl, fresh_until)
+        size = sys.getsizeof(players) + sum(p.nbytes() for p in players)
+        entry = SquadEntry(team_id, team_name, players, size, expires_at)
+        if size + ImageCharges.distinct_bytes(entry.images()) > self.max_bytes or expires_at <= now:
+            self.unpinned += 1
+            return entry  # no cabe o no es fresca: se sirve pero no se guarda
+        self._remove(team_id)
+        self._data[team_id] = entry
+        self.bytes += size + self._images.add(entry.images())
+        while self.bytes > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self._release(evicted)
+            self.evictions += 1
+        return entry
+
+    def _remove(self, team_id: int):
+        entry = self._data.pop(team_id, None)
+        if entry is not None:
+            self._release(entry)
+
+    def _release(self, entry: SquadEntry):
+        self.bytes -= entry.size + self._images.remove(entry.images())
+
+    def clear(self):
+        self._data.clear()
+        self._images.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "teams": len(self._data),
+            "players": sum(len(e.players) for e in self._data.values()),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "unpinned": self.unpinned,
+        }
@@ -1,5 +1,5 @@
 from supabase import create_client, Client
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import os
 from datetime import datetime
 import logging
@@ -70,4 +70,27 @@ class SupabaseService:
             return True
         except Exception as e:
             logger.error(f"Error eliminando reporte {report_id}: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def get_known_players(self, page_size: int = 1000) -> List[Tuple[str, int]]:
+        """Pares (nombre, wyId) de informes y mercados, para el índice de nombres"""
+        pairs: List[Tuple[str, int]] = []
+        sources = (
+            ('scout_reports', 'player_name,player_wyscout_id', 'player_wyscout_id'),
+            ('market_players', 'player_name,player_id,player_type', 'player_id'),
+        )
+        for table, columns, id_column in sources:
+            start = 0
+            while True:
+                response = self.client.table(table).select(columns).range(start, start + page_size - 1).execute()
+                rows = response.data or []
+                for row in rows:
+                    if row.get('player_type', 'wyscout') != 'wyscout':
+                        continue
+                    wyscout_id = str(row.get(id_column) or '')
+                    if row.get('player_name') and wyscout_id.isdigit():
+                        pairs.append((row['player_name'], int(wyscout_id)))
+                if len(rows) < page_size:
+                    break
+                start += page_size
+        return pairs
@@ -0,0 +1,187 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Any, Dict, List, Sequence
+
+# Columnas que cada tabla de catálogo recibe de la sincronización (database/schema.sql)
+TABLE_COLUMNS: Dict[str, Sequence[str]] = {
+    "areas": ("wyscout_id", "name", "alpha2_code", "alpha3_code", "last_sync"),
+    "competitions": (
+        "wyscout_id", "name", "area_id", "category", "division_level", "format", "gender", "type", "gsm_id",
+        "last_sync",
+    ),
+    "teams": (
+        "wyscout_id", "name", "official_name", "area_id", "city", "category", "gender", "type", "gsm_id",
+        "last_sync", "updated_at",
+    ),
+    "players": (
+        "wyscout_id", "first_name", "last_name", "short_name", "birth_date", "birth_area_id", "nationality",
+        "gender", "foot", "height", "weight", "status", "current_team_id", "position_code2", "position_name",
+        "photo_url", "gsm_id", "wyscout_data", "last_sync", "updated_at",
+    ),
+    "matches": (
+        "wyscout_id", "competition_id", "home_team_id", "away_team_id", "match_date", "gameweek", "status",
+        "home_score", "away_score", "label", "has_data_available", "gsm_id", "wyscout_data", "last_sync",
+        "updated_at",
+    ),
+}
+
+JSON_COLUMNS = frozenset({"wyscout_data"})
+
+
+class SupabaseSyncStore:
+    """Tablas de catálogo en Supabase (PostgREST). Métodos bloqueantes: llamar desde un thread."""
+
+    def __init__(self, client, chunk_size: int = 500):
+        self.client = client
+        self.chunk_size = chunk_size
+
+    def select(self, table: str, columns: Sequence[str], column: str, values: Sequence[Any]) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        values = list(values)
+        for start in range(0, len(values), self.chunk_size):
+            chunk = values[start:start + self.chunk_size]
+            response = self.client.table(table).select(",".join(columns)).in_(column, chunk).execute()
+            rows.extend(response.data or [])
+        return rows
+
+    def upsert(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Inserta o actualiza por wyscout_id; devuelve (id, wyscout_id) de las filas escritas."""
+        if not rows:
+            return []
+        response = self.client.table(table).upsert(rows, on_conflict="wyscout_id").execute()
+        return [{"id": r["id"], "wyscout_id": r["wyscout_id"]} for r in response.data or []]
+
+    def update(self, table: str, values: Dict[str, Any], column: str, keys: Sequence[Any]):
+        """Escribe `values` en las filas con `column` en `keys` (sin insertar)."""
+        keys = list(keys)
+        for start in range(0, len(keys), self.chunk_size):
+            self.client.table(table).update(values).in_(column, keys[start:start + self.chunk_size]).execute()
+
+    def insert(self, table: str, row: Dict[str, Any]):
+        self.client.table(table).insert(row).execute()
+
+
+_SQLITE_SCHEMA = """
+create table if not exists areas (
+    id text primary key, wyscout_id integer unique not null, name text not null,
+    alpha2_code text, alpha3_code text, last_sync text, created_at text default current_timestamp
+);
+create table if not exists competitions (
+    id text primary key, wyscout_id integer unique not null, name text not null, area_id text,
+    category text, division_level integer, format text, gender text, type text, gsm_id integer,
+    last_sync text, created_at text default current_timestamp
+);
+create table if not exists teams (
+    id text primary key, wyscout_id integer unique not null, name text not null, official_name text,
+    area_id text, city text, category text, gender text, type text, gsm_id integer,
+    last_sync text, created_at text default current_timestamp, updated_at text
+);
+create table if not exists players (
+    id text primary key, wyscout_id integer unique not null, first_name text not null, last_name text not null,
+    short_name text, birth_date text, birth_area_id text, nationality text, gender text, foot text,
+    height integer, weight integer, status text, current_team_id text, position_code2 text,
+    position_name text, photo_url text, gsm_id integer, wyscout_data text,
+    last_sync text, created_at text default current_timestamp, updated_at text
+);
+create index if not exists idx_players_team on players(current_team_id);
+create table if not exists matches (
+    id text primary key, wyscout_id integer unique not null, competition_id text, home_team_id text,
+    away_team_id text, match_date text, gameweek integer, status text, home_score integer,
+    away_score integer, label text, has_data_available integer, gsm_id integer, wyscout_data text,
+    last_sync text, created_at text default current_timestamp, updated_at text
+);
+create index if not exists idx_matches_competition on matches(competition_id);
+create table if not exists sync_logs (
+    id text primary key, entity_type text not null, entity_id text, sync_type text not null,
+    status text not null, error_message text, api_calls_made integer default 1, sync_duration_ms integer,
+    records_processed integer default 0, records_created integer default 0, records_updated integer default 0,
+    created_at text default current_timestamp
+);
+"""
+
+
+class SQLiteSyncStore:
+    """Réplica local de las tablas de catálogo en SQLite (desarrollo y pruebas sin Supabase).
+
+    Mismas tablas y columnas que database/schema.sql, con uuid en texto y
+    jsonb como texto JSON.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 500):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.chunk_size = chunk_size
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.executescript(_SQLITE_SCHEMA)
+        self._lock = threading.Lock()
+
+    def select(self, table: str, columns: Sequence[str], column: str, values: Sequence[Any]) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        values = list(values)
+        with self._lock:
+            for start in range(0, len(values), self.chunk_size):
+                chunk = values[start:start + self.chunk_size]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self._conn.execute(
+                    f"select {', '.join(columns)} from {table} where {column} in ({placeholders})", chunk
+                )
+                rows.extend(self._decode(dict(row)) for row in cursor)
+        return rows
+
+    def upsert(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        columns = list(rows[0])
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "wyscout_id")
+        sql = (
+            f"insert into {table} (id, {', '.join(columns)}) values ({', '.join('?' * (len(columns) + 1))}) "
+            f"on conflict(wyscout_id) do update set {updates}"
+        )
+        with self._lock:
+            self._conn.execute("begin")
+            try:
+                self._conn.executemany(sql, [[str(uuid.uuid4())] + [self._encode(c, r.get(c)) for c in columns] for r in rows])
+                self._conn.execute("commit")
+            except Exception:
+                self._conn.execute("rollback")
+                raise
+        return self.select(table, ("id", "wyscout_id"), "wyscout_id", [r["wyscout_id"] for r in rows])
+
+    def update(self, table: str, values: Dict[str, Any], column: str, keys: Sequence[Any]):
+        keys = list(keys)
+        assignments = ", ".join(f"{c} = ?" for c in values)
+        params = [self._encode(c, v) for c, v in values.items()]
+        with self._lock:
+            for start in range(0, len(keys), self.chunk_size):
+                chunk = keys[start:start + self.chunk_size]
+                self._conn.execute(
+                    f"update {table} set {assignments} where {column} in ({','.join('?' * len(chunk))})", params + chunk
+                )
+
+    def insert(self, table: str, row: Dict[str, Any]):
+        row = {"id": str(uuid.uuid4()), **row}
+        with self._lock:
+            self._conn.execute(
+                f"insert into {table} ({', '.join(row)}) values ({', '.join('?' * len(row))})",
+                [self._encode(c, v) for c, v in row.items()],
+            )
+
+    @staticmethod
+    def _encode(column: str, value: Any) -> Any:
+        return json.dumps(value) if column in JSON_COLUMNS and value is not None else value
+
+    @staticmethod
+    def _decode(row: Dict[str, Any]) -> Dict[str, Any]:
+        for column in JSON_COLUMNS.intersection(row):
+            if row[column] is not None:
+                row[column] = json.loads(row[column])
+        return row
+
+    def close(self):
+        self._conn.close()
@@ -1,20 +1,155 @@
 import asyncio
 import base64
+import contextvars
+import random
+import time
 import httpx
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 import logging
 
+from app.services.cache import CachePolicy, TieredCache
+from app.services.circuit_breaker import CircuitBreakerRegistry
+from app.services.disk_cache import DiskCache
+from app.services.rate_limiter import TokenBucket
+from app.services.scheduler import Priority, UpstreamScheduler, priority
+from app.services.singleflight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the optional "h2" package (httpx[http2]); fall back to HTTP/1.1 without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 429 y errores transitorios del servidor que merece la pena reintentar
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After puede venir en segundos o como fecha HTTP."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# TTL por clase de endpoint (regex sobre el path). Lo que no encaja no se cachea.
+# Los tiers con persist=True (referencia y equipos) también van a la caché en disco.
+WYSCOUT_CACHE_TIERS = [
+    # Datos de referencia: casi nunca cambian
+    (r"^/v3/areas$", CachePolicy("reference", 3 * DAY, stale_ttl=7 * DAY, max_entries=2000, persist=True)),
+    (r"^/v3/competitions$", CachePolicy("reference", 3 * DAY, stale_ttl=7 * DAY, max_entries=2000, persist=True)),
+    (r"^/v3/competitions/\d+(/seasons)?$", CachePolicy("reference", 3 * DAY, stale_ttl=7 * DAY, max_entries=2000, persist=True)),
+    (r"^/v3/seasons/\d+$", CachePolicy("reference", 3 * DAY, stale_ttl=7 * DAY, max_entries=2000, persist=True)),
+    # Equipos y plantillas
+    (r"^/v3/teams/\d+$", CachePolicy("teams", 6 * HOUR, stale_ttl=DAY, max_entries=5000, persist=True)),
+    # Plantillas crudas: en memoria sólo unas pocas (para revalidar); la forma normalizada
+    # vive en el SquadStore y el resto en disco
+    (r"^/v3/teams/\d+/squad$", CachePolicy("squads", 6 * HOUR, stale_ttl=DAY, max_entries=64, persist=True)),
+    (r"^/v3/(competitions|seasons)/\d+/teams$", CachePolicy("teams", 6 * HOUR, stale_ttl=DAY, max_entries=5000, persist=True)),
+    (r"^/v3/(competitions|seasons)/\d+/players$", CachePolicy("teams", 6 * HOUR, stale_ttl=DAY, max_entries=5000, persist=True)),
+    # Contratos
+    (r"^/v3/players/\d+/contractinfo$", CachePolicy("contract", DAY, stale_ttl=2 * DAY, max_entries=20000)),
+    # Jugadores (ficha, carrera, traspasos)
+    (r"^/v3/players/\d+(/career|/transfers)?$", CachePolicy("players", 6 * HOUR, stale_ttl=DAY, max_entries=20000)),
+    # Partidos
+    (r"^/v3/(players|teams|competitions|seasons)/\d+/matches$", CachePolicy("matches", HOUR, stale_ttl=6 * HOUR, max_entries=2000)),
+    # Búsquedas
+    (r"^/v3/search$", CachePolicy("search", 10 * MINUTE, stale_ttl=10 * MINUTE, max_entries=5000)),
+]
+
+
 class WyscoutError(Exception):
     def __init__(self, message: str, status_code: int = None):
         self.message = message
         self.status_code = status_code
         super().__init__(self.message)
 
+    @property
+    def is_upstream_failure(self) -> bool:
+        """Fallo de Wyscout (red, 5xx, cuota, circuito abierto), no un 4xx de la petición."""
+        return self.status_code is None or self.status_code >= 500 or self.status_code == 429
+
+
+class CircuitOpenError(WyscoutError):
+    def __init__(self, family: str):
+        super().__init__(f"Circuit open for {family}", status_code=503)
+
+
+# Marca por request de "se sirvió algún dato viejo por degradación". Se guarda
+# un dict mutable para que las tasks hijas (asyncio.gather) puedan marcarlo.
+_stale_marker: contextvars.ContextVar[Optional[Dict[str, bool]]] = contextvars.ContextVar("wyscout_stale_marker", default=None)
+
+
+def begin_stale_tracking() -> Dict[str, bool]:
+    marker = {"stale": False}
+    _stale_marker.set(marker)
+    return marker
+
+
+# Peticiones reales a Wyscout hechas desde un contexto (y las tasks que lance)
+_request_counter: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("wyscout_request_counter", default=None)
+
+
+@contextmanager
+def count_requests() -> Iterator[Dict[str, int]]:
+    """Cuenta en {"requests": n} las llamadas a Wyscout de este bloque (no las de otros requests)."""
+    counter = {"requests": 0}
+    token = _request_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _request_counter.reset(token)
+
+
 class WyscoutClient:
-    def __init__(self, api_key: str, api_secret: str, base_url: str = "https://apirest.wyscout.com"):
+    """Cliente async de Wyscout v3.
+
+    Pensado para vivir durante todo el proceso: una sola instancia comparte el
+    pool de conexiones (keep-alive + HTTP/2) entre todas las rutas. Sigue
+    funcionando como context manager para scripts sueltos.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        base_url: str = "https://apirest.wyscout.com",
+        timeout: float = 30.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        max_retries: int = 3,
+        retry_backoff_base: float = 0.5,
+        retry_backoff_max: float = 20.0,
+        rate_limit_per_second: float = 0,
+        rate_limit_burst: int = 10,
+        cache_enabled: bool = True,
+        disk_cache: Optional[DiskCache] = None,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_timeout: float = 30.0,
+        latency_slo: float = 5.0,
+        scheduler: Optional[UpstreamScheduler] = None,
+    ):
         self.api_key = api_key
         self.api_secret = api_secret
         self.base_url = base_url.rstrip('/')
@@ -28,40 +163,375 @@ class WyscoutClient:
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
-        
-        self.client = httpx.AsyncClient(timeout=30.0)
-    
+
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("Paquete 'h2' no instalado, Wyscout usará HTTP/1.1")
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.client = httpx.AsyncClient(timeout=timeout, limits=self.limits, http2=self.http2)
+
+        # Reintentos (backoff exponencial con jitter) y cuota compartida
+        self.max_retries = max_retries
+        self.retry_backoff_base = retry_backoff_base
+        self.retry_backoff_max = retry_backoff_max
+        self.rate_limiter = TokenBucket(rate_limit_per_second, rate_limit_burst)
+
+        # Todas las llamadas pasan por el scheduler global (prioridades + concurrencia)
+        self.scheduler = scheduler or UpstreamScheduler()
+
+        # GETs idénticos concurrentes comparten una sola llamada upstream
+        self._singleflight = SingleFlight()
+
+        # Caché de respuestas por tiers (TTL + LRU + stale-while-revalidate)
+        self.cache = TieredCache(WYSCOUT_CACHE_TIERS) if cache_enabled else None
+        self.disk_cache = disk_cache if cache_enabled else None
+        self._refreshing: set = set()
+        self._background_tasks: set = set()
+
+        # Un circuit breaker por familia de endpoints; abierto, se sirve el último dato bueno
+        self.breakers = CircuitBreakerRegistry(breaker_failure_threshold, breaker_reset_timeout, latency_slo)
+
+        # Métricas de uso del pool
+        self._requests_total = 0
+        self._requests_in_flight = 0
+        self._errors_total = 0
+        self._http_versions: Dict[str, int] = {}
+        self._retries_total = 0
+        self._retries_by_reason: Dict[str, int] = {}
+        self._retries_exhausted = 0
+        self._revalidations_total = 0
+        self._not_modified_total = 0
+        self._bytes_saved_total = 0
+        self._stale_served_total = 0
+
     async def __aenter__(self):
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        for task in list(self._background_tasks):
+            task.cancel()
         await self.client.aclose()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Estado del pool de conexiones (httpcore no lo expone públicamente)."""
+        pool = getattr(getattr(self.client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", None) or [])
+        return {
+            "connections": len(connections),
+            "idle": sum(1 for c in connections if c.is_idle()),
+            "available": sum(1 for c in connections if c.is_available()),
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "requests_total": self._requests_total,
+            "requests_in_flight": self._requests_in_flight,
+            "errors_total": self._errors_total,
+            "http_versions": dict(self._http_versions),
+            "pool": self.pool_stats(),
+            "retries": {
+                "total": self._retries_total,
+                "by_reason": dict(self._retries_by_reason),
+                "exhausted": self._retries_exhausted,
+            },
+            "throttle": self.rate_limiter.stats(),
+            "scheduler": self.scheduler.stats(),
+            "coalescing": self._singleflight.stats(),
+            "cache": self.cache.stats() if self.cache else None,
+            "disk_cache": self.disk_cache.stats() if self.disk_cache else None,
+            "cache_refreshing": len(self._refreshing),
+            "revalidation": {
+                "conditional_requests": self._revalidations_total,
+                "not_modified": self._not_modified_total,
+                "bytes_saved": self._bytes_saved_total,
+            },
+            "circuit_breakers": self.breakers.stats(),
+            "stale_served_total": self._stale_served_total,
+        }
     
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.retry_backoff_max)
+        # "Full jitter": aleatorio entre 0 y base * 2^intento
+        return random.uniform(0, min(self.retry_backoff_max, self.retry_backoff_base * (2 ** attempt)))
+
+    async def _send(self, method: str, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> Tuple[httpx.Response, float]:
+        """(respuesta, latencia del viaje a Wyscout sin la espera en cola ni en el token bucket)."""
+        async with self.scheduler.slot():
+            await self.rate_limiter.acquire()
+            self._requests_total += 1
+            self._requests_in_flight += 1
+            counter = _request_counter.get()
+            if counter is not None:
+                counter["requests"] += 1
+            # Latencia sólo del viaje a Wyscout (sin la espera en cola) para el límite adaptativo y el breaker
+            started = time.monotonic()
+            try:
+                response = await self.client.request(
+                    method=method,
+                    url=url,
+                    headers={**self.headers, **headers} if headers else self.headers,
+                    **kwargs
+                )
+            except httpx.RequestError:
+                self._errors_total += 1
+                self.scheduler.on_response(time.monotonic() - started, ok=False, reason="network")
+                raise
+            finally:
+                self._requests_in_flight -= 1
+            latency = time.monotonic() - started
+            if response.status_code >= 500 or response.status_code == 429:
+                self.scheduler.on_response(latency, ok=False, reason=str(response.status_code))
+            else:
+                self.scheduler.on_response(latency, ok=True)
+        self._http_versions[response.http_version] = self._http_versions.get(response.http_version, 0) + 1
+        if response.status_code >= 400:
+            self._errors_total += 1
+        return response, latency
+
     async def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+        response = await self._request(method, endpoint, **kwargs)
+        return response.json()
+
+    async def _request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        """Petición con reintentos; devuelve la respuesta (2xx/3xx) o lanza WyscoutError."""
         url = f"{self.base_url}{endpoint}"
-        
-        try:
-            response = await self.client.request(
-                method=method,
-                url=url,
-                headers=self.headers,
-                **kwargs
-            )
-            
-            if response.status_code >= 400:
-                raise WyscoutError(
+        breaker = self.breakers.for_endpoint(endpoint)
+
+        attempt = 0
+        while True:
+            if not breaker.allow_request():
+                raise CircuitOpenError(breaker.name)
+
+            retry_after = None
+            try:
+                response, latency = await self._send(method, url, **kwargs)
+            except httpx.RequestError as e:
+                breaker.record_failure()
+                error = WyscoutError(f"Request failed: {str(e)}")
+                reason = "network"
+            else:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success(latency)
+
+                if response.status_code < 400:
+                    return response
+
+                error = WyscoutError(
                     f"API request failed: {response.status_code} - {response.text}",
                     status_code=response.status_code
                 )
-            
-            return response.json()
-            
-        except httpx.RequestError as e:
-            raise WyscoutError(f"Request failed: {str(e)}")
-    
-    async def get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
-        return await self._make_request("GET", endpoint, params=params)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    raise error
+                reason = str(response.status_code)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if response.status_code == 429:
+                    # Frenar a todos los llamadores, no sólo a este
+                    self.rate_limiter.pause(retry_after if retry_after is not None else self.retry_backoff_base)
+
+            if attempt >= self.max_retries:
+                self._retries_exhausted += 1
+                raise error
+
+            delay = self._backoff_delay(attempt, retry_after)
+            attempt += 1
+            self._retries_total += 1
+            self._retries_by_reason[reason] = self._retries_by_reason.get(reason, 0) + 1
+            logger.warning(f"Wyscout {endpoint} falló ({reason}), reintento {attempt}/{self.max_retries} en {delay:.2f}s")
+            await asyncio.sleep(delay)
+    
+    @staticmethod
+    def request_key(endpoint: str, params: Optional[Dict] = None) -> tuple:
+        """Clave estable (endpoint + params ordenados) para coalescing y caché."""
+        items = tuple(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None))
+        return (endpoint, items)
+
+    def peek(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Any]:
+        """Respuesta fresca de la caché en memoria, sin tocar disco ni red; None si no hay."""
+        policy = self.cache.policy_for(endpoint) if self.cache else None
+        if policy is None:
+            return None
+        entry = self.cache.get(policy, self.request_key(endpoint, params))
+        if entry is None or not entry.is_fresh():
+            return None
+        self.cache.record(policy, "hit")
+        return entry.value
+
+    async def get(self, endpoint: str, params: Optional[Dict] = None, revalidate: bool = False, **kwargs) -> Dict[str, Any]:
+        """GET cacheado según su tier. Con `revalidate` no se sirve la copia en caché
+        aunque sea fresca: se revalida con Wyscout (ETag/Last-Modified, un 304 es barato)
+        para quien guarda la respuesta con su propio TTL. Si Wyscout falla se sirve la
+        copia vieja marcada con "stale", como siempre."""
+        if kwargs:
+            # Opciones por llamada (timeout, etc.): ni caché ni coalescing
+            return await self._make_request("GET", endpoint, params=params, **kwargs)
+
+        key = self.request_key(endpoint, params)
+        policy = self.cache.policy_for(endpoint) if self.cache else None
+        if policy is None:
+            return await self._singleflight.do(key, lambda: self._make_request("GET", endpoint, params=params))
+
+        entry = self.cache.get(policy, key)
+        if entry is None and policy.persist and self.disk_cache:
+            entry = await self.disk_cache.get(key)
+            if entry is not None:
+                self.cache.put(policy, key, entry)
+        if entry is not None and not revalidate and entry.is_fresh():
+            self.cache.record(policy, "hit")
+            return entry.value
+        if entry is not None and not revalidate and entry.is_servable():
+            self.cache.record(policy, "stale")
+            self._refresh_in_background(key, endpoint, params, policy)
+            return entry.value
+
+        self.cache.record(policy, "miss")
+        try:
+            return await self._singleflight.do(key, lambda: self._fetch_and_store(key, endpoint, params, policy))
+        except WyscoutError as e:
+            if entry is None or not e.is_upstream_failure:
+                raise
+            # Modo degradado: último dato bueno conocido, marcado como viejo
+            logger.warning(f"Wyscout {endpoint} no disponible ({e.message}), sirviendo copia vieja")
+            return self._mark_stale(entry.value)
+
+    def _mark_stale(self, value: Any) -> Any:
+        self._stale_served_total += 1
+        marker = _stale_marker.get()
+        if marker is not None:
+            marker["stale"] = True
+        if isinstance(value, dict):
+            return {**value, "stale": True}
+        return value
+
+    def fresh_until(self, endpoint: str, params: Optional[Dict] = None) -> Optional[float]:
+        """Hasta cuándo es fresca la copia en memoria (epoch); 0 si no hay copia, None si no se cachea."""
+        policy = self.cache.policy_for(endpoint) if self.cache else None
+        if policy is None:
+            return None
+        entry = self.cache.get(policy, self.request_key(endpoint, params))
+        return entry.expires_at if entry is not None else 0.0
+
+    def is_cached(self, endpoint: str, params: Optional[Dict] = None) -> bool:
+        """True si hay una copia servible sin ir a upstream."""
+        policy = self.cache.policy_for(endpoint) if self.cache else None
+        if policy is None:
+            return False
+        entry = self.cache.get(policy, self.request_key(endpoint, params))
+        return entry is not None and entry.is_servable()
+
+    async def _fetch_and_store(self, key: tuple, endpoint: str, params: Optional[Dict], policy: CachePolicy) -> Any:
+        # Si ya tenemos una copia (aunque caducada) con validadores, revalidar en vez de descargar
+        previous = self.cache.get(policy, key)
+        conditional = {}
+        if previous is not None and previous.etag:
+            conditional["If-None-Match"] = previous.etag
+        if previous is not None and previous.last_modified:
+            conditional["If-Modified-Since"] = previous.last_modified
+        if conditional:
+            self._revalidations_total += 1
+
+        response = await self._request("GET", endpoint, params=params, headers=conditional or None)
+
+        if response.status_code == 304 and previous is not None:
+            self._not_modified_total += 1
+            self._bytes_saved_total += previous.size
+            previous.renew(policy.ttl, policy.stale_ttl)
+            if policy.persist and self.disk_cache:
+                await self.disk_cache.touch(key, previous)
+            return previous.value
+
+        value = response.json()
+        entry = self.cache.set(
+            policy,
+            key,
+            value,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            size=len(response.content),
+        )
+        if policy.persist and self.disk_cache:
+            await self.disk_cache.set(policy.name, key, entry)
+        return value
+
+    def _refresh_in_background(self, key: tuple, endpoint: str, params: Optional[Dict], policy: CachePolicy):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                with priority(Priority.BACKGROUND):
+                    await self._singleflight.do(key, lambda: self._fetch_and_store(key, endpoint, params, policy))
+            except Exception as e:
+                logger.warning(f"Refresco en segundo plano de {endpoint} falló: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        self._refreshing.add(key)
+        task = asyncio.ensure_future(refresh())
+        # Guardar referencia para que el GC no se lleve la task a medias
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
     
+    # ==============================================
+    # PAGINATION
+    # ==============================================
+
+    async def iter_pages(
+        self, endpoint: str, key: str, page_size: int = 100, params: Optional[Dict] = None,
+        marker: Optional[Dict[str, bool]] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Recorre un listado paginado (limit/page) de Wyscout página a página.
+
+        La página siguiente se pide en cuanto llega la actual, así la descarga
+        se solapa con lo que haga el consumidor. Termina con `meta.page_count`
+        o, si no viene, con la primera página incompleta. Las páginas pasan por
+        `get`, así que se cachean y coalescen como cualquier otra llamada; si
+        alguna es una copia degradada se pone marker["stale"] = True.
+        """
+        def fetch(page: int) -> "asyncio.Task":
+            task = asyncio.create_task(self.get(endpoint, params={**(params or {}), "limit": page_size, "page": page}))
+            # Si el consumidor abandona antes de leerla, que el error no quede sin recoger
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            return task
+
+        page = 1
+        pending = fetch(page)
+        try:
+            while pending is not None:
+                response = await pending
+                pending = None
+                if marker is not None and isinstance(response, dict) and response.get("stale"):
+                    marker["stale"] = True
+                items = response.get(key, []) if isinstance(response, dict) else response or []
+                meta = response.get("meta", {}) if isinstance(response, dict) else {}
+                page_count = meta.get("page_count")
+                has_more = page < page_count if page_count is not None else len(items) >= page_size
+                if has_more and items:
+                    page += 1
+                    pending = fetch(page)
+                yield items
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def iter_players(self, endpoint: str, page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        async for items in self.iter_pages(endpoint, "players", page_size):
+            for player in items:
+                yield player
+
     # ==============================================
     # AREAS
     # ==============================================
@@ -119,13 +589,16 @@ class WyscoutClient:
     async def get_player_transfers(self, player_id: int) -> Dict[str, Any]:
         return await self.get(f"/v3/players/{player_id}/transfers")
 
-    async def get_player_contract_info(self, player_id: int) -> Dict[str, Any]:
-        return await self.get(f"/v3/players/{player_id}/contractinfo")
+    async def get_player_contract_info(self, player_id: int, revalidate: bool = False) -> Dict[str, Any]:
+        return await self.get(f"/v3/players/{player_id}/contractinfo", revalidate=revalidate)
 
     # ==============================================
     # COMPETITIONS
     # ==============================================
     
+    async def get_competition(self, competition_id: int) -> Dict[str, Any]:
+        return await self.get(f"/v3/competitions/{competition_id}")
+
     async def get_competitions(self, area_id: str) -> Dict[str, Any]:
         params = {"areaId": area_id}
         return await self.get("/v3/competitions", params=params)
@@ -136,9 +609,13 @@ class WyscoutClient:
     async def get_competition_teams(self, competition_id: int) -> Dict[str, Any]:
         return await self.get(f"/v3/competitions/{competition_id}/teams")
     
-    async def get_competition_players(self, competition_id: int) -> Dict[str, Any]:
-        return await self.get(f"/v3/competitions/{competition_id}/players")
-    
+    async def get_competition_players(self, competition_id: int, limit: int = 100, page: int = 1) -> Dict[str, Any]:
+        """Una página del listado de jugadores de la competición (ver iter_competition_players)."""
+        return await self.get(f"/v3/competitions/{competition_id}/players", params={"limit": limit, "page": page})
+
+    def iter_competition_players(self, competition_id: int, page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        return self.iter_players(f"/v3/competitions/{competition_id}/players", page_size)
+
     # ==============================================
     # TEAMS
     # ==============================================
@@ -152,9 +629,6 @@ class WyscoutClient:
     async def get_team_squad(self, team_id: int) -> Dict[str, Any]:
         return await self.get(f"/v3/teams/{team_id}/squad")
 
-    async def get_competition_players(self, competition_id: int, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
-        return await self.get(f"/v3/competitions/{competition_id}/players", params={"limit": limit, "offset": offset})
-
     async def get_team_career(self, team_id: int) -> Dict[str, Any]:
         return await self.get(f"/v3/teams/{team_id}/career")
     
@@ -178,11 +652,17 @@ class WyscoutClient:
     # SEASONS
     # ==============================================
     
+    async def get_season(self, season_id: int) -> Dict[str, Any]:
+        return await self.get(f"/v3/seasons/{season_id}")
+
     async def get_season_matches(self, season_id: int) -> Dict[str, Any]:
         return await self.get(f"/v3/seasons/{season_id}/matches")
     
-    async def get_season_players(self, season_id: int) -> Dict[str, Any]:
-        return await self.get(f"/v3/seasons/{season_id}/players")
+    async def get_season_players(self, season_id: int, limit: int = 100, page: int = 1) -> Dict[str, Any]:
+        return await self.get(f"/v3/seasons/{season_id}/players", params={"limit": limit, "page": page})
+
+    def iter_season_players(self, season_id: int, page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        return self.iter_players(f"/v3/seasons/{season_id}/players", page_size)
     
     async def get_season_teams(self, season_id: int) -> Dict[str, Any]:
         return await self.get(f"/v3/seasons/{season_id}/teams")
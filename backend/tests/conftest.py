@@ -0,0 +1,120 @@
+"""Pruebas contra el Wyscout falso (tools.fake_wyscout) levantado en un thread con uvicorn.
+
+    cd backend
+    pip install -r requirements-dev.txt
+    python -m pytest
+"""
+import os
+import socket
+import tempfile
+import threading
+import time
+
+# Antes de importar app.*: settings se lee al importar app.config
+os.environ.setdefault("SUPABASE_URL", "http://localhost:1")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.x")
+os.environ.setdefault("WYSCOUT_DISK_CACHE_PATH", "")
+os.environ.setdefault("HIERARCHY_PRELOAD_MAX_DIVISION", "0")
+# La API en pruebas: reintentos cortos, sin cuota y sin abrir circuitos entre pruebas que inyectan fallos
+os.environ.setdefault("WYSCOUT_MAX_RETRIES", "1")
+os.environ.setdefault("WYSCOUT_RETRY_BACKOFF_BASE", "0.01")
+os.environ.setdefault("WYSCOUT_BREAKER_FAILURE_THRESHOLD", "1000")
+os.environ.setdefault("WYSCOUT_RATE_LIMIT_PER_SECOND", "0")
+
+import pytest
+import uvicorn
+
+from app.services.wyscout_client import WyscoutClient
+from tools.fake_wyscout.fixtures import FixtureStore
+from tools.fake_wyscout.server import FakeConfig, FakeWyscout, create_app
+
+
+class FakeServer:
+    """El FakeWyscout (para cambiar su config y leer sus stats) y la URL donde escucha."""
+
+    def __init__(self, fake: FakeWyscout, url: str):
+        self.fake = fake
+        self.url = url
+
+    def configure(self, **values):
+        self.fake.config.update(values)
+
+    def calls(self, route_prefix: str) -> int:
+        """Peticiones recibidas a rutas que empiezan por `route_prefix` (ids como {id}).
+        Las tareas de fondo de la API (jerarquía) también llaman: contar sólo lo de la prueba."""
+        return sum(n for route, n in self.fake.by_route.items() if route.startswith(route_prefix))
+
+    def reset(self):
+        self.fake.config = FakeConfig()
+        self.fake.reset_stats()
+        self.fake._modified.clear()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def fake_server():
+    fake = FakeWyscout(FakeConfig(), FixtureStore(tempfile.mkdtemp(prefix="fake_wyscout_")))
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(fake), host="127.0.0.1", port=port, log_level="warning", ws="none"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("El Wyscout falso no arrancó")
+        time.sleep(0.02)
+    yield FakeServer(fake, f"http://127.0.0.1:{port}")
+    server.should_exit = True
+    thread.join(timeout=10)
+
+
+@pytest.fixture
+def fake(fake_server):
+    """Servidor falso con la config por defecto y contadores a cero en cada prueba."""
+    fake_server.reset()
+    yield fake_server
+    fake_server.reset()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def wyscout(fake):
+    """Cliente contra el servidor falso, con backoff corto para no alargar las pruebas."""
+    client = WyscoutClient(
+        "user",
+        "pass",
+        fake.url,
+        http2=False,
+        max_retries=2,
+        retry_backoff_base=0.01,
+        retry_backoff_max=0.5,
+        rate_limit_per_second=1000,
+        rate_limit_burst=1000,
+        breaker_failure_threshold=2,
+        breaker_reset_timeout=60,
+    )
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def api(fake, monkeypatch):
+    """La API (app.main) con su lifespan, apuntando al Wyscout falso."""
+    from fastapi.testclient import TestClient
+
+    from app.config import settings
+    from app.main import app
+
+    monkeypatch.setattr(settings, "WYSCOUT_HOST", fake.url)
+    monkeypatch.setattr(settings, "WYSCOUT_HTTP2", False)
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,61 @@
+import json
+
+PLAYER_IDS = [160901, 160902, 160903]
+
+
+def ndjson_frames(response):
+    return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def batch_info(api, **body):
+    with api.stream("POST", "/api/players/batch-info", params={"stream": "ndjson"}, json=body) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return ndjson_frames(response)
+
+
+def test_streams_one_frame_per_fetched_player(fake, api):
+    frames = batch_info(api, player_ids=PLAYER_IDS)
+
+    players = [f for f in frames if f["type"] == "players"]
+    assert len(players) == len(PLAYER_IDS)
+    assert sorted(int(pid) for f in players for pid in f["players"]) == PLAYER_IDS
+    assert frames[-1] == {"type": "done", "cached": 0, "fetched": 3, "failed": 0, "stale": False}
+    for frame in players:
+        (info,) = frame["players"].values()
+        assert info["short_name"] and info["contract_expires"]
+
+
+def test_second_call_is_one_cached_frame(fake, api):
+    batch_info(api, player_ids=PLAYER_IDS)
+    requests_before = fake.calls("/v3/players")
+    frames = batch_info(api, player_ids=PLAYER_IDS)
+
+    assert [f["type"] for f in frames] == ["players", "done"]
+    assert sorted(int(pid) for pid in frames[0]["players"]) == PLAYER_IDS
+    assert frames[-1]["cached"] == 3 and frames[-1]["fetched"] == 0
+    assert fake.calls("/v3/players") == requests_before
+
+
+def test_failed_players_are_reported_in_done_frame(fake, api):
+    fake.configure(error_rate=1.0, error_statuses=[404], fault_path=r"^/v3/players/160902")
+    frames = batch_info(api, player_ids=PLAYER_IDS)
+
+    fetched = {pid for f in frames if f["type"] == "players" for pid in f["players"]}
+    assert fetched == {"160901", "160903"}
+    assert frames[-1]["fetched"] == 2 and frames[-1]["failed"] == 1
+
+
+def test_refresh_revalidates_instead_of_reusing_the_client_copy(fake, api):
+    batch_info(api, player_ids=PLAYER_IDS)
+    info_cache = api.app.state.player_info_cache
+    for pid in PLAYER_IDS:
+        info_cache.peek(pid).bio_expires_at = 0
+        info_cache.peek(pid).contract_expires_at = 0
+    requests_before = fake.calls("/v3/players")
+    frames = batch_info(api, player_ids=PLAYER_IDS)
+
+    # La copia del cliente sigue fresca, pero se revalida con Wyscout (304) en vez de reutilizarla
+    assert frames[-1]["fetched"] == 3
+    assert fake.calls("/v3/players") == requests_before + 2 * len(PLAYER_IDS)
+    assert api.app.state.wyscout.stats()["revalidation"]["not_modified"] >= 2 * len(PLAYER_IDS)
@@ -0,0 +1,48 @@
+import json
+
+COMPETITION_ID = 364
+
+
+def query_players(api, **body):
+    with api.stream("POST", "/api/players/query", json={"competition_ids": [COMPETITION_ID], **body}) as response:
+        assert response.status_code == 200
+        return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_partial_index_is_reported_and_not_cached(fake, api):
+    # Sin listado de la competición ni plantillas: sólo quedan los equipos
+    fake.configure(error_rate=1.0, error_statuses=[503], fault_path=r"/players$|/squad$")
+    frames = query_players(api)
+
+    errors = [f for f in frames if f["type"] == "error"]
+    assert errors and errors[0]["competition_id"] == COMPETITION_ID and errors[0]["partial"]
+    assert api.app.state.player_indexes.stats()["indexes"] == 0
+
+    fake.configure(error_rate=0)
+    frames = query_players(api)
+
+    assert not [f for f in frames if f["type"] == "error"]
+    assert frames[-1]["total"] > 0
+    assert api.app.state.player_indexes.stats()["indexes"] == 1
+
+
+def test_contract_filter_uses_cached_contracts_only(fake, api):
+    url = f"/api/competitions/{COMPETITION_ID}/players"
+    api.get(url, params={"page": 1})  # índice de la competición ya construido
+    requests_before = fake.calls("/v3/players")
+    params = {"contract_from": "2000-01-01", "contract_to": "2100-01-01", "page_size": 20}
+    first = api.get(url, params=params).json()
+
+    # Ningún contractinfo en el camino de la petición: los de la página quedan como desconocidos
+    assert fake.calls("/v3/players") == requests_before
+    assert first["total"] > 0
+    assert first["contract_unknown"] == [p["wyscout_id"] for p in first["players"]]
+
+    # batch-info deja los contratos en caché y el filtro ya los usa sin volver a Wyscout
+    api.post("/api/players/batch-info", json={"player_ids": first["contract_unknown"]})
+    requests_before = fake.calls("/v3/players")
+    second = api.get(url, params=params).json()
+
+    assert fake.calls("/v3/players") == requests_before
+    assert second["contract_unknown"] == []
+    assert all(p["contractExpires"] for p in second["players"])
@@ -0,0 +1,107 @@
+import asyncio
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from app.services.wyscout_client import CircuitOpenError, WyscoutError
+
+pytestmark = pytest.mark.anyio
+
+
+def expire(client, endpoint, params=None, servable=False):
+    """Caduca la entrada en memoria (y opcionalmente también la ventana stale)."""
+    policy = client.cache.policy_for(endpoint)
+    entry = client.cache.get(policy, client.request_key(endpoint, params))
+    entry.expires_at = 0
+    if not servable:
+        entry.stale_until = 0
+    return entry
+
+
+async def test_retries_429_honouring_retry_after(fake, wyscout):
+    fake.configure(throttle_rate=1.0, retry_after=0.3)
+    call = asyncio.create_task(wyscout.get("/v3/areas"))
+    while fake.fake.by_status.get(429, 0) == 0:
+        await asyncio.sleep(0.01)
+    fake.configure(throttle_rate=0)
+    started = asyncio.get_running_loop().time()
+    body = await call
+
+    assert body["areas"]
+    assert asyncio.get_running_loop().time() - started >= 0.2  # esperó el Retry-After
+    assert fake.fake.by_status[429] == 1
+    assert wyscout.stats()["retries"]["by_reason"] == {"429": 1}
+
+
+async def test_gives_up_after_max_retries(fake, wyscout):
+    fake.configure(throttle_rate=1.0, retry_after=0.01)
+    with pytest.raises(WyscoutError) as exc:
+        await wyscout.get("/v3/areas")
+
+    assert exc.value.status_code == 429
+    assert fake.fake.requests == wyscout.max_retries + 1
+    assert wyscout.stats()["retries"]["exhausted"] == 1
+
+
+async def test_revalidates_with_etag(fake, wyscout):
+    first = await wyscout.get("/v3/competitions/364")
+    expire(wyscout, "/v3/competitions/364")
+    second = await wyscout.get("/v3/competitions/364")
+
+    assert second == first
+    assert fake.fake.by_status == {200: 1, 304: 1}
+    revalidation = wyscout.stats()["revalidation"]
+    assert revalidation["conditional_requests"] == 1
+    assert revalidation["not_modified"] == 1
+    assert revalidation["bytes_saved"] > 0
+
+
+async def test_revalidates_with_if_modified_since(fake, wyscout):
+    await wyscout.get("/v3/competitions/364")
+    entry = expire(wyscout, "/v3/competitions/364")
+    assert entry.last_modified
+    entry.etag = None  # sólo Last-Modified: el 304 tiene que venir por If-Modified-Since
+    await wyscout.get("/v3/competitions/364")
+
+    assert fake.fake.by_status == {200: 1, 304: 1}
+    assert wyscout.stats()["revalidation"]["not_modified"] == 1
+
+
+async def test_fake_server_if_modified_since(fake):
+    async with httpx.AsyncClient(base_url=fake.url) as http:
+        first = await http.get("/v3/teams/1609")
+        last_modified = first.headers["Last-Modified"]
+        unchanged = await http.get("/v3/teams/1609", headers={"If-Modified-Since": last_modified})
+        older = await http.get("/v3/teams/1609", headers={"If-Modified-Since": formatdate(0, usegmt=True)})
+        # If-None-Match manda: un ETag que no coincide da 200 aunque la fecha sí
+        other_etag = await http.get("/v3/teams/1609", headers={"If-Modified-Since": last_modified, "If-None-Match": '"x"'})
+
+    assert first.status_code == 200
+    assert unchanged.status_code == 304
+    assert older.status_code == 200
+    assert other_etag.status_code == 200
+
+
+async def test_open_breaker_serves_stale_copy(fake, wyscout):
+    good = await wyscout.get("/v3/competitions/364")
+    fake.configure(error_rate=1.0, error_statuses=[503])
+
+    # Caducada y fuera de la ventana SWR: va a Wyscout, falla y sirve la copia vieja marcada
+    expire(wyscout, "/v3/competitions/364")
+    degraded = await wyscout.get("/v3/competitions/364")
+    assert degraded == {**good, "stale": True}
+
+    breaker = wyscout.breakers.for_endpoint("/v3/competitions/364")
+    assert breaker.state == breaker.OPEN
+    requests_before = fake.fake.requests
+
+    # Con el circuito abierto ni siquiera se llama a Wyscout
+    degraded_again = await wyscout.get("/v3/competitions/364")
+    assert degraded_again == {**good, "stale": True}
+    assert fake.fake.requests == requests_before
+    assert wyscout.stats()["stale_served_total"] == 2
+
+    # Sin copia que servir, el circuito abierto se propaga
+    with pytest.raises(CircuitOpenError):
+        await wyscout.get("/v3/competitions/365")
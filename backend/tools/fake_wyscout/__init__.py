@@ -0,0 +1,9 @@
+"""Servidor Wyscout v3 falso para desarrollo, benchmarks y pruebas sin credenciales.
+
+    cd backend
+    python -m tools.fake_wyscout --port 8090 --latency-ms 150 --error-rate 0.02
+    WYSCOUT_HOST=http://localhost:8090 uvicorn app.main:app
+
+Ver `python -m tools.fake_wyscout --help` para latencia, errores, 429 y modo record.
+Las pruebas de backend/tests lo levantan solas (`python -m pytest`).
+"""
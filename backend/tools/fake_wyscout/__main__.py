@@ -0,0 +1,66 @@
+import argparse
+import logging
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+from tools.fake_wyscout.fixtures import FixtureStore
+from tools.fake_wyscout.server import FakeConfig, FakeWyscout, create_app
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Wyscout v3 server (fixtures + synthetic data)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="directorio de fixtures grabados")
+    parser.add_argument("--latency-ms", type=float, default=0, help="latencia media añadida a cada respuesta")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="+/- aleatorio sobre la latencia")
+    parser.add_argument("--error-rate", type=float, default=0, help="probabilidad de responder 5xx")
+    parser.add_argument("--error-status", type=int, action="append", help="códigos 5xx a inyectar (repetible)")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="probabilidad de responder 429")
+    parser.add_argument("--rate-limit", type=float, default=0, help="req/s permitidas antes de 429 (0 = sin límite)")
+    parser.add_argument("--retry-after", type=float, default=1, help="Retry-After de los 429")
+    parser.add_argument("--fault-path", default="", help="regex: inyectar latencia/fallos sólo en estas rutas")
+    parser.add_argument("--require-auth", action="store_true", help="exigir cabecera Basic auth")
+    parser.add_argument("--strict", action="store_true", help="404 si no hay fixture (sin datos sintéticos)")
+    parser.add_argument("--no-etags", action="store_true", help="no enviar ETag/Last-Modified ni responder 304")
+    parser.add_argument("--record", action="store_true",
+                        help="reenviar al Wyscout real (WYSCOUT_HOST) y grabar las respuestas como fixtures")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_statuses=args.error_status,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        fault_path=args.fault_path,
+        require_auth=args.require_auth,
+        strict=args.strict,
+        etags=not args.no_etags,
+    )
+
+    load_dotenv()
+    record_from = None
+    credentials = None
+    if args.record:
+        record_from = os.getenv("WYSCOUT_HOST", "https://apirest.wyscout.com")
+        user = os.getenv("WYSCOUT_API_KEY") or os.getenv("WYSCOUT_USERNAME")
+        password = os.getenv("WYSCOUT_API_SECRET") or os.getenv("WYSCOUT_PASSWORD")
+        if not user or not password:
+            parser.error("--record necesita WYSCOUT_API_KEY/WYSCOUT_API_SECRET (o USERNAME/PASSWORD)")
+        credentials = (user, password)
+
+    fake = FakeWyscout(config, FixtureStore(args.fixtures), record_from=record_from, credentials=credentials)
+    uvicorn.run(create_app(fake), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
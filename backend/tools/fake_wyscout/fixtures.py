@@ -0,0 +1,48 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+
+class FixtureStore:
+    """Respuestas grabadas de Wyscout, un JSON por (ruta, query).
+
+    Nombre de fichero: la ruta con "/" -> "__" y, si hay query, un hash corto
+    de los parámetros ordenados. Al buscar se prueba primero la query exacta y
+    luego el fixture de la ruta sin parámetros.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def fixture_name(path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        name = path.strip("/").replace("/", "__") or "root"
+        if params:
+            query = urlencode(sorted((k, str(v)) for k, v in params.items()))
+            name += "--" + hashlib.sha1(query.encode()).hexdigest()[:10]
+        return name + ".json"
+
+    def _read(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.root, name), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def load(self, path: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        fixture = self._read(self.fixture_name(path, params)) if params else None
+        return fixture or self._read(self.fixture_name(path))
+
+    def save(self, path: str, params: Optional[Dict[str, Any]], status: int, body: Any, headers: Dict[str, str]):
+        fixture = {"path": path, "params": params or {}, "status": status, "headers": headers, "body": body}
+        target = os.path.join(self.root, self.fixture_name(path, params))
+        tmp = target + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, target)
+
+    def __len__(self) -> int:
+        return sum(1 for name in os.listdir(self.root) if name.endswith(".json"))
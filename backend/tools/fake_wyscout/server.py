@@ -0,0 +1,338 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from tools.fake_wyscout import synthetic
+from tools.fake_wyscout.fixtures import FixtureStore
+
+logger = logging.getLogger("fake_wyscout")
+
+# Endpoints de listado que Wyscout pagina con limit/page (y meta en la respuesta)
+PAGINATED = {"players"}
+
+
+class FakeConfig:
+    """Comportamiento del servidor; se puede cambiar en caliente con PATCH /_fake/config."""
+
+    FIELDS = (
+        "latency_ms", "jitter_ms", "error_rate", "error_statuses", "throttle_rate",
+        "rate_limit", "retry_after", "fault_path", "require_auth", "strict", "etags",
+    )
+
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0,
+        error_statuses: Optional[List[int]] = None,
+        throttle_rate: float = 0,
+        rate_limit: float = 0,
+        retry_after: float = 1,
+        fault_path: str = "",
+        require_auth: bool = False,
+        strict: bool = False,
+        etags: bool = True,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate  # probabilidad de 5xx
+        self.error_statuses = error_statuses or [500, 502, 503]
+        self.throttle_rate = throttle_rate  # probabilidad de 429 aleatorio
+        self.rate_limit = rate_limit  # req/s antes de responder 429 (0 = sin límite)
+        self.retry_after = retry_after
+        self.fault_path = fault_path  # regex: sólo inyectar fallos/latencia en estas rutas
+        self.require_auth = require_auth
+        self.strict = strict  # sin fixture -> 404 en vez de datos sintéticos
+        self.etags = etags  # ETag/Last-Modified y 304 a If-None-Match/If-Modified-Since
+
+    def update(self, values: Dict[str, Any]):
+        for key, value in values.items():
+            if key not in self.FIELDS:
+                raise ValueError(f"Unknown option: {key}")
+            setattr(self, key, value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+
+def _routes() -> List[Tuple[re.Pattern, Callable[..., Any]]]:
+    s = synthetic
+    table: List[Tuple[str, Callable[..., Any]]] = [
+        (r"/v3/areas", lambda q: {"areas": s.AREAS}),
+        (r"/v3/search", lambda q: s.search(q.get("query", ""), q.get("objType", "player"), int(q.get("limit", 10)))),
+        (r"/v3/competitions", lambda q: s.competitions(q.get("areaId", s.AREAS[0]["id"]))),
+        (r"/v3/competitions/(\d+)", lambda q, c: s.competition(int(c))),
+        (r"/v3/competitions/(\d+)/seasons", lambda q, c: s.competition_seasons(int(c))),
+        (r"/v3/competitions/(\d+)/teams", lambda q, c: s.competition_teams(int(c))),
+        (r"/v3/competitions/(\d+)/players", lambda q, c: {"players": s.competition_players(int(c))}),
+        (r"/v3/competitions/(\d+)/matches", lambda q, c: s.competition_matches(int(c))),
+        (r"/v3/seasons/(\d+)", lambda q, x: s.season(int(x))),
+        (r"/v3/seasons/(\d+)/teams", lambda q, x: s.competition_teams(s.season_competition_id(int(x)))),
+        (r"/v3/seasons/(\d+)/players",
+         lambda q, x: {"players": s.competition_players(s.season_competition_id(int(x)))}),
+        (r"/v3/seasons/(\d+)/matches", lambda q, x: s.competition_matches(s.season_competition_id(int(x)))),
+        (r"/v3/teams/(\d+)", lambda q, t: s.team(int(t))),
+        (r"/v3/teams/(\d+)/squad", lambda q, t: s.squad(int(t))),
+        (r"/v3/teams/(\d+)/matches", lambda q, t: s.team_matches(int(t))),
+        (r"/v3/players/(\d+)", lambda q, p: s.player(int(p))),
+        (r"/v3/players/(\d+)/career", lambda q, p: s.player_career(int(p))),
+        (r"/v3/players/(\d+)/contractinfo", lambda q, p: s.player_contract(int(p))),
+        (r"/v3/players/(\d+)/transfers", lambda q, p: s.player_transfers(int(p))),
+        (r"/v3/players/(\d+)/matches", lambda q, p: s.player_matches(int(p))),
+    ]
+    return [(re.compile(pattern + r"/?$"), handler) for pattern, handler in table]
+
+
+def paginate(body: Dict[str, Any], key: str, params: Dict[str, str]) -> Dict[str, Any]:
+    items = body.get(key, [])
+    limit = max(1, int(params.get("limit", 100)))
+    if "offset" in params:
+        start = max(0, int(params["offset"]))
+        page = start // limit + 1
+    else:
+        page = max(1, int(params.get("page", 1)))
+        start = (page - 1) * limit
+    return {
+        key: items[start:start + limit],
+        "meta": {
+            "page_current": page,
+            "page_size": limit,
+            "page_count": (len(items) + limit - 1) // limit,
+            "total_items": len(items),
+        },
+    }
+
+
+class FakeWyscout:
+    """Sirve fixtures (o datos sintéticos) e inyecta latencia, 5xx y 429.
+
+    En modo record reenvía cada petición al Wyscout real y guarda la
+    respuesta en el FixtureStore.
+    """
+
+    def __init__(
+        self,
+        config: FakeConfig,
+        store: FixtureStore,
+        record_from: Optional[str] = None,
+        credentials: Optional[Tuple[str, str]] = None,
+    ):
+        self.config = config
+        self.store = store
+        self.record_from = record_from
+        self.credentials = credentials
+        self._routes = _routes()
+        self._upstream: Optional[httpx.AsyncClient] = None
+        self._bucket_tokens = float(config.rate_limit)
+        self._bucket_updated = time.monotonic()
+        # Por ruta+params: hash del último cuerpo servido y desde cuándo (Last-Modified)
+        self._modified: Dict[str, Tuple[str, float]] = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requests = 0
+        self.by_route: Dict[str, int] = {}
+        self.by_status: Dict[int, int] = {}
+        self.by_source: Dict[str, int] = {}
+        self.recorded = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "by_route": dict(self.by_route),
+            "by_status": dict(self.by_status),
+            "by_source": dict(self.by_source),
+            "recorded": self.recorded,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "fixtures": len(self.store),
+            "mode": "record" if self.record_from else "replay",
+        }
+
+    async def aclose(self):
+        if self._upstream is not None:
+            await self._upstream.aclose()
+
+    def _rate_limited(self) -> bool:
+        rate = self.config.rate_limit
+        if not rate:
+            return False
+        now = time.monotonic()
+        self._bucket_tokens = min(rate, self._bucket_tokens + (now - self._bucket_updated) * rate)
+        self._bucket_updated = now
+        if self._bucket_tokens < 1:
+            return True
+        self._bucket_tokens -= 1
+        return False
+
+    def _last_modified(self, path: str, params: Dict[str, str], digest: str) -> float:
+        """Momento en que cambió por última vez el cuerpo de esta ruta (se renueva si cambia el hash)."""
+        key = FixtureStore.fixture_name(path, params)
+        seen = self._modified.get(key)
+        if seen is None or seen[0] != digest:
+            # Resolución de segundos, como la cabecera HTTP
+            seen = self._modified[key] = (digest, float(int(time.time())))
+        return seen[1]
+
+    @staticmethod
+    def _not_modified_since(request: Request, modified_at: float) -> bool:
+        value = request.headers.get("if-modified-since")
+        if not value:
+            return False
+        try:
+            return modified_at <= parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    def _fault_applies(self, path: str) -> bool:
+        return not self.config.fault_path or re.search(self.config.fault_path, path) is not None
+
+    def _synthesize(self, path: str, params: Dict[str, str]) -> Optional[Any]:
+        for pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match:
+                body = handler(params, *match.groups())
+                key = path.rstrip("/").rsplit("/", 1)[-1]
+                if key in PAGINATED and isinstance(body, dict) and ("limit" in params or "page" in params):
+                    body = paginate(body, key, params)
+                return body
+        return None
+
+    async def _record(self, path: str, params: Dict[str, str]) -> Tuple[int, Any, Dict[str, str]]:
+        if self._upstream is None:
+            self._upstream = httpx.AsyncClient(base_url=self.record_from, auth=self.credentials, timeout=30.0)
+        upstream = await self._upstream.get(path, params=params)
+        headers = {k: v for k, v in upstream.headers.items() if k.lower() in ("etag", "last-modified", "retry-after")}
+        try:
+            body = upstream.json()
+        except ValueError:
+            body = {"error": upstream.text[:500]}
+        if upstream.status_code == 200:
+            self.store.save(path, params, upstream.status_code, body, headers)
+            self.recorded += 1
+            logger.info(f"Recorded {path} {params or ''}")
+        return upstream.status_code, body, headers
+
+    async def handle(self, request: Request) -> Response:
+        path = request.url.path
+        params = dict(request.query_params)
+        self.requests += 1
+        route = re.sub(r"/\d+", "/{id}", path)
+        self.by_route[route] = self.by_route.get(route, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            response, source = await self._handle(request, path, params)
+        finally:
+            self.in_flight -= 1
+        self.by_status[response.status_code] = self.by_status.get(response.status_code, 0) + 1
+        self.by_source[source] = self.by_source.get(source, 0) + 1
+        return response
+
+    async def _handle(self, request: Request, path: str, params: Dict[str, str]) -> Tuple[Response, str]:
+        config = self.config
+        if config.require_auth and not request.headers.get("authorization", "").startswith("Basic "):
+            return JSONResponse({"error": {"code": 401, "message": "Unauthorized"}}, status_code=401), "auth"
+
+        faulty = self._fault_applies(path)
+        if faulty and (self._rate_limited() or random.random() < config.throttle_rate):
+            return JSONResponse(
+                {"error": {"code": 429, "message": "Too many requests"}},
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after)},
+            ), "throttled"
+
+        if faulty and (config.latency_ms or config.jitter_ms):
+            delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+            await asyncio.sleep(max(delay, 0) / 1000)
+
+        if faulty and random.random() < config.error_rate:
+            status = random.choice(config.error_statuses)
+            return JSONResponse({"error": {"code": status, "message": "Injected failure"}}, status_code=status), "fault"
+
+        if self.record_from:
+            status, body, headers = await self._record(path, params)
+            source = "upstream"
+        else:
+            fixture = self.store.load(path, params)
+            if fixture is not None:
+                status, body, headers = fixture.get("status", 200), fixture["body"], fixture.get("headers", {})
+                source = "fixture"
+            else:
+                body = None if config.strict else self._synthesize(path, params)
+                if body is None:
+                    return JSONResponse({"error": {"code": 404, "message": "Not found"}}, status_code=404), "missing"
+                status, headers, source = 200, {}, "synthetic"
+
+        payload = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode()
+        headers = dict(headers)
+        if config.etags and status == 200:
+            digest = hashlib.sha1(payload).hexdigest()[:16]
+            etag = headers.get("etag") or headers.get("ETag") or f'"{digest}"'
+            recorded = headers.get("last-modified") or headers.get("Last-Modified")
+            modified_at = parsedate_to_datetime(recorded).timestamp() if recorded else self._last_modified(path, params, digest)
+            headers = {k: v for k, v in headers.items() if k.lower() not in ("etag", "last-modified")}
+            headers["ETag"] = etag
+            headers["Last-Modified"] = recorded or formatdate(modified_at, usegmt=True)
+            # If-None-Match manda sobre If-Modified-Since (RFC 9110 13.2.2)
+            if request.headers.get("if-none-match") is not None:
+                if request.headers.get("if-none-match") == etag:
+                    return Response(status_code=304, headers=headers), source
+            elif self._not_modified_since(request, modified_at):
+                return Response(status_code=304, headers=headers), source
+        return Response(payload, status_code=status, media_type="application/json", headers=headers), source
+
+
+def create_app(fake: FakeWyscout) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await fake.aclose()
+
+    app = FastAPI(title="Fake Wyscout v3", lifespan=lifespan)
+    app.state.fake = fake
+
+    @app.get("/_fake/stats")
+    async def fake_stats():
+        return fake.stats()
+
+    @app.get("/_fake/config")
+    async def get_config():
+        return fake.config.as_dict()
+
+    @app.patch("/_fake/config")
+    async def patch_config(request: Request):
+        try:
+            fake.config.update(await request.json())
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return fake.config.as_dict()
+
+    @app.post("/_fake/reset")
+    async def reset_stats():
+        fake.reset_stats()
+        return fake.stats()
+
+    @app.get("/v3/{rest:path}")
+    async def wyscout(request: Request):
+        return await fake.handle(request)
+
+    return app
+
+
+def asgi_transport(fake: FakeWyscout) -> httpx.ASGITransport:
+    """Transporte httpx en proceso (sin sockets) para scripts de benchmark."""
+    return httpx.ASGITransport(app=create_app(fake))
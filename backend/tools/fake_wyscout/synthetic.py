@@ -0,0 +1,302 @@
+"""Datos sintéticos deterministas con la forma de las respuestas de Wyscout v3.
+
+Sirven cuando no hay fixture grabado para una ruta. Los ids son coherentes
+entre sí para poder navegar como en la API real:
+competición C -> equipos C*100+i -> jugadores equipo*100+j.
+"""
+import hashlib
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Union
+
+TEAMS_PER_COMPETITION = 20
+SQUAD_SIZE = 25
+PLAYER_MATCHES = 30
+
+AREAS = [
+    {"id": 32, "alpha2code": "AR", "alpha3code": "ARG", "name": "Argentina"},
+    {"id": 76, "alpha2code": "BR", "alpha3code": "BRA", "name": "Brazil"},
+    {"id": 152, "alpha2code": "CL", "alpha3code": "CHL", "name": "Chile"},
+    {"id": 170, "alpha2code": "CO", "alpha3code": "COL", "name": "Colombia"},
+    {"id": 250, "alpha2code": "FR", "alpha3code": "FRA", "name": "France"},
+    {"id": 276, "alpha2code": "DE", "alpha3code": "DEU", "name": "Germany"},
+    {"id": 380, "alpha2code": "IT", "alpha3code": "ITA", "name": "Italy"},
+    {"id": 620, "alpha2code": "PT", "alpha3code": "PRT", "name": "Portugal"},
+    {"id": 724, "alpha2code": "ES", "alpha3code": "ESP", "name": "Spain"},
+    {"id": 858, "alpha2code": "UY", "alpha3code": "URY", "name": "Uruguay"},
+]
+
+FIRST_NAMES = [
+    "Lucas", "Mateo", "Santiago", "Joaquín", "Tomás", "Nicolás", "Martín", "Diego", "Gonzalo", "Facundo",
+    "João", "Pedro", "Thiago", "Gabriel", "Rafael", "Hugo", "Álvaro", "Pablo", "Luca", "Marco",
+    "Julien", "Antoine", "Léo", "Jonas", "Felix", "Andrés", "Sebastián", "Emiliano", "Agustín", "Iván",
+]
+LAST_NAMES = [
+    "González", "Rodríguez", "Fernández", "López", "Martínez", "Pérez", "Gómez", "Sánchez", "Romero", "Díaz",
+    "Silva", "Santos", "Oliveira", "Costa", "Pereira", "Ferreira", "Müller", "Schmidt", "Rossi", "Bianchi",
+    "Dubois", "Moreau", "Núñez", "Álvarez", "Benítez", "Suárez", "Acuña", "Ibáñez", "Muñoz", "Castro",
+]
+CLUB_WORDS = ["Atlético", "Deportivo", "Real", "Sporting", "Racing", "Unión", "Independiente", "Club", "Estudiantes"]
+CITIES = ["Rosario", "Córdoba", "Porto", "Sevilla", "Lyon", "Bremen", "Torino", "Montevideo", "Medellín", "Valparaíso"]
+ROLES = [
+    {"name": "Goalkeeper", "code2": "GK", "code3": "GKP"},
+    {"name": "Defender", "code2": "DF", "code3": "DEF"},
+    {"name": "Midfielder", "code2": "MD", "code3": "MID"},
+    {"name": "Forward", "code2": "FW", "code3": "FWD"},
+]
+# Reparto típico de una plantilla por rol (GK, DF, MD, FW)
+ROLE_WEIGHTS = [3, 8, 8, 6]
+FEET = ["right", "left", "both"]
+SEASONS = [(188000, "2023/2024", 2023), (191000, "2024/2025", 2024), (194000, "2025/2026", 2025)]
+
+
+def _rng(*parts: Any) -> random.Random:
+    digest = hashlib.sha1(":".join(str(p) for p in parts).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _area(area_id: int) -> Dict[str, Any]:
+    for area in AREAS:
+        if area["id"] == area_id:
+            return dict(area)
+    return dict(AREAS[area_id % len(AREAS)])
+
+
+def competition(competition_id: int) -> Dict[str, Any]:
+    area = _area(AREAS[competition_id % len(AREAS)]["id"])
+    division = competition_id % 3 + 1
+    return {
+        "wyId": competition_id,
+        "name": f"{area['name']} {['Primera División', 'Segunda División', 'Tercera División'][division - 1]}",
+        "area": area,
+        "format": "Domestic league",
+        "type": "club",
+        "category": "default",
+        "gender": "male",
+        "divisionLevel": division,
+        "teamsCount": TEAMS_PER_COMPETITION,
+    }
+
+
+def competitions(area_id: Union[int, str]) -> Dict[str, Any]:
+    # Tres divisiones por área; los ids cumplen competition_id % len(AREAS) == índice del área.
+    # Wyscout recibe el código alpha3 del área; se acepta también el id numérico.
+    if isinstance(area_id, str) and not area_id.isdigit():
+        index = next((i for i, a in enumerate(AREAS) if a["alpha3code"] == area_id.upper()), 0)
+    else:
+        area_id = int(area_id)
+        index = next((i for i, a in enumerate(AREAS) if a["id"] == area_id), area_id % len(AREAS))
+    return {"competitions": [competition(index + len(AREAS) * k) for k in range(1, 4)]}
+
+
+def team(team_id: int) -> Dict[str, Any]:
+    rng = _rng("team", team_id)
+    competition_id = team_id // 100
+    area = _area(AREAS[competition_id % len(AREAS)]["id"])
+    city = rng.choice(CITIES)
+    name = f"{rng.choice(CLUB_WORDS)} {city}"
+    return {
+        "wyId": team_id,
+        "name": name,
+        "officialName": f"Club {name}",
+        "shortName": name[:12],
+        "city": city,
+        "area": area,
+        "type": "club",
+        "category": "default",
+        "gender": "male",
+        "imageDataURL": f"https://cdn5.wyscout.com/photos/team/public/{team_id}_120x120.png",
+        "competitionId": competition_id,
+    }
+
+
+def competition_teams(competition_id: int) -> Dict[str, Any]:
+    return {"teams": [team(competition_id * 100 + i) for i in range(1, TEAMS_PER_COMPETITION + 1)]}
+
+
+def season(season_id: int, competition_id: Optional[int] = None) -> Dict[str, Any]:
+    base = max((s for s in SEASONS if s[0] <= season_id), default=SEASONS[0])
+    _, name, year = base
+    return {
+        "wyId": season_id,
+        "name": name,
+        "competitionId": competition_id if competition_id is not None else season_id % 1000,
+        "startDate": f"{year}-08-01",
+        "endDate": f"{year + 1}-06-30",
+        "active": year == SEASONS[-1][2],
+    }
+
+
+def competition_seasons(competition_id: int) -> Dict[str, Any]:
+    return {
+        "competition": {"wyId": competition_id},
+        "seasons": [
+            {"seasonId": base + competition_id % 1000, "season": season(base + competition_id % 1000, competition_id)}
+            for base, _, _ in SEASONS
+        ],
+    }
+
+
+def season_competition_id(season_id: int) -> int:
+    return season_id % 1000
+
+
+def player(player_id: int) -> Dict[str, Any]:
+    rng = _rng("player", player_id)
+    team_id = player_id // 100
+    team_data = team(team_id)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    birth = date(1992, 1, 1) + timedelta(days=rng.randint(0, 13 * 365))
+    birth_area = team_data["area"] if rng.random() < 0.7 else _area(rng.choice(AREAS)["id"])
+    role = rng.choices(ROLES, weights=ROLE_WEIGHTS)[0]
+    return {
+        "wyId": player_id,
+        "shortName": f"{first[0]}. {last}",
+        "firstName": first,
+        "middleName": "",
+        "lastName": last,
+        "height": rng.randint(165, 198),
+        "weight": rng.randint(62, 95),
+        "birthDate": birth.isoformat(),
+        "birthArea": birth_area,
+        "passportArea": birth_area,
+        "role": dict(role),
+        "foot": rng.choices(FEET, weights=[7, 2, 1])[0],
+        "currentTeamId": team_id,
+        "currentNationalTeamId": None,
+        "gender": "male",
+        "status": "active",
+        "imageDataURL": f"https://cdn5.wyscout.com/photos/players/public/{player_id}.png",
+    }
+
+
+def squad(team_id: int) -> Dict[str, Any]:
+    players = []
+    for j in range(1, SQUAD_SIZE + 1):
+        p = player(team_id * 100 + j)
+        p["shirtNumber"] = j
+        players.append(p)
+    return {"squad": players}
+
+
+def competition_players(competition_id: int) -> List[Dict[str, Any]]:
+    players = []
+    for i in range(1, TEAMS_PER_COMPETITION + 1):
+        team_data = team(competition_id * 100 + i)
+        for p in squad(team_data["wyId"])["squad"]:
+            p["currentTeam"] = {"wyId": team_data["wyId"], "name": team_data["name"]}
+            players.append(p)
+    return players
+
+
+def player_career(player_id: int) -> Dict[str, Any]:
+    rng = _rng("career", player_id)
+    team_id = player_id // 100
+    competition_id = team_id // 100
+    career = []
+    for base, _, _ in SEASONS:
+        # A veces una temporada en otro equipo de la misma liga
+        season_team = team_id if rng.random() < 0.7 else competition_id * 100 + rng.randint(1, TEAMS_PER_COMPETITION)
+        appearances = rng.randint(0, 38)
+        career.append({
+            "teamId": season_team,
+            "competitionId": competition_id,
+            "seasonId": base + competition_id % 1000,
+            "appearances": appearances,
+            "goal": rng.randint(0, max(appearances // 3, 0)),
+            "minutesPlayed": appearances * rng.randint(45, 90),
+            "penalties": 0,
+            "yellowCard": rng.randint(0, 8),
+            "redCard": rng.randint(0, 1),
+            "substituteIn": rng.randint(0, 10),
+            "substituteOut": rng.randint(0, 10),
+            "substituteOnBench": rng.randint(0, 15),
+            "shirtNumber": player_id % 100,
+        })
+    return {"career": career}
+
+
+def player_contract(player_id: int) -> Dict[str, Any]:
+    rng = _rng("contract", player_id)
+    year = SEASONS[-1][2] + rng.randint(1, 4)
+    return {
+        "playerId": player_id,
+        "contractExpiration": f"{year}-06-30",
+        "agencies": [rng.choice(["Gestifute", "Stellar", "Wasserman", "Independiente"])],
+    }
+
+
+def player_transfers(player_id: int) -> Dict[str, Any]:
+    rng = _rng("transfers", player_id)
+    team_id = player_id // 100
+    transfers = []
+    for k in range(rng.randint(0, 3)):
+        from_team = team(team_id // 100 * 100 + rng.randint(1, TEAMS_PER_COMPETITION))
+        to_team = team(team_id)
+        transfers.append({
+            "transferId": player_id * 10 + k,
+            "playerId": player_id,
+            "fromTeam": {"wyId": from_team["wyId"], "name": from_team["name"]},
+            "toTeam": {"wyId": to_team["wyId"], "name": to_team["name"]},
+            "type": rng.choice(["transfer", "loan", "free"]),
+            "startDate": f"{SEASONS[0][2] + k}-07-01",
+            "announcedDate": f"{SEASONS[0][2] + k}-06-20",
+            "fee": {"value": rng.randint(1, 40) * 250000, "currency": "EUR"} if rng.random() < 0.5 else None,
+        })
+    return {"transfers": transfers}
+
+
+def _matches(seed: Any, team_ids: List[int], competition_id: int, count: int) -> Dict[str, Any]:
+    rng = _rng("matches", seed)
+    start = date(SEASONS[-1][2], 8, 1)
+    season_id = SEASONS[-1][0] + competition_id % 1000
+    matches = []
+    for k in range(count):
+        home = team(team_ids[k % len(team_ids)])
+        away = team(competition_id * 100 + rng.randint(1, TEAMS_PER_COMPETITION))
+        match_date = start + timedelta(days=7 * k)
+        matches.append({
+            "matchId": int(hashlib.sha1(f"{seed}:{k}".encode()).hexdigest()[:7], 16),
+            "competitionId": competition_id,
+            "seasonId": season_id,
+            "date": f"{match_date.isoformat()} 20:00:00",
+            "dateutc": f"{match_date.isoformat()} 23:00:00",
+            "label": f"{home['name']} - {away['name']}, {rng.randint(0, 4)}-{rng.randint(0, 4)}",
+            "status": "Played",
+        })
+    matches.reverse()  # más recientes primero, como Wyscout
+    return {"matches": matches}
+
+
+def player_matches(player_id: int) -> Dict[str, Any]:
+    team_id = player_id // 100
+    return _matches(("player", player_id), [team_id], team_id // 100, PLAYER_MATCHES)
+
+
+def team_matches(team_id: int) -> Dict[str, Any]:
+    return _matches(("team", team_id), [team_id], team_id // 100, PLAYER_MATCHES)
+
+
+def competition_matches(competition_id: int) -> Dict[str, Any]:
+    team_ids = [competition_id * 100 + i for i in range(1, TEAMS_PER_COMPETITION + 1)]
+    return _matches(("competition", competition_id), team_ids, competition_id, TEAMS_PER_COMPETITION * 2)
+
+
+def search(query: str, obj_type: str = "player", limit: int = 10) -> Dict[str, Any]:
+    rng = _rng("search", obj_type, query.lower())
+    results = []
+    for _ in range(min(limit, 10)):
+        competition_id = rng.randint(11, 40)
+        team_id = competition_id * 100 + rng.randint(1, TEAMS_PER_COMPETITION)
+        if obj_type == "team":
+            t = team(team_id)
+            t["name"] = f"{query.title()} {t['city']}"
+            results.append(t)
+            continue
+        p = player(team_id * 100 + rng.randint(1, SQUAD_SIZE))
+        p["lastName"] = query.title()
+        p["shortName"] = f"{p['firstName'][0]}. {query.title()}"
+        p["name"] = f"{p['firstName']} {query.title()}"
+        p["currentTeam"] = {"wyId": team_id, "name": team(team_id)["name"]}
+        results.append(p)
+    return {"teams" if obj_type == "team" else "players": results}
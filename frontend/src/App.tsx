@@ -269,13 +269,11 @@ const [selectedTeams, setSelectedTeams] = useState<number[]>([]);
 
     setLoading(true);
     try {
-      // Just use regular player search and format as search results
-      const players = await playerService.searchPlayers(searchQuery);
-      const playersArray = Array.isArray(players) ? players : [];
-      const results = playersArray.map(p => ({
-        ...p,
-        type: 'player',
-        imageDataURL: null
+      // Búsqueda federada: Wyscout, catálogo local y datos del club ya ordenados
+      const found = await playerService.federatedSearch(searchQuery);
+      const results = found.map((r: any) => ({
+        ...r,
+        imageDataURL: r.image_url || null
       }));
       setSearchResults(results);
     } catch (error) {
@@ -467,41 +465,48 @@ const openMarketModal = async (player: any) => {
     loadTeams();
   }, [selectedCompetition]);
 
-// Load players: usa endpoint de competición (1 sola llamada, con caché)
+// Load players: endpoint de competición en streaming, se pinta cada equipo según llega
 useEffect(() => {
+  const controller = new AbortController();
   const loadTeamPlayers = async () => {
     if (selectedTeams.length > 0 && selectedCompetition) {
       setLoading(true);
+      // Deduplicar por wyscout_id (un jugador puede aparecer en múltiples equipos)
+      const seen = new Set<string>();
+      const natSet = new Set<string>();
+      let allPlayers: any[] = [];
       try {
-        const rawPlayers = await playerService.getCompetitionPlayers(selectedCompetition, selectedTeams);
-
-        // Deduplicar por wyscout_id (un jugador puede aparecer en múltiples equipos)
-        const seen = new Set<string>();
-        const allPlayers = rawPlayers.filter((p: any) => {
-          const pid = String(p.wyscout_id || p.id);
-          if (seen.has(pid)) return false;
-          seen.add(pid);
-          return true;
-        });
-
-        setAllPlayersData(allPlayers);
-        setTeamPlayers(allPlayers);
-
-        // Extraer nacionalidades individuales (separar "Argentina / Spain" en dos)
-        const natSet = new Set<string>();
-        for (const player of allPlayers) {
-          if (player.nationalities && Array.isArray(player.nationalities)) {
-            player.nationalities.forEach((n: string) => natSet.add(n));
-          } else if (player.nationality) {
-            player.nationality.split(' / ').forEach((n: string) => natSet.add(n.trim()));
+        await playerService.streamCompetitionPlayers(selectedCompetition, selectedTeams, (batch) => {
+          const fresh = batch.filter((p: any) => {
+            const pid = String(p.wyscout_id || p.id);
+            if (seen.has(pid)) return false;
+            seen.add(pid);
+            return true;
+          });
+          if (fresh.length === 0) return;
+          allPlayers = [...allPlayers, ...fresh];
+
+          // Extraer nacionalidades individuales (separar "Argentina / Spain" en dos)
+          for (const player of fresh) {
+            if (player.nationalities && Array.isArray(player.nationalities)) {
+              player.nationalities.forEach((n: string) => natSet.add(n));
+            } else if (player.nationality) {
+              player.nationality.split(' / ').forEach((n: string) => natSet.add(n.trim()));
+            }
           }
-        }
-        setAvailableNationalities(Array.from(natSet).sort());
-
+          setAllPlayersData(allPlayers);
+          setTeamPlayers(allPlayers);
+          setAvailableNationalities(Array.from(natSet).sort());
+          setLoading(false);
+        }, controller.signal);
       } catch (error) {
-        console.error('Failed to load players:', error);
+        if (!controller.signal.aborted) {
+          console.error('Failed to load players:', error);
+        }
       } finally {
-        setLoading(false);
+        if (!controller.signal.aborted) {
+          setLoading(false);
+        }
       }
     } else {
       setTeamPlayers([]);
@@ -509,14 +514,56 @@ useEffect(() => {
     }
   };
   loadTeamPlayers();
+  // Cambió la selección: cortar el stream anterior
+  return () => controller.abort();
   // eslint-disable-next-line react-hooks/exhaustive-deps
 }, [selectedTeams.join(','), selectedCompetition]);
 
 
-// Filtrar jugadores sin recargar datos
+// Filtrar jugadores sin recargar datos. Nacionalidad y edad se filtran en local;
+// con filtro de contrato se pide al backend, que mira los contratos en caché de los
+// jugadores que pasan el resto de filtros. Los que no tenía (contract_unknown) se
+// cargan por batch-info y se vuelve a filtrar una vez.
 useEffect(() => {
   if (allPlayersData.length === 0) return;
 
+  const minAge = ageFilter.min ? parseInt(ageFilter.min) : 0;
+  const maxAge = ageFilter.max ? parseInt(ageFilter.max) : 0;
+
+  if ((contractFilter.from || contractFilter.to) && selectedCompetition) {
+    const controller = new AbortController();
+    const fetchFiltered = () => playerService.getCompetitionPlayersFiltered(
+      selectedCompetition,
+      selectedTeams,
+      {
+        nationalities: selectedNationalities,
+        minAge: minAge >= 15 ? minAge : undefined,
+        maxAge: maxAge >= 15 ? maxAge : undefined,
+        contractFrom: contractFilter.from || undefined,
+        contractTo: contractFilter.to || undefined,
+      },
+      1,
+      1000,
+      controller.signal
+    );
+    fetchFiltered()
+      .then(async result => {
+        setTeamPlayers(result.players);
+        if (result.contract_unknown?.length && !controller.signal.aborted) {
+          await playerService.getPlayersBatchInfo(result.contract_unknown);
+          if (!controller.signal.aborted) {
+            setTeamPlayers((await fetchFiltered()).players);
+          }
+        }
+      })
+      .catch(error => {
+        if (!controller.signal.aborted) {
+          console.error('Failed to filter players:', error);
+        }
+      });
+    return () => controller.abort();
+  }
+
   let filtered = [...allPlayersData];
   
   if (selectedNationalities.length > 0) {
@@ -529,8 +576,6 @@ useEffect(() => {
     });
   }
   
-  const minAge = ageFilter.min ? parseInt(ageFilter.min) : 0;
-  const maxAge = ageFilter.max ? parseInt(ageFilter.max) : 0;
   if (minAge >= 15 || maxAge >= 15) {
     filtered = filtered.filter(player => {
       const age = player.age;
@@ -541,24 +586,9 @@ useEffect(() => {
     });
   }
 
-  // Filtro de vencimiento de contrato (usa info extra de batch-info)
-  if (contractFilter.from || contractFilter.to) {
-    filtered = filtered.filter(player => {
-      const wid = String(player.wyscout_id || player.id);
-      const extra = browseExtraInfo[wid];
-      const contractExp = extra?.contract_expires || player.contractExpires;
-      // Si no hay datos de contrato, mantener al jugador (no excluirlo)
-      if (!contractExp) return true;
-      const contractDate = new Date(contractExp);
-      if (isNaN(contractDate.getTime())) return true;
-      const meetsFrom = !contractFilter.from || contractDate >= new Date(contractFilter.from);
-      const meetsTo = !contractFilter.to || contractDate <= new Date(contractFilter.to);
-      return meetsFrom && meetsTo;
-    });
-  }
-
   setTeamPlayers(filtered);
-}, [selectedNationalities, ageFilter.min, ageFilter.max, contractFilter.from, contractFilter.to, allPlayersData, browseExtraInfo]);
+  // eslint-disable-next-line react-hooks/exhaustive-deps
+}, [selectedNationalities, ageFilter.min, ageFilter.max, contractFilter.from, contractFilter.to, allPlayersData]);
 
   // View player profile
   const viewPlayerProfile = async (playerId: number) => {
@@ -471,7 +471,8 @@ const MarketPitchView: React.FC<MarketPitchViewProps> = ({ marketPlayers, market
     };
   }, [formation, customPositions, selectedFormation, marketId]);
 
-  // Cargar detalles de todos los jugadores Wyscout en una sola llamada batch
+  // Cargar detalles de todos los jugadores Wyscout en una sola llamada batch (en streaming:
+  // lo cacheado se pinta al momento y el resto según llega)
   const fetchedIdsRef = useRef<Set<string>>(new Set());
 
   useEffect(() => {
@@ -488,8 +489,9 @@ const MarketPitchView: React.FC<MarketPitchViewProps> = ({ marketPlayers, market
     const fetchBatch = async () => {
       try {
         const numericIds = wyscoutIds.map(id => parseInt(id)).filter(id => !isNaN(id));
-        const batchData = await playerService.getPlayersBatchInfo(numericIds, [], true);
-        setPlayerDetails(prev => ({ ...prev, ...batchData }));
+        await playerService.streamPlayersBatchInfo(numericIds, [], true, (batchData) => {
+          setPlayerDetails(prev => ({ ...prev, ...batchData }));
+        });
       } catch (error) {
         console.error('Error fetching batch player details:', error);
         // Permitir reintentar si fallo
@@ -76,15 +76,16 @@ const BrowseTab: React.FC<BrowseTabProps> = ({
     if (ids.length === 0) { setExtraLoaded(true); return; }
 
     setLoadingExtra(true);
-    for (let i = 0; i < ids.length; i += 10) {
-      const batch = ids.slice(i, i + 10);
-      batch.forEach(id => fetchedRef.current.add(String(id)));
-      try {
-        const info = await playerService.getPlayersBatchInfo(batch);
+    // Una sola petición en streaming: cada jugador se pinta en cuanto llega
+    ids.forEach(id => fetchedRef.current.add(String(id)));
+    try {
+      await playerService.streamPlayersBatchInfo(ids, [], false, (info) => {
         setBrowseExtraInfo((prev: Record<string, any>) => ({ ...prev, ...info }));
-      } catch (e) {
-        console.error('Error batch-info:', e);
-      }
+      });
+    } catch (e) {
+      console.error('Error batch-info:', e);
+      // Permitir reintentar los que no llegaron
+      ids.forEach(id => fetchedRef.current.delete(String(id)));
     }
     setLoadingExtra(false);
     setExtraLoaded(true);
@@ -166,6 +166,23 @@ export interface ScoutReportCreate {
 
 
 }
+// Lee un cuerpo NDJSON línea a línea y entrega cada frame en cuanto llega
+const readNdjson = async (body: ReadableStream<Uint8Array>, onFrame: (frame: any) => void): Promise<void> => {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop() || '';
+    for (const line of lines) {
+      if (line.trim()) onFrame(JSON.parse(line));
+    }
+  }
+};
+
 export const playerService = {
   searchPlayers: async (query: string, limit: number = 30): Promise<Player[]> => {
     const response = await api.get('/api/search/players', { params: { query, limit } });
@@ -181,6 +198,12 @@ export const playerService = {
     const response = await api.get('/api/search/smart', { params: { query } });
     return response.data;
   },
+
+  // Jugadores y equipos de Wyscout + datos del club, en paralelo con plazo por fuente
+  federatedSearch: async (query: string, limit: number = 30): Promise<any[]> => {
+    const response = await api.get('/api/search/federated', { params: { query, limit } });
+    return response.data.results || [];
+  },
   
   getAreas: async (): Promise<any[]> => {
     const response = await api.get('/api/areas');
@@ -235,6 +258,110 @@ export const playerService = {
     const response = await api.get(`/api/competitions/${competitionId}/players`, { params });
     return response.data;
   },
+
+  // Browse filtrado y paginado en el backend (índice por nacionalidad/posición/edad;
+  // el contrato se mira en caché para los que pasan los otros filtros y contract_unknown
+  // lista los de la página sin datos de contrato).
+  getCompetitionPlayersFiltered: async (
+    competitionId: number,
+    teamIds: number[],
+    filters: {
+      nationalities?: string[];
+      positions?: string[];
+      minAge?: number;
+      maxAge?: number;
+      contractFrom?: string;
+      contractTo?: string;
+    },
+    page: number = 1,
+    pageSize: number = 100,
+    signal?: AbortSignal
+  ): Promise<{
+    players: any[];
+    total: number;
+    page: number;
+    page_size: number;
+    nationalities: string[];
+    partial: boolean;
+    contract_unknown: number[];
+  }> => {
+    const params: any = { page, page_size: pageSize };
+    if (teamIds.length > 0) params.team_ids = teamIds.join(',');
+    if (filters.nationalities?.length) params.nationality = filters.nationalities.join(',');
+    if (filters.positions?.length) params.position = filters.positions.join(',');
+    if (filters.minAge) params.min_age = filters.minAge;
+    if (filters.maxAge) params.max_age = filters.maxAge;
+    if (filters.contractFrom) params.contract_from = filters.contractFrom;
+    if (filters.contractTo) params.contract_to = filters.contractTo;
+    const response = await api.get(`/api/competitions/${competitionId}/players`, { params, signal });
+    return response.data;
+  },
+
+  // Igual que getCompetitionPlayers pero en streaming (NDJSON): onBatch recibe cada tanda
+  // de jugadores (ya deduplicada) en cuanto el backend la tiene.
+  streamCompetitionPlayers: async (
+    competitionId: number,
+    teamIds: number[],
+    onBatch: (players: any[]) => void,
+    signal?: AbortSignal
+  ): Promise<{ total: number; stale: boolean }> => {
+    const params = new URLSearchParams({ stream: 'ndjson' });
+    if (teamIds.length > 0) {
+      params.set('team_ids', teamIds.join(','));
+    }
+    const token = localStorage.getItem('token');
+    const response = await fetch(`${API_BASE_URL}/api/competitions/${competitionId}/players?${params}`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+      signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Failed to stream players: ${response.status}`);
+    }
+
+    let summary = { total: 0, stale: false };
+    await readNdjson(response.body, (frame) => {
+      if (frame.type === 'players') {
+        onBatch(frame.players);
+      } else if (frame.type === 'done') {
+        summary = { total: frame.total, stale: frame.stale };
+      }
+    });
+    return summary;
+  },
+
+  // batch-info en streaming (NDJSON): onBatch recibe primero todo lo cacheado y
+  // luego cada jugador según llega de Wyscout, con las mismas claves que getPlayersBatchInfo.
+  streamPlayersBatchInfo: async (
+    playerIds: number[],
+    playerNames: string[],
+    skipContract: boolean,
+    onBatch: (info: Record<string, any>) => void,
+    signal?: AbortSignal
+  ): Promise<{ cached: number; fetched: number; failed: number; stale: boolean }> => {
+    const token = localStorage.getItem('token');
+    const response = await fetch(`${API_BASE_URL}/api/players/batch-info?stream=ndjson`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(token ? { Authorization: `Bearer ${token}` } : {}),
+      },
+      body: JSON.stringify({ player_ids: playerIds, player_names: playerNames, skip_contract: skipContract }),
+      signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Failed to stream batch info: ${response.status}`);
+    }
+
+    let summary = { cached: 0, fetched: 0, failed: 0, stale: false };
+    await readNdjson(response.body, (frame) => {
+      if (frame.type === 'players') {
+        onBatch(frame.players);
+      } else if (frame.type === 'done') {
+        summary = { cached: frame.cached, fetched: frame.fetched, failed: frame.failed, stale: frame.stale };
+      }
+    });
+    return summary;
+  },
 };
 
 export const scoutingService = {